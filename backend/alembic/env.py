@@ -5,6 +5,7 @@ from sqlalchemy import engine_from_config, pool
 from alembic import context
 from app.core.config import settings
 from app.db import Base
+from app.models.cache_version import CacheVersion  # noqa: F401
 from app.models.membership import Membership, MembershipRole  # noqa: F401
 
 # Import all models to ensure they are registered with Base.metadata
@@ -0,0 +1,45 @@
+"""Partial indexes on deleted_at for the soft-delete purge
+
+Revision ID: 0002_soft_delete_indexes
+Revises: 0001_initial_schema
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_soft_delete_indexes"
+down_revision: str | None = "0001_initial_schema"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+DELETED_ONLY = sa.text("deleted_at IS NOT NULL")
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_memberships_deleted_at",
+        "memberships",
+        ["deleted_at"],
+        unique=False,
+        postgresql_where=DELETED_ONLY,
+        sqlite_where=DELETED_ONLY,
+    )
+    op.create_index(
+        "ix_rider_profiles_deleted_at",
+        "rider_profiles",
+        ["deleted_at"],
+        unique=False,
+        postgresql_where=DELETED_ONLY,
+        sqlite_where=DELETED_ONLY,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_rider_profiles_deleted_at", table_name="rider_profiles")
+    op.drop_index("ix_memberships_deleted_at", table_name="memberships")
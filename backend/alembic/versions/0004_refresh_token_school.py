@@ -0,0 +1,27 @@
+"""School context on refresh tokens
+
+Revision ID: 0004_refresh_token_school
+Revises: 0003_schema_state
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_refresh_token_school"
+down_revision: str | None = "0003_schema_state"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column("refresh_tokens", sa.Column("school_id", sa.Uuid(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("refresh_tokens", "school_id")
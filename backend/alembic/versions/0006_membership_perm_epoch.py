@@ -0,0 +1,30 @@
+"""Permission epoch on memberships
+
+Revision ID: 0006_membership_perm_epoch
+Revises: 0005_cache_versions
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0006_membership_perm_epoch"
+down_revision: str | None = "0005_cache_versions"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "memberships",
+        sa.Column("perm_epoch", sa.Integer(), server_default="0", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("memberships", "perm_epoch")
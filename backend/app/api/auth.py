@@ -1,22 +1,32 @@
+import uuid
 from datetime import UTC, datetime
 
 from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import update
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.api import deps
-from app.core import security
-from app.core.auth_helpers import get_user_permissions, set_auth_cookies
+from app.api.routing import NegotiatedRoute
+from app.core import auth_cache, security
+from app.core.auth_helpers import (
+    get_user_permissions,
+    set_access_cookie,
+    set_auth_cookies,
+)
 from app.core.config import settings
 from app.core.ratelimit import RateLimiter
-from app.db import get_db
+from app.core.read_models import MeRead
+from app.db import get_async_db, get_db
 from app.models.refresh_token import RefreshToken
 from app.models.user import User
-from app.schemas.token import Token
+from app.schemas.token import Token, TokenPayload
 from app.schemas.user import UserCreate, UserSchema, UserWithSchool
 
-router = APIRouter()
+router = APIRouter(route_class=NegotiatedRoute)
 login_limiter = RateLimiter(
     requests_limit=5,
     time_window=60,
@@ -30,7 +40,7 @@ register_limiter = RateLimiter(
 
 
 @router.get("/me", response_model=UserWithSchool)
-def get_me(current_user: User = Depends(deps.get_current_user)):
+async def get_me(current_user: MeRead = Depends(deps.get_current_user_read)):
     return current_user
 
 
@@ -77,15 +87,24 @@ def login(
     ):
         raise HTTPException(status_code=400, detail="Incorrect email or password")
 
-    school_id, perms, roles = get_user_permissions(db, user.id)
+    school_id, perms, roles, perm_epoch = get_user_permissions(db, user.id)
 
     access_token = security.create_access_token(
-        user.id, school_id=school_id, perms=perms, roles=roles
+        user.id,
+        school_id=school_id,
+        perms=perms,
+        roles=roles,
+        perm_epoch=perm_epoch,
     )
 
     # Create and store refresh token
     rt_token, rt_hash, rt_expire = security.create_refresh_token(user.id)
-    rt_db = RefreshToken(user_id=user.id, token_hash=rt_hash, expires_at=rt_expire)
+    rt_db = RefreshToken(
+        user_id=user.id,
+        token_hash=rt_hash,
+        expires_at=rt_expire,
+        school_id=school_id,
+    )
     db.add(rt_db)
     db.commit()
 
@@ -148,10 +167,17 @@ def refresh_token(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found"
         )
 
-    school_id, perms, roles = get_user_permissions(db, user.id)
+    # Stay in the school the session switched to, if still a member
+    school_id, perms, roles, perm_epoch = get_user_permissions(
+        db, user.id, rt_db.school_id
+    )
 
     new_access_token = security.create_access_token(
-        user.id, school_id=school_id, perms=perms, roles=roles
+        user.id,
+        school_id=school_id,
+        perms=perms,
+        roles=roles,
+        perm_epoch=perm_epoch,
     )
 
     # Rotate Refresh Token
@@ -161,7 +187,10 @@ def refresh_token(
     rt_db.revoked_at = datetime.now(UTC)
 
     new_rt_db = RefreshToken(
-        user_id=user.id, token_hash=new_rt_hash, expires_at=new_rt_expire
+        user_id=user.id,
+        token_hash=new_rt_hash,
+        expires_at=new_rt_expire,
+        school_id=school_id,
     )
     db.add(new_rt_db)
     db.flush()  # Get ID
@@ -177,6 +206,66 @@ def refresh_token(
     }
 
 
+def _move_refresh_token(
+    db: Session, refresh_token: str, user_id: uuid.UUID, school_id: uuid.UUID
+) -> None:
+    # Only a live token: a revoked or expired cookie stays dead
+    db.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.token_hash == security.get_token_hash(refresh_token),
+            RefreshToken.user_id == user_id,
+            RefreshToken.revoked_at.is_(None),
+            RefreshToken.expires_at > datetime.now(UTC),
+        )
+        .values(school_id=school_id)
+    )
+    db.commit()
+
+
+@router.post("/switch-school/{school_id}", response_model=Token)
+async def switch_school(
+    school_id: str,
+    response: Response,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    writer: Session = Depends(get_db),
+    token: TokenPayload = Depends(deps.get_token_payload),
+):
+    """
+    Reissue the access token for another school the user belongs to. The
+    current token proves identity, so no password check is needed.
+    """
+    try:
+        s_id = uuid.UUID(school_id)
+        user_id = uuid.UUID(token.sub)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid school ID") from None
+
+    snapshot = await auth_cache.get_snapshot(db, user_id, s_id)
+    if snapshot is None:
+        raise HTTPException(status_code=403, detail="Not a member of this school")
+
+    access_token = security.create_access_token(
+        user_id,
+        school_id=s_id,
+        perms=sorted(snapshot.permissions),
+        roles=list(snapshot.roles),
+        perm_epoch=snapshot.perm_epoch,
+    )
+
+    # Refreshed tokens keep the new school
+    refresh_token = request.cookies.get("refresh_token")
+    if refresh_token:
+        # Writes go through the sync writer session, as in login and refresh
+        await run_in_threadpool(
+            _move_refresh_token, writer, refresh_token, user_id, s_id
+        )
+
+    set_access_cookie(response, access_token)
+    return {"access_token": access_token, "token_type": "bearer"}
+
+
 @router.post("/logout")
 def logout(response: Response, request: Request, db: Session = Depends(get_db)):
     refresh_token = request.cookies.get("refresh_token")
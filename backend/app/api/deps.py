@@ -2,21 +2,27 @@ import uuid
 
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt
 from pydantic import ValidationError
-from sqlalchemy.orm import Session, joinedload
-
-from app.core.config import settings
-from app.db import get_db
-from app.models.membership import Membership, MembershipRole
-from app.models.role import Role
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import (
+    auth_cache,
+    queries,
+    read_models,
+    school_directory,
+    security,
+    timing,
+    user_directory,
+)
+from app.db import get_async_db
 from app.models.user import User
 from app.schemas.token import TokenPayload
 
 reusable_oauth2 = OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=False)
 
 
-def get_token_payload(
+@timing.timed("auth")
+async def get_token_payload(
     request: Request, token: str | None = Depends(reusable_oauth2)
 ) -> TokenPayload:
     if not token:
@@ -30,11 +36,9 @@ def get_token_payload(
         )
 
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
+        payload = security.decode_access_token(token)
         token_data = TokenPayload(**payload)
-    except (jwt.JWTError, ValidationError):
+    except (security.InvalidTokenError, ValidationError):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
@@ -42,8 +46,10 @@ def get_token_payload(
     return token_data
 
 
-def get_current_user(
-    db: Session = Depends(get_db), token_data: TokenPayload = Depends(get_token_payload)
+@timing.timed("auth")
+async def get_current_user(
+    db: AsyncSession = Depends(get_async_db),
+    token_data: TokenPayload = Depends(get_token_payload),
 ) -> User:
     try:
         user_id = uuid.UUID(token_data.sub)
@@ -51,7 +57,8 @@ def get_current_user(
         raise HTTPException(status_code=400, detail="Invalid token subject") from None
 
     # Load user
-    user = db.query(User).filter(User.id == user_id).first()
+    result = await db.execute(queries.USER_BY_ID, {"user_id": user_id})
+    user = result.scalars().first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -63,55 +70,56 @@ def get_current_user(
         except ValueError:
             pass
 
-    # Find membership
-    if school_id:
-        membership = (
-            db.query(Membership)
-            .options(
-                joinedload(Membership.roles)
-                .joinedload(MembershipRole.role)
-                .joinedload(Role.permissions),
-                joinedload(Membership.school),
-            )
-            .filter(
-                Membership.user_id == user.id,
-                Membership.school_id == school_id,
-            )
-            .first()
-        )
-        if not membership:
-            raise HTTPException(status_code=403, detail="Not a member of this school")
-    else:
-        # No school in token (e.g. first login, or global admin?)
-        # Default to first membership
-        membership = (
-            db.query(Membership)
-            .options(
-                joinedload(Membership.roles)
-                .joinedload(MembershipRole.role)
-                .joinedload(Role.permissions),
-                joinedload(Membership.school),
-            )
-            .filter(Membership.user_id == user.id)
-            .first()
-        )
-
-    if membership:
-        # Attach context to user instance (transient)
-        user.school_id = membership.school_id
-        user.school = membership.school
-        user.current_membership = membership
-        # Flatten roles
-        user.roles = [mr.role for mr in membership.roles]
+    # Membership, roles and permissions, cached per (user, school)
+    snapshot = await auth_cache.get_snapshot(db, user.id, school_id)
+    if school_id and snapshot is None:
+        raise HTTPException(status_code=403, detail="Not a member of this school")
+
+    # Attach context to user instance (transient)
+    if snapshot:
+        user.school_id = snapshot.school_id
+        user.school = await school_directory.get_by_id(db, snapshot.school_id)
+        user.roles = list(snapshot.roles)
+        user.permissions = snapshot.permissions
     else:
         user.school_id = None
         user.school = None
         user.roles = []
-        user.current_membership = None
+        user.permissions = frozenset()
 
     return user
 
 
+@timing.timed("auth")
+async def get_current_user_read(
+    db: AsyncSession = Depends(get_async_db),
+    token_data: TokenPayload = Depends(get_token_payload),
+) -> read_models.MeRead:
+    """
+    Read-only variant of get_current_user: same checks, served from the user,
+    membership and school caches, and a slotted record instead of ORM
+    instances.
+    """
+    try:
+        user_id = uuid.UUID(token_data.sub)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid token subject") from None
+
+    school_id = None
+    if token_data.sid:
+        try:
+            school_id = uuid.UUID(token_data.sid)
+        except ValueError:
+            pass
+
+    me = await user_directory.get_me(db, user_id, school_id)
+    if me is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    if school_id and me.school is None:
+        raise HTTPException(status_code=403, detail="Not a member of this school")
+    return me
+
+
 def get_current_active_school_user(
     current_user: User = Depends(get_current_user),
 ) -> User:
@@ -123,14 +131,42 @@ def get_current_active_school_user(
     return current_user
 
 
+@timing.timed("auth")
+async def get_current_token_payload(
+    db: AsyncSession = Depends(get_async_db),
+    token_data: TokenPayload = Depends(get_token_payload),
+) -> TokenPayload:
+    """
+    get_token_payload, rejecting tokens whose perms predate a role change in
+    their school: the perm_epoch claim must match the membership's, which is
+    read from the auth snapshot cache. The 401 makes clients refresh.
+    """
+    if token_data.pe is None or not token_data.sid:
+        # Issued before epochs existed, or without a school (no perms)
+        return token_data
+    try:
+        user_id, school_id = uuid.UUID(token_data.sub), uuid.UUID(token_data.sid)
+    except (TypeError, ValueError):
+        snapshot = None
+    else:
+        snapshot = await auth_cache.get_snapshot(db, user_id, school_id)
+    if snapshot is None or snapshot.perm_epoch != token_data.pe:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Permissions changed; refresh the access token",
+            headers={"WWW-Authenticate": 'Bearer error="invalid_token"'},
+        )
+    return token_data
+
+
 class RequirePermission:
     def __init__(self, required_permission: str):
         self.required_permission = required_permission
 
     def __call__(
-        self, token_data: TokenPayload = Depends(get_token_payload)
+        self, token_data: TokenPayload = Depends(get_current_token_payload)
     ) -> TokenPayload:
-        # Stateless check
+        # Perms from the token, which get_current_token_payload found current
         if self.required_permission not in token_data.perms:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
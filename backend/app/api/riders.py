@@ -3,11 +3,14 @@ import uuid
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 from sqlalchemy.sql import func
 
 from app.api import deps
-from app.db import get_db
+from app.api.routing import NegotiatedRoute
+from app.core import queries, read_models
+from app.db import get_async_db, get_db
 from app.models.membership import Membership, MembershipRole
 from app.models.rider_profile import RiderProfile
 from app.models.role import Role
@@ -15,7 +18,7 @@ from app.models.user import User
 from app.schemas.rider import RiderCreate, RiderResponse, RiderUpdate
 from app.schemas.token import TokenPayload
 
-router = APIRouter()
+router = APIRouter(route_class=NegotiatedRoute)
 logger = logging.getLogger(__name__)
 
 
@@ -48,8 +51,11 @@ def _ensure_membership(
 ) -> Membership:
     """Ensure user has membership in the school."""
     membership = (
-        db.query(Membership)
-        .filter(Membership.user_id == user_id, Membership.school_id == school_id)
+        db.execute(
+            queries.MEMBERSHIP_BY_USER_SCHOOL,
+            {"user_id": user_id, "school_id": school_id},
+        )
+        .scalars()
         .first()
     )
     if not membership:
@@ -142,9 +148,9 @@ def create_rider(
 
     try:
         db.commit()
-    except SQLAlchemyError as e:
+    except SQLAlchemyError:
         db.rollback()
-        logger.error(f"Failed to create rider: {e}")
+        logger.exception("Failed to create rider")
         raise HTTPException(status_code=500, detail="Failed to create rider") from None
 
     db.refresh(profile)
@@ -152,33 +158,26 @@ def create_rider(
 
 
 @router.get("/", response_model=list[RiderResponse])
-def list_riders(
-    db: Session = Depends(get_db),
+async def list_riders(
+    db: AsyncSession = Depends(get_async_db),
     token: TokenPayload = Depends(deps.RequirePermission("riders:view")),
 ):
     """
     List all riders for the current school.
-    Automatically filters soft-deleted profiles via DB event.
+    Soft-deleted profiles are excluded.
     """
     if not token.sid:
         raise HTTPException(status_code=400, detail="Invalid school context")
     school_id = uuid.UUID(token.sid)
 
     # Bolt: Optimized to fetch user data in same query (avoids N+1)
-    profiles = (
-        db.query(RiderProfile)
-        .options(joinedload(RiderProfile.user))
-        .filter(RiderProfile.school_id == school_id)
-        .all()
-    )
-
-    return profiles
+    return await read_models.list_riders(db, school_id)
 
 
 @router.get("/{rider_id}", response_model=RiderResponse)
-def get_rider(
+async def get_rider(
     rider_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     token: TokenPayload = Depends(deps.RequirePermission("riders:view")),
 ):
     try:
@@ -190,16 +189,11 @@ def get_rider(
         raise HTTPException(status_code=400, detail="Invalid school context")
     school_id = uuid.UUID(token.sid)
 
-    profile = (
-        db.query(RiderProfile)
-        .options(joinedload(RiderProfile.user))
-        .filter(RiderProfile.id == r_id, RiderProfile.school_id == school_id)
-        .first()
-    )
-    if not profile:
+    rider = await read_models.get_rider(db, r_id, school_id)
+    if not rider:
         raise HTTPException(status_code=404, detail="Rider not found")
 
-    return profile
+    return rider
 
 
 def _update_user_fields(db: Session, user: User, rider_in: RiderUpdate) -> None:
@@ -240,9 +234,10 @@ def update_rider(
     school_id = uuid.UUID(token.sid)
 
     profile = (
-        db.query(RiderProfile)
-        .options(joinedload(RiderProfile.user))
-        .filter(RiderProfile.id == r_id, RiderProfile.school_id == school_id)
+        db.execute(
+            queries.RIDER_PROFILE_WITH_USER, {"rider_id": r_id, "school_id": school_id}
+        )
+        .scalars()
         .first()
     )
     if not profile:
@@ -291,11 +286,11 @@ def delete_rider(
 
     # Soft delete Membership (if exists and exclusive to rider role?)
     membership = (
-        db.query(Membership)
-        .filter(
-            Membership.user_id == profile.user_id,
-            Membership.school_id == school_id,
+        db.execute(
+            queries.MEMBERSHIP_BY_USER_SCHOOL,
+            {"user_id": profile.user_id, "school_id": school_id},
         )
+        .scalars()
         .first()
     )
     if membership:
@@ -0,0 +1,188 @@
+import asyncio
+import functools
+from collections.abc import Callable
+
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.routing import APIRoute, get_request_handler
+from starlette.datastructures import MutableHeaders
+from starlette.exceptions import HTTPException
+from starlette.requests import Request
+
+from app.core import timing
+from app.core.responses import (
+    MSGPACK_MEDIA_TYPES,
+    FastJSONResponse,
+    MsgPackResponse,
+    decode_msgpack,
+    msgpack,
+)
+
+
+def _mark_when_done(call: Callable) -> Callable:
+    if asyncio.iscoroutinefunction(call):
+
+        @functools.wraps(call)
+        async def async_endpoint(*args, **kwargs):
+            try:
+                return await call(*args, **kwargs)
+            finally:
+                timing.mark_endpoint_done()
+
+        return async_endpoint
+
+    @functools.wraps(call)
+    def endpoint(*args, **kwargs):
+        try:
+            return call(*args, **kwargs)
+        finally:
+            timing.mark_endpoint_done()
+
+    return endpoint
+
+
+def _resolved(response_class):
+    if isinstance(response_class, DefaultPlaceholder):
+        return response_class.value
+    return response_class
+
+
+class _PythonModeField:
+    """
+    Response field proxy that dumps validated models in Python mode, leaving
+    UUIDs and dates as objects for FastJSONResponse to encode natively
+    instead of converting them to strings first.
+    """
+
+    def __init__(self, field):
+        self._field = field
+
+    def __getattr__(self, name):
+        return getattr(self._field, name)
+
+    def serialize(self, value, **kwargs):
+        kwargs["mode"] = "python"
+        return self._field.serialize(value, **kwargs)
+
+
+def _media_qualities(accept: str) -> dict[str, float]:
+    qualities: dict[str, float] = {}
+    for part in accept.split(","):
+        media_type, *params = part.split(";")
+        q = 1.0
+        for param in params:
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qualities[media_type.strip().lower()] = q
+    return qualities
+
+
+def prefers_msgpack(accept: str) -> bool:
+    """
+    True if the client names MessagePack explicitly and ranks it at least as
+    high as JSON. Wildcards alone keep JSON, so browsers are unaffected.
+    """
+    qualities = _media_qualities(accept)
+    msgpack_q = max(qualities.get(name, 0.0) for name in MSGPACK_MEDIA_TYPES)
+    json_q = qualities.get(
+        "application/json",
+        qualities.get("application/*", qualities.get("*/*", 0.0)),
+    )
+    return msgpack_q > 0 and msgpack_q >= json_q
+
+
+class _MsgPackRequest(Request):
+    """
+    Request whose body is MessagePack. The content-type header is hidden so
+    FastAPI reads the body through json(), which decodes it here instead.
+    """
+
+    def __init__(self, request: Request):
+        scope = dict(request.scope)
+        scope["headers"] = [
+            (name, value)
+            for name, value in request.scope["headers"]
+            if name != b"content-type"
+        ]
+        super().__init__(scope, request.receive)
+
+    async def json(self):
+        if not hasattr(self, "_json"):
+            self._json = decode_msgpack(await self.body())
+        return self._json
+
+
+def _is_msgpack_body(request: Request) -> bool:
+    content_type = request.headers.get("content-type", "")
+    return content_type.partition(";")[0].strip().lower() in MSGPACK_MEDIA_TYPES
+
+
+class TimedRoute(APIRoute):
+    """
+    APIRoute that marks when the endpoint returns, so the time spent
+    serializing the response can be reported separately. Routes rendered
+    with FastJSONResponse dump their response model in Python mode.
+    """
+
+    def get_route_handler(self):
+        self.dependant.call = _mark_when_done(self.dependant.call)
+        if self.secure_cloned_response_field and issubclass(
+            _resolved(self.response_class), FastJSONResponse
+        ):
+            self.secure_cloned_response_field = _PythonModeField(
+                self.secure_cloned_response_field
+            )
+        return super().get_route_handler()
+
+
+class NegotiatedRoute(TimedRoute):
+    """
+    TimedRoute that also speaks MessagePack: responses are rendered as
+    msgpack when the Accept header prefers it, and msgpack request bodies
+    are validated against the same models as JSON ones. JSON stays the
+    default, and everything is JSON if msgpack is not installed.
+    """
+
+    def get_route_handler(self):
+        json_handler = super().get_route_handler()
+        if msgpack is None or not issubclass(
+            _resolved(self.response_class), FastJSONResponse
+        ):
+            return json_handler
+
+        msgpack_handler = get_request_handler(
+            dependant=self.dependant,
+            body_field=self.body_field,
+            status_code=self.status_code,
+            response_class=MsgPackResponse,
+            response_field=self.secure_cloned_response_field,
+            response_model_include=self.response_model_include,
+            response_model_exclude=self.response_model_exclude,
+            response_model_by_alias=self.response_model_by_alias,
+            response_model_exclude_unset=self.response_model_exclude_unset,
+            response_model_exclude_defaults=self.response_model_exclude_defaults,
+            response_model_exclude_none=self.response_model_exclude_none,
+            dependency_overrides_provider=self.dependency_overrides_provider,
+        )
+
+        async def handler(request: Request):
+            if self.body_field and _is_msgpack_body(request):
+                request = _MsgPackRequest(request)
+            try:
+                if prefers_msgpack(request.headers.get("accept", "")):
+                    response = await msgpack_handler(request)
+                else:
+                    response = await json_handler(request)
+            except HTTPException as e:
+                # Error responses are rendered from the exception's headers
+                headers = MutableHeaders(headers=e.headers)
+                headers.add_vary_header("Accept")
+                e.headers = dict(headers)
+                raise
+            response.headers.add_vary_header("Accept")
+            return response
+
+        return handler
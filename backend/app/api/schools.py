@@ -2,22 +2,46 @@ import logging
 import uuid
 
 from fastapi import APIRouter, Depends, HTTPException, Response
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.api import deps
-from app.core import security
+from app.api.routing import TimedRoute
+from app.core import school_directory, security
 from app.core.auth_helpers import get_user_permissions, set_access_cookie
-from app.db import get_db
+from app.db import get_async_db, get_db
 from app.models.membership import Membership, MembershipRole
 from app.models.role import Role
 from app.models.school import School
 from app.models.user import User
 from app.schemas.school import SchoolCreate, SchoolSchema
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 logger = logging.getLogger(__name__)
 
+# Suffixed slugs to try after the plain one is taken
+SLUG_RETRIES = 5
+
+
+def _insert_school(db: Session, name: str) -> School:
+    """
+    Insert a school under a unique slug. The unique constraint arbitrates
+    concurrent signups: a taken slug fails the insert, which is retried with
+    a random suffix. Must run before anything else is written in `db`.
+    """
+    slug = name.lower().replace(" ", "-")
+    for attempt in range(SLUG_RETRIES + 1):
+        candidate = slug if attempt == 0 else f"{slug}-{uuid.uuid4().hex[:4]}"
+        school = School(name=name, slug=candidate)
+        db.add(school)
+        try:
+            db.flush()
+            return school
+        except IntegrityError:
+            db.rollback()
+    raise HTTPException(status_code=409, detail="Could not allocate a school slug")
+
 
 @router.post("/", response_model=SchoolSchema)
 def create_school(
@@ -31,17 +55,12 @@ def create_school(
             status_code=400, detail="User already belongs to a school context"
         )
 
-    slug = school_in.name.lower().replace(" ", "-")
-    # Check if slug exists
-    if db.query(School).filter(School.slug == slug).first():
-        slug = f"{slug}-{uuid.uuid4().hex[:4]}"
+    user_id = current_user.id
 
     # Transaction
     try:
         # Create School
-        school = School(name=school_in.name, slug=slug)
-        db.add(school)
-        db.flush()  # Get school.id
+        school = _insert_school(db, school_in.name)
 
         # Get Admin Role ID (Optimized with Cache)
         admin_role_id = Role.get_id(db, Role.ADMIN)
@@ -54,7 +73,7 @@ def create_school(
             Role.stage_cache_update(db, Role.ADMIN, admin_role_id)
 
         # Create Membership
-        membership = Membership(user_id=current_user.id, school_id=school.id)
+        membership = Membership(user_id=user_id, school_id=school.id)
         db.add(membership)
         db.flush()  # Get membership.id
 
@@ -66,18 +85,28 @@ def create_school(
         db.refresh(school)
 
         # Refresh access token so new school context and permissions are available
-        school_id, perms, roles = get_user_permissions(db, current_user.id)
+        school_id, perms, roles, perm_epoch = get_user_permissions(db, user_id)
         access_token = security.create_access_token(
-            current_user.id,
+            user_id,
             school_id=school_id,
             perms=perms,
             roles=roles,
+            perm_epoch=perm_epoch,
         )
         set_access_cookie(response, access_token)
 
         return school
 
-    except SQLAlchemyError as e:
+    except SQLAlchemyError:
         db.rollback()
-        logger.error(f"Failed to create school: {e}")
+        logger.exception("Failed to create school")
         raise HTTPException(status_code=500, detail="Failed to create school") from None
+
+
+@router.get("/by-slug/{slug}", response_model=SchoolSchema)
+async def get_school_by_slug(slug: str, db: AsyncSession = Depends(get_async_db)):
+    """Public lookup for booking pages; served from the slug directory."""
+    school = await school_directory.get_by_slug(db, slug)
+    if not school:
+        raise HTTPException(status_code=404, detail="School not found")
+    return school
@@ -0,0 +1,201 @@
+import uuid
+from dataclasses import dataclass
+from itertools import chain
+
+from sqlalchemy import and_, bindparam, event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core import cache_epoch, permission_matrix
+from app.core.config import settings
+from app.core.transactional_cache import TransactionalCache
+from app.models.membership import Membership, MembershipRole
+from app.models.role import Role
+
+
+@dataclass(slots=True, frozen=True)
+class AuthSnapshot:
+    """
+    What authorization needs to know about one membership. A snapshot
+    without a membership records that the user has none.
+    """
+
+    user_id: uuid.UUID
+    membership_id: uuid.UUID | None
+    school_id: uuid.UUID | None
+    perm_epoch: int
+    roles: tuple[str, ...]
+    role_ids: tuple[int, ...]
+
+    @property
+    def permissions(self) -> frozenset[str]:
+        # Resolved on access, so permission changes to a role apply at once
+        return permission_matrix.current().for_roles(self.role_ids)
+
+    @property
+    def tags(self) -> tuple[tuple[str, uuid.UUID], ...]:
+        return (("user", self.user_id), ("membership", self.membership_id))
+
+
+_Key = tuple[uuid.UUID, uuid.UUID | None]
+_TABLES = frozenset({Membership.__table__, MembershipRole.__table__})
+# Other workers are told about membership changes per partition of users:
+# each commit bumps its users' cache_versions rows and resets that share of
+# their caches, rather than one row and the whole cache for every change
+_EPOCH_PARTITIONS = 64
+
+
+def _partition(user_id: uuid.UUID) -> int:
+    return user_id.int % _EPOCH_PARTITIONS
+
+
+# Snapshots per (user, school); school None is the user's first membership,
+# and is cached for users without one too. Evicted by tag once a commit
+# changed the user's memberships or roles.
+cache: TransactionalCache[_Key, AuthSnapshot] = TransactionalCache(
+    "auth_snapshots",
+    maxsize=settings.AUTH_CACHE_SIZE,
+    ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS,
+    tags=lambda snapshot: (*snapshot.tags, ("partition", _partition(snapshot.user_id))),
+    shared=AuthSnapshot,
+)
+_epochs = cache_epoch.register_partitions(
+    cache.namespace,
+    _EPOCH_PARTITIONS,
+    lambda partition: cache.evict_tags([("partition", partition)]),
+)
+
+_columns = select(
+    Membership.id, Membership.school_id, Membership.perm_epoch, Role.id, Role.name
+)
+
+
+def _snapshot_query(membership_match):
+    return (
+        _columns.select_from(Membership)
+        .outerjoin(MembershipRole, MembershipRole.membership_id == Membership.id)
+        .outerjoin(Role, Role.id == MembershipRole.role_id)
+        .where(
+            and_(
+                Membership.user_id == bindparam("user_id"),
+                Membership.deleted_at.is_(None),
+                membership_match,
+            )
+        )
+        .execution_options(soft_delete_applied=True)
+    )
+
+
+# Params: user_id, school_id. One row per role; none if not a member.
+SNAPSHOT_IN_SCHOOL = _snapshot_query(Membership.school_id == bindparam("school_id"))
+
+# Params: user_id. The user's first membership, as get_current_user defaults to.
+SNAPSHOT_FIRST_MEMBERSHIP = _snapshot_query(
+    Membership.id
+    == select(Membership.id)
+    .where(Membership.user_id == bindparam("user_id"), Membership.deleted_at.is_(None))
+    .limit(1)
+    .scalar_subquery()
+)
+
+
+def _statement(user_id: uuid.UUID, school_id: uuid.UUID | None):
+    if school_id:
+        return SNAPSHOT_IN_SCHOOL, {"user_id": user_id, "school_id": school_id}
+    return SNAPSHOT_FIRST_MEMBERSHIP, {"user_id": user_id}
+
+
+def store(key: _Key, rows, generation: int) -> AuthSnapshot | None:
+    """
+    Cache the snapshot built from `rows` (membership ID, school ID, epoch,
+    role ID, role name; none if not a member), loaded after `generation`
+    was read.
+    """
+    if not rows:
+        if key[1] is None:
+            # Bounded by the number of users, unlike misses for any school ID
+            cache.put(key, AuthSnapshot(key[0], None, None, 0, (), ()), generation)
+        return None
+    membership_id, school_id, perm_epoch, _, _ = rows[0]
+    roles = [(row[3], row[4]) for row in rows if row[3] is not None]
+    snapshot = AuthSnapshot(
+        user_id=key[0],
+        membership_id=membership_id,
+        school_id=school_id,
+        perm_epoch=perm_epoch,
+        roles=tuple(sorted(name for _, name in roles)),
+        role_ids=tuple(role_id for role_id, _ in roles),
+    )
+    cache.put(key, snapshot, generation)
+    if key[1] is None:
+        # Tokens issued from it name the school: serve those lookups too
+        cache.put((key[0], school_id), snapshot, generation)
+    return snapshot
+
+
+def lookup(
+    user_id: uuid.UUID, school_id: uuid.UUID | None
+) -> tuple[bool, AuthSnapshot | None]:
+    """
+    get_snapshot from the cache only: whether the answer was cached, and
+    the snapshot if the user is a member.
+    """
+    snapshot = cache.get((user_id, school_id))
+    if snapshot is None:
+        return False, None
+    return True, snapshot if snapshot.membership_id else None
+
+
+async def get_snapshot(
+    db: AsyncSession, user_id: uuid.UUID, school_id: uuid.UUID | None
+) -> AuthSnapshot | None:
+    """
+    The user's membership in `school_id` (their first one if None), or None
+    if they are not a member.
+    """
+    found, snapshot = lookup(user_id, school_id)
+    if found:
+        return snapshot
+    generation = cache.generation
+    result = await db.execute(*_statement(user_id, school_id))
+    return store((user_id, school_id), result.all(), generation)
+
+
+def get_snapshot_sync(
+    db: Session, user_id: uuid.UUID, school_id: uuid.UUID | None
+) -> AuthSnapshot | None:
+    """get_snapshot for the synchronous writer path."""
+    found, snapshot = lookup(user_id, school_id)
+    if found:
+        return snapshot
+    generation = cache.generation
+    rows = db.execute(*_statement(user_id, school_id)).all()
+    return store((user_id, school_id), rows, generation)
+
+
+@event.listens_for(Session, "after_flush")
+def _stage_changed_rows(session: Session, flush_context) -> None:
+    tags = set()
+    partitions = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, Membership):
+            tags.update((("user", obj.user_id), ("membership", obj.id)))
+            partitions.add(_partition(obj.user_id))
+        elif isinstance(obj, MembershipRole):
+            # Its membership's perm_epoch moved too, so it is flushed as well
+            tags.add(("membership", obj.membership_id))
+    if tags:
+        cache.stage_evict_tags(session, tags)
+    for partition in partitions:
+        cache_epoch.stage_bump(session, _epochs[partition])
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _stage_bulk_changes(execute_state) -> None:
+    # Core and bulk DML give no way to tell which rows changed
+    if (
+        execute_state.is_insert or execute_state.is_update or execute_state.is_delete
+    ) and getattr(execute_state.statement, "table", None) in _TABLES:
+        cache.stage_clear(execute_state.session)
+        for epoch in _epochs:
+            cache_epoch.stage_bump(execute_state.session, epoch)
@@ -2,42 +2,34 @@ import uuid
 from datetime import UTC, datetime
 
 from fastapi import Response
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session
 
+from app.core import auth_cache
 from app.core.config import settings
-from app.models.membership import Membership, MembershipRole
-from app.models.role import Role
 
 
 def get_user_permissions(
-    db: Session, user_id: uuid.UUID
-) -> tuple[uuid.UUID | None, list[str], list[str]]:
+    db: Session, user_id: uuid.UUID, school_id: uuid.UUID | None = None
+) -> tuple[uuid.UUID | None, list[str], list[str], int | None]:
     """
-    Fetch school_id, permissions, and roles for a user eagerly.
+    Fetch school_id, permissions, roles and the membership's perm_epoch for
+    a user: for `school_id` if given and still a member, else the first
+    membership.
     """
-    membership = (
-        db.query(Membership)
-        .options(
-            joinedload(Membership.roles)
-            .joinedload(MembershipRole.role)
-            .joinedload(Role.permissions),
-            joinedload(Membership.school),
-        )
-        .filter(Membership.user_id == user_id)
-        .first()
+    snapshot = None
+    if school_id:
+        snapshot = auth_cache.get_snapshot_sync(db, user_id, school_id)
+    if snapshot is None:
+        snapshot = auth_cache.get_snapshot_sync(db, user_id, None)
+    if snapshot is None:
+        return None, [], [], None
+    return (
+        snapshot.school_id,
+        sorted(snapshot.permissions),
+        list(snapshot.roles),
+        snapshot.perm_epoch,
     )
 
-    school_id = None
-    perms = []
-    roles = []
-
-    if membership:
-        school_id = membership.school_id
-        perms = membership.permissions
-        roles = [mr.role.name for mr in membership.roles if mr.role]
-
-    return school_id, perms, roles
-
 
 def set_access_cookie(response: Response, access_token: str) -> None:
     response.set_cookie(
@@ -0,0 +1,180 @@
+import asyncio
+import logging
+import threading
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from itertools import chain
+
+from sqlalchemy import Table, event, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.core.metrics import registry
+from app.models.cache_version import CacheVersion
+
+logger = logging.getLogger(__name__)
+
+# Process-local caches evict their own entries through session events, which
+# only fire in the worker that committed. For every other worker, a commit
+# that touches a registered cache's tables also bumps that cache's row in
+# cache_versions; workers poll the table and reset caches whose version moved.
+
+CACHE_RESETS = registry.counter(
+    "cache_epoch_resets",
+    "Process-local caches reset because their epoch moved",
+    ("cache",),
+)
+
+_versions = CacheVersion.__table__
+_PENDING_KEY = "_pending_cache_epoch_bumps"
+_BUMPED_KEY = "_bumped_cache_epochs"
+
+# Params: none
+VERSIONS = select(_versions.c.name, _versions.c.version)
+
+
+@dataclass(slots=True, frozen=True)
+class _Registration:
+    tables: frozenset[Table]
+    reset: Callable[[Connection], None]
+
+
+_registry: dict[str, _Registration] = {}
+# Version each cache was last known to be current for, per process. Polls
+# update it from a worker thread, commits from whichever thread committed.
+_seen: dict[str, int] = {}
+_seen_lock = threading.Lock()
+
+
+def register(
+    name: str, tables: Iterable[Table], reset: Callable[[Connection], None]
+) -> None:
+    """
+    Reset a process-local cache (given a connection, should it need to
+    reload) whenever another worker commits changes to `tables`.
+    """
+    _registry[name] = _Registration(frozenset(tables), reset)
+
+
+def register_partitions(
+    name: str, partitions: int, reset: Callable[[int], None]
+) -> list[str]:
+    """
+    Give one cache `partitions` epochs, "<name>:0" and so on, each resetting
+    only its part of the cache (`reset(i)`). The cache stages bumps of the
+    partitions a commit touched itself, so concurrent writers mostly bump
+    different rows and other workers drop only the entries concerned.
+    Returns the epoch names by partition.
+    """
+    names = [f"{name}:{i}" for i in range(partitions)]
+    for i, epoch in enumerate(names):
+        _registry[epoch] = _Registration(frozenset(), lambda conn, i=i: reset(i))
+    return names
+
+
+def stage_bump(session: Session, name: str) -> None:
+    """Move `name`'s epoch once `session`'s transaction commits."""
+    session.info.setdefault(_PENDING_KEY, set()).add(name)
+
+
+def _stage_tables(session: Session, tables: set) -> None:
+    for name, registration in _registry.items():
+        if not registration.tables.isdisjoint(tables):
+            stage_bump(session, name)
+
+
+def poll(bind: Engine | Connection) -> list[str]:
+    """Reset every registered cache whose epoch moved; returns their names."""
+    if isinstance(bind, Engine):
+        with bind.connect() as conn:
+            return poll(conn)
+
+    changed = []
+    for name, version in bind.execute(VERSIONS).all():
+        registration = _registry.get(name)
+        with _seen_lock:
+            if registration is None or _seen.get(name) == version:
+                continue
+        registration.reset(bind)
+        with _seen_lock:
+            # A local commit may have advanced it past `version` meanwhile
+            if _seen.get(name, 0) < version:
+                _seen[name] = version
+        CACHE_RESETS.labels(name).inc()
+        changed.append(name)
+    return changed
+
+
+async def run(bind: Engine, interval_seconds: float) -> None:
+    """
+    Poll in a worker thread on a fixed interval until cancelled. `bind`
+    should be a reader: on the production SQLite profile every transaction
+    of the writer engine takes the database write lock.
+    """
+    while True:
+        try:
+            changed = await asyncio.to_thread(poll, bind)
+            if changed:
+                logger.info("Reset caches changed elsewhere: %s", ", ".join(changed))
+        except Exception:
+            logger.exception("Cache epoch poll failed")
+        await asyncio.sleep(interval_seconds)
+
+
+@event.listens_for(Session, "after_flush")
+def _stage_flushed_tables(session: Session, flush_context) -> None:
+    tables = {
+        obj.__table__ for obj in chain(session.new, session.dirty, session.deleted)
+    }
+    if tables:
+        _stage_tables(session, tables)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _stage_dml_table(execute_state) -> None:
+    if execute_state.is_insert or execute_state.is_update or execute_state.is_delete:
+        table = getattr(execute_state.statement, "table", None)
+        if table is not None:
+            _stage_tables(execute_state.session, {table})
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_staged(session: Session) -> None:
+    # Commit flushes only after this hook; flush now so its changes count
+    session.flush()
+    names = session.info.pop(_PENDING_KEY, None)
+    if not names:
+        return
+
+    # One upsert: a cache's first bump creates its row, and workers racing
+    # to create the same row both succeed instead of one violating the key
+    dialect = postgresql if session.get_bind().dialect.name == "postgresql" else sqlite
+    stmt = dialect.insert(_versions).values(
+        [{"name": name, "version": 1} for name in sorted(names)]
+    )
+    bumped = dict(
+        session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[_versions.c.name],
+                set_={"version": _versions.c.version + 1},
+            ).returning(_versions.c.name, _versions.c.version)
+        ).all()
+    )
+    session.info[_BUMPED_KEY] = bumped
+
+
+@event.listens_for(Session, "after_commit")
+def _advance_seen(session: Session) -> None:
+    # This worker already evicted what the commit changed. Skip its own bump
+    # on the next poll, unless another worker's bump is still unseen.
+    for name, version in session.info.pop(_BUMPED_KEY, {}).items():
+        with _seen_lock:
+            if _seen.get(name) == version - 1:
+                _seen[name] = version
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+    session.info.pop(_BUMPED_KEY, None)
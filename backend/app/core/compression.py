@@ -0,0 +1,187 @@
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+
+class _GzipCompressor:
+    def __init__(self, level: int):
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        mode = zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH
+        return self._obj.compress(data) + self._obj.flush(mode)
+
+
+class _BrotliCompressor:
+    def __init__(self, level: int):
+        self._obj = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        out = self._obj.process(data)
+        return out + (self._obj.finish() if final else self._obj.flush())
+
+
+class _ZstdCompressor:
+    def __init__(self, level: int):
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        mode = (
+            zstandard.COMPRESSOBJ_FLUSH_FINISH
+            if final
+            else zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        )
+        return self._obj.compress(data) + self._obj.flush(mode)
+
+
+# Server preference order; brotli and zstd only when their package is installed
+CODECS = {
+    name: codec
+    for name, codec, available in (
+        ("zstd", _ZstdCompressor, zstandard is not None),
+        ("br", _BrotliCompressor, brotli is not None),
+        ("gzip", _GzipCompressor, True),
+    )
+    if available
+}
+
+# Content-type prefix -> level per encoding. Types not listed are sent as is.
+DEFAULT_LEVELS: dict[str, dict[str, int]] = {
+    "application/json": {"gzip": 6, "br": 5, "zstd": 3},
+    "text/": {"gzip": 6, "br": 5, "zstd": 3},
+    "application/javascript": {"gzip": 6, "br": 5, "zstd": 3},
+    "application/msgpack": {"gzip": 6, "br": 5, "zstd": 3},
+}
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    """Pick the preferred available encoding the client accepts (q > 0)."""
+    accepted: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                continue
+        accepted[name.strip().lower()] = q
+
+    wildcard = accepted.get("*", 0.0)
+    for name in CODECS:
+        if accepted.get(name, wildcard) > 0:
+            return name
+    return None
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses with the best encoding the client accepts.
+
+    Bodies smaller than `minimum_size` are sent as is. Streaming bodies are
+    compressed and flushed chunk by chunk, so they stay streaming.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        levels: dict[str, dict[str, int]] | None = None,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = DEFAULT_LEVELS if levels is None else levels
+
+    def _level(self, content_type: str, encoding: str) -> int | None:
+        content_type = content_type.partition(";")[0].strip().lower()
+        for prefix, levels in self.levels.items():
+            if content_type.startswith(prefix):
+                return levels.get(encoding)
+        return None
+
+    def _compressor_for(self, start: Message, first: Message, encoding: str):
+        """
+        Decide from the response start and its first body chunk whether to
+        compress, updating the start headers to match.
+        """
+        headers = MutableHeaders(scope=start)
+        level = self._level(headers.get("content-type", ""), encoding)
+        if (
+            level is None
+            or "content-encoding" in headers
+            or "no-transform" in headers.get("cache-control", "")
+        ):
+            return None
+        headers.add_vary_header("Accept-Encoding")
+
+        length = headers.get("content-length")
+        if length is not None:
+            size = int(length)
+        elif first.get("more_body", False):
+            size = None  # streaming with unknown length
+        else:
+            size = len(first.get("body", b""))
+        if size is not None and size < self.minimum_size:
+            return None
+
+        headers["Content-Encoding"] = encoding
+        del headers["Content-Length"]
+        return CODECS[encoding](level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+        compressor = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, compressor
+            if message["type"] == "http.response.start":
+                # Held back until the first body chunk shows the size
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            if start is not None:
+                pending, start = start, None
+                compressor = self._compressor_for(pending, message, encoding)
+                if compressor is not None and not message.get("more_body", False):
+                    # Whole body known up front: send a real length
+                    data = compressor.compress(message.get("body", b""), final=True)
+                    MutableHeaders(scope=pending)["Content-Length"] = str(len(data))
+                    await send(pending)
+                    await send({"type": "http.response.body", "body": data})
+                    return
+                await send(pending)
+
+            if compressor is None:
+                await send(message)
+                return
+            more_body = message.get("more_body", False)
+            data = compressor.compress(message.get("body", b""), final=not more_body)
+            await send(
+                {"type": "http.response.body", "body": data, "more_body": more_body}
+            )
+
+        await self.app(scope, receive, send_compressed)
@@ -15,6 +15,50 @@ class Settings(BaseSettings):
     SECURE_COOKIES: bool = False
     DB_POOL_SIZE: int = 5
     DB_MAX_OVERFLOW: int = 10
+    SLOW_QUERY_THRESHOLD_MS: int = 200
+    # /health/ready serves the last background probe; it fails if the DB is
+    # unreachable or a pool has fewer free connections than the minimum
+    HEALTH_PROBE_INTERVAL_SECONDS: float = 5.0
+    HEALTH_MIN_POOL_HEADROOM: int = 0
+    # Per (user, school) authorization snapshots; evicted on commit anyway
+    AUTH_CACHE_SIZE: int = 10000
+    AUTH_CACHE_TTL_SECONDS: float = 60.0
+    # Entry bounds of the school and user directories
+    SCHOOL_CACHE_SIZE: int = 10000
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL_SECONDS: float = 300.0
+    # Second-level cache shared by the workers of a host, in a file mapped
+    # into each of them (e.g. /dev/shm/riding-school-cache, suffixed with the
+    # slot layout below); empty disables
+    SHARED_CACHE_PATH: str = ""
+    SHARED_CACHE_SLOTS: int = 16384
+    SHARED_CACHE_SLOT_BYTES: int = 512
+    # How often each worker checks whether another one invalidated its
+    # process-local caches; 0 disables polling (single worker)
+    CACHE_EPOCH_POLL_SECONDS: float = 2.0
+    # Logs go through a bounded queue to a writer thread; below WARNING, only
+    # LOG_INFO_SAMPLE_RATE of records are kept
+    LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = True
+    LOG_INFO_SAMPLE_RATE: float = 1.0
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_BATCH_SIZE: int = 100
+    # Responses smaller than this are not compressed
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+
+    # SQLite deployment profile: "default" or "production"
+    SQLITE_PROFILE: str = "default"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE_KB: int = 64 * 1024
+
+    # Soft-delete purge; PURGE_INTERVAL_SECONDS=0 disables the in-process task
+    SOFT_DELETE_RETENTION_DAYS: int = 30
+    PURGE_BATCH_SIZE: int = 500
+    PURGE_INTERVAL_SECONDS: int = 0
+    # Purged rows are copied here first; empty disables archiving
+    ARCHIVE_DIR: str = ""
+    ARCHIVE_SEGMENT_BYTES: int = 64 * 1024 * 1024
 
     # Rate Limiting
     RATE_LIMIT_REGISTER_REQUESTS: int = 5
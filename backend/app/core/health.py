@@ -0,0 +1,95 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True, frozen=True)
+class HealthStatus:
+    ready: bool
+    database: str
+    # Free connections per pool; None where the pool is unbounded or its
+    # overflow was not configured
+    pool_headroom: dict[str, int | None] = field(default_factory=dict)
+    checked_at: float = 0.0
+
+
+_STARTING = HealthStatus(ready=False, database="not checked yet")
+
+
+def pool_headroom(engine: Engine, max_overflow: int | None) -> int | None:
+    """
+    Connections the engine's pool can still hand out, given the
+    `max_overflow` it was created with (None if not configured).
+    """
+    pool = engine.pool
+    if not isinstance(pool, QueuePool) or max_overflow is None or max_overflow < 0:
+        return None
+    return pool.size() + max_overflow - pool.checkedout()
+
+
+class HealthProber:
+    """
+    Checks the database over its own connection and the app pools' headroom
+    on a fixed schedule. Readiness requests only read the last result, so
+    they never wait on, or take a connection from, request traffic.
+    """
+
+    def __init__(
+        self,
+        probe_engine: Engine,
+        pools: dict[str, tuple[Engine, int | None]],
+        interval_seconds: float = 5.0,
+        min_headroom: int = 0,
+    ):
+        self.probe_engine = probe_engine
+        self.pools = pools
+        self.interval_seconds = interval_seconds
+        self.min_headroom = min_headroom
+        self._status = _STARTING
+
+    def check(self) -> HealthStatus:
+        try:
+            with self.probe_engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            database = "connected"
+        except Exception as e:
+            logger.warning("Health probe failed: %s", e)
+            database = str(e)
+
+        headroom = {
+            name: pool_headroom(engine, max_overflow)
+            for name, (engine, max_overflow) in self.pools.items()
+        }
+        ready = database == "connected" and all(
+            free is None or free >= self.min_headroom for free in headroom.values()
+        )
+        self._status = HealthStatus(ready, database, headroom, time.monotonic())
+        return self._status
+
+    def status(self) -> HealthStatus:
+        """
+        The last probe result. A result older than three intervals means the
+        probe itself is stuck, which is reported as not ready.
+        """
+        current = self._status
+        if (
+            current.ready
+            and time.monotonic() - current.checked_at > 3 * self.interval_seconds
+        ):
+            return HealthStatus(
+                False, "probe stale", current.pool_headroom, current.checked_at
+            )
+        return current
+
+    async def run(self) -> None:
+        """Probe in a worker thread on a fixed interval until cancelled."""
+        while True:
+            await asyncio.to_thread(self.check)
+            await asyncio.sleep(self.interval_seconds)
@@ -0,0 +1,174 @@
+import copy
+import logging
+import queue
+import random
+import sys
+from contextvars import ContextVar
+from datetime import UTC, datetime
+from logging.handlers import QueueHandler, QueueListener
+
+import orjson
+
+from .metrics import registry
+
+LOG_RECORDS_DROPPED = registry.counter(
+    "log_records_dropped",
+    "Log records dropped because the logging queue was full",
+)
+
+request_id: ContextVar[str | None] = ContextVar("request_id", default=None)
+
+# LogRecord attributes that are not user-supplied `extra` fields
+_RECORD_ATTRS = frozenset(logging.LogRecord("", 0, "", 0, "", (), None).__dict__) | {
+    "message",
+    "asctime",
+    "request_id",
+    "taskName",
+}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, including any `extra` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, UTC),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return orjson.dumps(entry, default=str, option=orjson.OPT_UTC_Z).decode()
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps a `rate` share of records below WARNING. Warnings and errors are
+    always kept.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return (
+            record.levelno >= logging.WARNING
+            or self.rate >= 1
+            or random.random() < self.rate
+        )
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Hands records to the listener thread, which formats them. If the queue
+    is full the record is dropped and counted rather than waited on.
+    """
+
+    _exc_formatter = logging.Formatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        # The request ID lives in a contextvar the listener thread cannot see
+        record.request_id = request_id.get()
+        # Render arguments and tracebacks here: by the time the listener gets
+        # to them they may have changed, or be ORM objects whose session
+        # belongs to this thread
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = self._exc_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+
+class BatchingStreamHandler(logging.StreamHandler):
+    """
+    Buffers formatted records and writes them to the stream in one call
+    once `batch_size` are pending, or when the queue runs dry.
+    """
+
+    def __init__(self, stream=None, batch_size: int = 100):
+        super().__init__(stream)
+        self.batch_size = batch_size
+        self._pending: list[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self._pending.append(self.format(record))
+        except Exception:
+            self.handleError(record)
+            return
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        with self.lock:
+            if not self._pending:
+                return
+            lines, self._pending = self._pending, []
+            self.stream.write(self.terminator.join(lines) + self.terminator)
+            self.stream.flush()
+
+
+class BatchingQueueListener(QueueListener):
+    """QueueListener that flushes its handlers whenever the queue is empty."""
+
+    def dequeue(self, block: bool):
+        try:
+            return self.queue.get_nowait()
+        except queue.Empty:
+            for handler in self.handlers:
+                handler.flush()
+            return self.queue.get(block)
+
+    def stop(self) -> None:
+        super().stop()
+        for handler in self.handlers:
+            handler.flush()
+
+
+def configure_logging(
+    level: str = "INFO",
+    json: bool = True,
+    sample_rate: float = 1.0,
+    queue_size: int = 10000,
+    batch_size: int = 100,
+    stream=None,
+) -> BatchingQueueListener:
+    """
+    Route root logging through a bounded queue to a background writer
+    thread. Returns the started listener; call stop() on shutdown to drain it.
+    """
+    handler = BatchingStreamHandler(stream or sys.stderr, batch_size=batch_size)
+    handler.setFormatter(
+        JsonFormatter()
+        if json
+        else logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+    )
+    listener = BatchingQueueListener(queue.Queue(queue_size), handler)
+
+    queue_handler = NonBlockingQueueHandler(listener.queue)
+    queue_handler.addFilter(SamplingFilter(sample_rate))
+    root = logging.getLogger()
+    for existing in [h for h in root.handlers if isinstance(h, QueueHandler)]:
+        root.removeHandler(existing)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    listener.start()
+    return listener
@@ -0,0 +1,379 @@
+import bisect
+import threading
+from collections.abc import Callable, Iterable
+
+# Latency buckets in seconds, tuned for in-process DB and HTTP timings.
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    parts = []
+    for key, value in labels.items():
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"')
+        parts.append(f'{key}="{escaped}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple, _Metric] = {}
+        self._children_lock = threading.Lock()
+
+    def labels(self, *values: str):
+        """
+        Return the child metric for this combination of label values.
+        """
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._children_lock:
+                child = self._children.get(key)
+                if child is None:
+                    child = self._new_child()
+                    self._children[key] = child
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _own_samples(self) -> Iterable[tuple[str, dict[str, str], float]]:
+        raise NotImplementedError
+
+    def samples(self) -> Iterable[tuple[str, dict[str, str], float]]:
+        if not self.labelnames:
+            yield from self._own_samples()
+            return
+        for key, child in list(self._children.items()):
+            base = dict(zip(self.labelnames, key, strict=True))
+            for name, labels, value in child._own_samples():
+                yield name, {**base, **labels}, value
+
+    def reset(self) -> None:
+        for child in list(self._children.values()):
+            child.reset()
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        super().__init__(name, documentation, labelnames)
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        return Counter(self.name, self.documentation)
+
+    def inc(self, amount: int = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+    def reset(self) -> None:
+        super().reset()
+        with self._lock:
+            self._value = 0
+
+    def _own_samples(self):
+        yield f"{self.name}_total", {}, self._value
+
+
+class Gauge(_Metric):
+    """
+    Gauge that is either set directly or read from a callback at collection time.
+    """
+
+    type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple = (),
+        callback: Callable[[], float] = None,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self._callback = callback
+        self._value = 0
+
+    def _new_child(self):
+        return Gauge(self.name, self.documentation)
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    def set_function(self, callback: Callable[[], float]) -> None:
+        self._callback = callback
+
+    @property
+    def value(self) -> float:
+        if self._callback is not None:
+            return self._callback()
+        return self._value
+
+    def reset(self) -> None:
+        super().reset()
+        self._value = 0
+
+    def _own_samples(self):
+        yield self.name, {}, self.value
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # One extra slot for observations above the largest bucket (+Inf)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+
+    def _new_child(self):
+        return Histogram(self.name, self.documentation, buckets=self.buckets)
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def sum(self) -> float:
+        return self._sum
+
+    def reset(self) -> None:
+        super().reset()
+        with self._lock:
+            self._counts = [0] * (len(self.buckets) + 1)
+            self._sum = 0.0
+            self._count = 0
+
+    def _own_samples(self):
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts, strict=False):
+            cumulative += bucket_count
+            yield f"{self.name}_bucket", {"le": _format_value(bound)}, cumulative
+        yield f"{self.name}_bucket", {"le": "+Inf"}, count
+        yield f"{self.name}_sum", {}, total
+        yield f"{self.name}_count", {}, count
+
+
+class _Shards:
+    """
+    Per-thread value lists for metrics on hot paths. Each thread only ever
+    writes its own list, so updates need no lock; collection sums the lists.
+    """
+
+    def __init__(self, width: int):
+        self._width = width
+        self._local = threading.local()
+        self._all: list[list] = []
+        self._lock = threading.Lock()
+
+    def get(self) -> list:
+        try:
+            return self._local.values
+        except AttributeError:
+            values = [0] * self._width
+            with self._lock:
+                self._all.append(values)
+            self._local.values = values
+            return values
+
+    def totals(self) -> list:
+        totals = [0] * self._width
+        with self._lock:
+            shards = list(self._all)
+        for values in shards:
+            for i, value in enumerate(values):
+                totals[i] += value
+        return totals
+
+    def reset(self) -> None:
+        with self._lock:
+            for values in self._all:
+                values[:] = [0] * self._width
+
+
+class ShardedCounter(Counter):
+    """Counter whose increments go to a per-thread shard without locking."""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        super().__init__(name, documentation, labelnames)
+        self._shards = _Shards(1)
+
+    def _new_child(self):
+        return ShardedCounter(self.name, self.documentation)
+
+    def inc(self, amount: int = 1) -> None:
+        self._shards.get()[0] += amount
+
+    @property
+    def value(self) -> int:
+        return self._shards.totals()[0]
+
+    def reset(self) -> None:
+        super().reset()
+        self._shards.reset()
+
+    def _own_samples(self):
+        yield f"{self.name}_total", {}, self.value
+
+
+class ShardedHistogram(Histogram):
+    """Histogram whose observations go to a per-thread shard without locking."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames, buckets)
+        # Bucket counts, then the +Inf slot, then the sum
+        self._shards = _Shards(len(self.buckets) + 2)
+
+    def _new_child(self):
+        return ShardedHistogram(self.name, self.documentation, buckets=self.buckets)
+
+    def observe(self, value: float) -> None:
+        values = self._shards.get()
+        values[bisect.bisect_left(self.buckets, value)] += 1
+        values[-1] += value
+
+    @property
+    def count(self) -> int:
+        return sum(self._shards.totals()[:-1])
+
+    @property
+    def sum(self) -> float:
+        return self._shards.totals()[-1]
+
+    def reset(self) -> None:
+        super().reset()
+        self._shards.reset()
+
+    def _own_samples(self):
+        totals = self._shards.totals()
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, totals, strict=False):
+            cumulative += bucket_count
+            yield f"{self.name}_bucket", {"le": _format_value(bound)}, cumulative
+        count = sum(totals[:-1])
+        yield f"{self.name}_bucket", {"le": "+Inf"}, count
+        yield f"{self.name}_sum", {}, float(totals[-1])
+        yield f"{self.name}_count", {}, count
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric):
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple = (),
+        sharded: bool = False,
+    ) -> Counter:
+        cls = ShardedCounter if sharded else Counter
+        return self.register(cls(name, documentation, labelnames))
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple = (),
+        callback: Callable[[], float] = None,
+    ) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, callback))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+        sharded: bool = False,
+    ) -> Histogram:
+        cls = ShardedHistogram if sharded else Histogram
+        return self.register(cls(name, documentation, labelnames, buckets))
+
+    def get(self, name: str):
+        return self._metrics.get(name)
+
+    def reset(self) -> None:
+        for metric in self._metrics.values():
+            metric.reset()
+
+    def render(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format.
+        """
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for sample_name, labels, value in metric.samples():
+                lines.append(
+                    f"{sample_name}{_format_labels(labels)} {_format_value(value)}"
+                )
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,109 @@
+from collections.abc import Iterable, Mapping
+from itertools import chain
+from types import MappingProxyType
+
+from sqlalchemy import event, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.core import cache_epoch
+from app.models.permission import Permission
+from app.models.role import Role, role_permissions
+
+# Tables whose changes invalidate the matrix
+_RBAC_TABLES = frozenset({Role.__table__, Permission.__table__, role_permissions})
+_PENDING_KEY = "_pending_permission_matrix_rebuild"
+
+
+class PermissionMatrix:
+    """
+    Immutable role ID -> permission names mapping. Never modified in place:
+    a rebuild swaps in a new instance, so readers need no lock.
+    """
+
+    __slots__ = ("_by_role",)
+
+    def __init__(self, by_role: Mapping[int, frozenset[str]]):
+        self._by_role = MappingProxyType(dict(by_role))
+
+    def for_role(self, role_id: int) -> frozenset[str]:
+        return self._by_role.get(role_id, frozenset())
+
+    def for_roles(self, role_ids: Iterable[int]) -> frozenset[str]:
+        return frozenset().union(*(self.for_role(role_id) for role_id in role_ids))
+
+
+_current = PermissionMatrix({})
+
+# Params: none
+MATRIX_ROWS = select(role_permissions.c.role_id, Permission.name).join(
+    Permission, Permission.id == role_permissions.c.permission_id
+)
+
+
+def current() -> PermissionMatrix:
+    return _current
+
+
+def load(bind: Engine | Connection) -> PermissionMatrix:
+    """Build the matrix from the database and make it current."""
+    global _current
+    if isinstance(bind, Engine):
+        with bind.connect() as conn:
+            rows = conn.execute(MATRIX_ROWS).all()
+    else:
+        rows = bind.execute(MATRIX_ROWS).all()
+
+    by_role: dict[int, set[str]] = {}
+    for role_id, name in rows:
+        by_role.setdefault(role_id, set()).add(name)
+    _current = PermissionMatrix(
+        {role_id: frozenset(names) for role_id, names in by_role.items()}
+    )
+    return _current
+
+
+cache_epoch.register("permission_matrix", _RBAC_TABLES, load)
+
+
+def stage_rebuild(db: Session) -> None:
+    """Rebuild the matrix once `db`'s transaction has committed."""
+    db.info[_PENDING_KEY] = "staged"
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _stage_on_dml(execute_state) -> None:
+    # Core inserts from the seed, and ORM bulk statements, skip the flush
+    if (
+        execute_state.is_insert or execute_state.is_update or execute_state.is_delete
+    ) and getattr(execute_state.statement, "table", None) in _RBAC_TABLES:
+        stage_rebuild(execute_state.session)
+
+
+@event.listens_for(Session, "after_flush")
+def _stage_on_flush(session: Session, flush_context) -> None:
+    if any(
+        isinstance(obj, Role | Permission)
+        for obj in chain(session.new, session.dirty, session.deleted)
+    ):
+        stage_rebuild(session)
+
+
+@event.listens_for(Session, "after_commit")
+def _mark_committed(session: Session) -> None:
+    if session.info.get(_PENDING_KEY) == "staged":
+        session.info[_PENDING_KEY] = "committed"
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _rebuild_committed(session: Session, transaction) -> None:
+    # SQL cannot be emitted in after_commit; by now the session has also
+    # returned its connection, so a single-connection pool cannot deadlock.
+    if transaction.parent is None and session.info.get(_PENDING_KEY) == "committed":
+        del session.info[_PENDING_KEY]
+        load(session.get_bind())
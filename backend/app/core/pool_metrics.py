@@ -0,0 +1,111 @@
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from .metrics import registry
+
+POOL_LABELS = ("pool",)
+
+POOL_CHECKOUT_WAIT = registry.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection",
+    POOL_LABELS,
+)
+POOL_CHECKOUT_TIMEOUTS = registry.counter(
+    "db_pool_checkout_timeouts",
+    "Checkouts that gave up after pool_timeout",
+    POOL_LABELS,
+)
+POOL_CHECKOUTS = registry.counter(
+    "db_pool_checkouts",
+    "Connections handed out by the pool",
+    POOL_LABELS,
+)
+POOL_CONNECTS = registry.counter(
+    "db_pool_connects",
+    "New DBAPI connections opened by the pool",
+    POOL_LABELS,
+)
+POOL_PRE_PING_RECONNECTS = registry.counter(
+    "db_pool_pre_ping_reconnects",
+    "Stale connections replaced after a failed pool_pre_ping",
+    POOL_LABELS,
+)
+POOL_INVALIDATIONS = registry.counter(
+    "db_pool_invalidations",
+    "Pooled connections invalidated for any reason",
+    POOL_LABELS,
+)
+POOL_SIZE = registry.gauge("db_pool_size", "Configured pool size", POOL_LABELS)
+POOL_IN_USE = registry.gauge(
+    "db_pool_connections_in_use", "Checked out connections", POOL_LABELS
+)
+POOL_OVERFLOW = registry.gauge(
+    "db_pool_overflow",
+    "Connections open beyond pool_size (negative while the pool is warming up)",
+    POOL_LABELS,
+)
+
+
+class _InstrumentedPoolMixin:
+    """
+    Records how long callers wait for a connection, labelled by `pool_name`.
+    """
+
+    pool_name = "default"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            POOL_CHECKOUT_TIMEOUTS.labels(self.pool_name).inc()
+            raise
+        finally:
+            POOL_CHECKOUT_WAIT.labels(self.pool_name).observe(
+                time.perf_counter() - start
+            )
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.pool_name = self.pool_name
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncAdaptedQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def instrument_engine_pool(engine: Engine, name: str = "default") -> None:
+    """
+    Attach pool event listeners and point the pool gauges at this engine.
+    """
+    pool = engine.pool
+    pool.pool_name = name
+
+    @event.listens_for(pool, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        POOL_CONNECTS.labels(name).inc()
+
+    @event.listens_for(pool, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        POOL_CHECKOUTS.labels(name).inc()
+
+    @event.listens_for(pool, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        POOL_INVALIDATIONS.labels(name).inc()
+        # pool_pre_ping reports a dead connection as a DisconnectionError
+        # and transparently reconnects it before handing it out.
+        if isinstance(exception, exc.DisconnectionError):
+            POOL_PRE_PING_RECONNECTS.labels(name).inc()
+
+    if isinstance(pool, QueuePool):
+        POOL_SIZE.labels(name).set_function(lambda: engine.pool.size())
+        POOL_IN_USE.labels(name).set_function(lambda: engine.pool.checkedout())
+        POOL_OVERFLOW.labels(name).set_function(lambda: engine.pool.overflow())
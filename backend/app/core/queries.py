@@ -0,0 +1,64 @@
+from sqlalchemy import bindparam, select
+from sqlalchemy.orm import joinedload
+
+from app.models.membership import Membership, MembershipRole
+from app.models.rider_profile import RiderProfile
+from app.models.school import School  # noqa: F401
+from app.models.user import User
+
+# Statements here are built once with named bind parameters, so executions
+# reuse the memoized cache key and the engine's compiled cache. They filter
+# deleted_at themselves and tell the soft-delete hook not to clone them.
+# Eager-load options configure the mappers, hence the extra model imports.
+_PREBUILT = {"soft_delete_applied": True}
+
+USER_BY_ID = (
+    select(User).where(User.id == bindparam("user_id")).execution_options(**_PREBUILT)
+)
+
+# Permissions come from the in-memory matrix by role ID, so only role names
+# are loaded here.
+_membership_with_roles = select(Membership).options(
+    joinedload(Membership.roles).joinedload(MembershipRole.role),
+    joinedload(Membership.school),
+)
+
+# Params: user_id, school_id
+MEMBERSHIP_WITH_ROLES = _membership_with_roles.where(
+    Membership.user_id == bindparam("user_id"),
+    Membership.school_id == bindparam("school_id"),
+    Membership.deleted_at.is_(None),
+).execution_options(**_PREBUILT)
+
+# Params: user_id
+FIRST_MEMBERSHIP_WITH_ROLES = (
+    _membership_with_roles.where(
+        Membership.user_id == bindparam("user_id"),
+        Membership.deleted_at.is_(None),
+    )
+    .limit(1)
+    .execution_options(**_PREBUILT)
+)
+
+# Params: user_id, school_id
+MEMBERSHIP_BY_USER_SCHOOL = (
+    select(Membership)
+    .where(
+        Membership.user_id == bindparam("user_id"),
+        Membership.school_id == bindparam("school_id"),
+        Membership.deleted_at.is_(None),
+    )
+    .execution_options(**_PREBUILT)
+)
+
+# Params: rider_id, school_id
+RIDER_PROFILE_WITH_USER = (
+    select(RiderProfile)
+    .options(joinedload(RiderProfile.user))
+    .where(
+        RiderProfile.id == bindparam("rider_id"),
+        RiderProfile.school_id == bindparam("school_id"),
+        RiderProfile.deleted_at.is_(None),
+    )
+    .execution_options(**_PREBUILT)
+)
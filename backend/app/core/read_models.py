@@ -0,0 +1,178 @@
+import uuid
+from dataclasses import dataclass
+from datetime import date
+
+from sqlalchemy import Row, and_, bindparam, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.membership import Membership, MembershipRole
+from app.models.rider_profile import RiderProfile
+from app.models.role import Role
+from app.models.school import School
+from app.models.user import User
+
+# Read-only GET paths select plain columns and build these slotted records
+# directly from the result rows: no identity map, instance state or
+# relationship collections. Response schemas validate them from attributes.
+
+
+@dataclass(slots=True, frozen=True)
+class RiderRead:
+    id: uuid.UUID
+    user_id: uuid.UUID
+    first_name: str
+    last_name: str
+    email: str | None
+    height_cm: float | None
+    weight_kg: float | None
+    date_of_birth: date | None
+    school_id: uuid.UUID
+
+
+@dataclass(slots=True, frozen=True)
+class SchoolRead:
+    id: uuid.UUID
+    name: str
+    slug: str
+
+
+@dataclass(slots=True, frozen=True)
+class UserRead:
+    id: uuid.UUID
+    first_name: str
+    last_name: str
+    email: str | None
+
+
+@dataclass(slots=True, frozen=True)
+class MeRead:
+    id: uuid.UUID
+    first_name: str
+    last_name: str
+    email: str | None
+    school_id: uuid.UUID | None
+    school: SchoolRead | None
+    roles: list[str]
+
+
+_PREBUILT = {"soft_delete_applied": True}
+
+_rider_columns = select(
+    RiderProfile.id,
+    RiderProfile.user_id,
+    User.first_name,
+    User.last_name,
+    User.email,
+    RiderProfile.height_cm,
+    RiderProfile.weight_kg,
+    RiderProfile.date_of_birth,
+    RiderProfile.school_id,
+).join(User, RiderProfile.user_id == User.id)
+
+# Params: school_id
+RIDERS_BY_SCHOOL = _rider_columns.where(
+    RiderProfile.school_id == bindparam("school_id"),
+    RiderProfile.deleted_at.is_(None),
+).execution_options(**_PREBUILT)
+
+# Params: rider_id, school_id
+RIDER_BY_ID = _rider_columns.where(
+    RiderProfile.id == bindparam("rider_id"),
+    RiderProfile.school_id == bindparam("school_id"),
+    RiderProfile.deleted_at.is_(None),
+).execution_options(**_PREBUILT)
+
+_me_columns = select(
+    User.id,
+    User.first_name,
+    User.last_name,
+    User.email,
+    Membership.id,
+    Membership.perm_epoch,
+    School.id,
+    School.name,
+    School.slug,
+    Role.id,
+    Role.name,
+)
+
+
+def _me_query(membership_match):
+    return (
+        _me_columns.select_from(User)
+        .outerjoin(
+            Membership,
+            and_(
+                Membership.user_id == User.id,
+                Membership.deleted_at.is_(None),
+                membership_match,
+            ),
+        )
+        .outerjoin(School, School.id == Membership.school_id)
+        .outerjoin(MembershipRole, MembershipRole.membership_id == Membership.id)
+        .outerjoin(Role, Role.id == MembershipRole.role_id)
+        .where(User.id == bindparam("user_id"))
+        .execution_options(**_PREBUILT)
+    )
+
+
+# Params: user_id, school_id. One row per role; membership and school
+# columns are NULL if the user is not a member.
+ME_IN_SCHOOL = _me_query(Membership.school_id == bindparam("school_id"))
+
+# Params: user_id. Falls back to the user's first membership.
+ME_FIRST_MEMBERSHIP = _me_query(
+    Membership.id
+    == select(Membership.id)
+    .where(Membership.user_id == User.id, Membership.deleted_at.is_(None))
+    .limit(1)
+    .correlate(User)
+    .scalar_subquery()
+)
+
+
+async def list_riders(db: AsyncSession, school_id: uuid.UUID) -> list[RiderRead]:
+    result = await db.execute(RIDERS_BY_SCHOOL, {"school_id": school_id})
+    return [RiderRead(*row) for row in result]
+
+
+async def get_rider(
+    db: AsyncSession, rider_id: uuid.UUID, school_id: uuid.UUID
+) -> RiderRead | None:
+    result = await db.execute(
+        RIDER_BY_ID, {"rider_id": rider_id, "school_id": school_id}
+    )
+    row = result.first()
+    return RiderRead(*row) if row else None
+
+
+async def fetch_me(
+    db: AsyncSession, user_id: uuid.UUID, school_id: uuid.UUID | None
+) -> list[Row]:
+    """The ME_IN_SCHOOL or ME_FIRST_MEMBERSHIP rows; none if no such user."""
+    if school_id:
+        result = await db.execute(
+            ME_IN_SCHOOL, {"user_id": user_id, "school_id": school_id}
+        )
+    else:
+        result = await db.execute(ME_FIRST_MEMBERSHIP, {"user_id": user_id})
+    return result.all()
+
+
+def me_from_rows(rows: list[Row]) -> MeRead | None:
+    if not rows:
+        return None
+    uid, first_name, last_name, email, _, _, sid, name, slug, _, _ = rows[0]
+    school = SchoolRead(sid, name, slug) if sid else None
+    roles = sorted(row[-1] for row in rows if row[-1] is not None)
+    return MeRead(uid, first_name, last_name, email, sid, school, roles)
+
+
+async def get_me(
+    db: AsyncSession, user_id: uuid.UUID, school_id: uuid.UUID | None
+) -> MeRead | None:
+    """
+    Load the user and their school context in one query. Returns None if the
+    user does not exist; `school` is None if they have no matching membership.
+    """
+    return me_from_rows(await fetch_me(db, user_id, school_id))
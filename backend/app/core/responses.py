@@ -0,0 +1,51 @@
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+from pydantic_core import to_jsonable_python
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    # Types orjson does not encode (Decimal, timedelta, sets, ...) are
+    # converted the way Pydantic's JSON mode would, so output is unchanged.
+    return to_jsonable_python(obj)
+
+
+# UTC as "Z" matches Pydantic's JSON mode
+_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson. UUIDs, datetimes, dates and
+    dataclasses are encoded natively; Pydantic models via model_dump().
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=_OPTIONS)
+
+
+class MsgPackResponse(Response):
+    """
+    MessagePack response carrying the same values as the JSON rendering:
+    UUIDs, dates and decimals become the strings JSON clients would see.
+    """
+
+    media_type = MSGPACK_MEDIA_TYPES[0]
+
+    def render(self, content: Any) -> bytes:
+        return msgpack.packb(content, default=_default, datetime=False)
+
+
+def decode_msgpack(body: bytes) -> Any:
+    return msgpack.unpackb(body)
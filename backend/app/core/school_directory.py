@@ -0,0 +1,89 @@
+import uuid
+from itertools import chain
+
+from sqlalchemy import bindparam, event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.read_models import SchoolRead
+from app.core.transactional_cache import TransactionalCache
+from app.models.school import School
+
+# In-process school directory for public and per-request lookups. Entries of
+# a school are evicted once a commit that inserted, renamed or deleted it has
+# succeeded. Slug entries are tagged with the school ID, so a rename evicts
+# the old slug without needing its previous value to be loaded.
+_by_id: TransactionalCache[uuid.UUID, SchoolRead] = TransactionalCache(
+    "schools_by_id",
+    maxsize=settings.SCHOOL_CACHE_SIZE,
+    tables=[School.__table__],
+    shared=SchoolRead,
+)
+_by_slug: TransactionalCache[str, SchoolRead] = TransactionalCache(
+    "school_slugs",
+    maxsize=settings.SCHOOL_CACHE_SIZE,
+    tags=lambda school: (school.id,),
+    tables=[School.__table__],
+    shared=SchoolRead,
+)
+
+_columns = select(School.id, School.name, School.slug).execution_options(
+    soft_delete_applied=True
+)
+# Params: school_id
+SCHOOL_BY_ID = _columns.where(School.id == bindparam("school_id"))
+# Params: slug
+SCHOOL_BY_SLUG = _columns.where(School.slug == bindparam("slug"))
+
+
+async def _load(db: AsyncSession, cache, key, statement, params) -> SchoolRead | None:
+    school = cache.get(key)
+    if school is not None:
+        return school
+
+    generation = cache.generation
+    row = (await db.execute(statement, params)).first()
+    if row is None:
+        return None
+    school = SchoolRead(*row)
+    cache.put(key, school, generation)
+    return school
+
+
+async def get_by_id(db: AsyncSession, school_id: uuid.UUID) -> SchoolRead | None:
+    return await _load(db, _by_id, school_id, SCHOOL_BY_ID, {"school_id": school_id})
+
+
+async def get_by_slug(db: AsyncSession, slug: str) -> SchoolRead | None:
+    return await _load(db, _by_slug, slug, SCHOOL_BY_SLUG, {"slug": slug})
+
+
+def cached(school_id: uuid.UUID) -> SchoolRead | None:
+    return _by_id.get(school_id)
+
+
+def generation() -> int | tuple[int, int | None]:
+    """Read before loading a school outside this module, to pass to `put`."""
+    return _by_id.generation
+
+
+def put(school: SchoolRead, generation: int | tuple[int, int | None]) -> None:
+    _by_id.put(school.id, school, generation)
+
+
+def clear() -> None:
+    _by_id.clear()
+    _by_slug.clear()
+
+
+@event.listens_for(Session, "after_flush")
+def _stage_school_evictions(session: Session, flush_context) -> None:
+    school_ids = {
+        obj.id
+        for obj in chain(session.new, session.dirty, session.deleted)
+        if isinstance(obj, School)
+    }
+    if school_ids:
+        _by_id.stage_evict(session, school_ids)
+        _by_slug.stage_evict_tags(session, school_ids)
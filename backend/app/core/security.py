@@ -1,14 +1,36 @@
 import hashlib
 import secrets
 from datetime import UTC, datetime, timedelta
+from functools import cache
 from typing import Any
 
-from jose import jwt
-from passlib.context import CryptContext
-
 from .config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+class InvalidTokenError(Exception):
+    pass
+
+
+# python-jose (via cryptography) and passlib are slow to import and not needed
+# to serve /health, so they load on first use or from preload().
+@cache
+def _jwt():
+    from jose import jwt
+
+    return jwt
+
+
+@cache
+def _pwd_context():
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def preload() -> None:
+    """Import the lazily loaded crypto modules, e.g. off the request path."""
+    _jwt()
+    _pwd_context()
 
 
 def create_access_token(
@@ -17,6 +39,7 @@ def create_access_token(
     roles: list[str] = None,
     perms: list[str] = None,
     expires_delta: timedelta = None,
+    perm_epoch: int = None,
 ) -> str:
     if expires_delta:
         expire = datetime.now(UTC) + expires_delta
@@ -32,13 +55,23 @@ def create_access_token(
         to_encode["roles"] = roles
     if perms:
         to_encode["perms"] = perms
+    if perm_epoch is not None:
+        to_encode["pe"] = perm_epoch
 
-    encoded_jwt = jwt.encode(
+    encoded_jwt = _jwt().encode(
         to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
     )
     return encoded_jwt
 
 
+def decode_access_token(token: str) -> dict[str, Any]:
+    jwt = _jwt()
+    try:
+        return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except jwt.JWTError as e:
+        raise InvalidTokenError(str(e)) from e
+
+
 def create_refresh_token(
     subject: str | Any, expires_delta: timedelta = None
 ) -> tuple[str, str, datetime]:
@@ -57,11 +90,11 @@ def create_refresh_token(
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return _pwd_context().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return _pwd_context().hash(password)
 
 
 def get_token_hash(token: str) -> str:
@@ -1,7 +1,12 @@
+import hashlib
+import json
+
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 
 from app.models.permission import Permission
-from app.models.role import Role
+from app.models.role import Role, role_permissions
 
 ROLES = [
     (Role.ADMIN, "Administrator"),
@@ -33,58 +38,75 @@ ROLE_PERMISSIONS = {
 }
 
 
-def _ensure_roles(db: Session) -> dict[str, Role]:
-    roles_map = {}
-    for name, desc in ROLES:
-        role = db.query(Role).filter(Role.name == name).first()
-        if not role:
-            role = Role(name=name, description=desc)
-            db.add(role)
-        roles_map[name] = role
-    return roles_map
+def _insert_missing(db: Session, table, rows: list[dict], key: list[str]) -> None:
+    """
+    Insert rows in one statement, skipping ones whose `key` already exists.
+    """
+    if not rows:
+        return
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        stmt = postgresql.insert(table).on_conflict_do_nothing(index_elements=key)
+    elif dialect == "sqlite":
+        stmt = sqlite.insert(table).on_conflict_do_nothing(index_elements=key)
+    else:
+        columns = [table.c[k] for k in key]
+        existing = set(db.execute(select(*columns)).tuples().all())
+        rows = [r for r in rows if tuple(r[k] for k in key) not in existing]
+        if not rows:
+            return
+        stmt = insert(table)
+    db.execute(stmt, rows)
+
+
+def _ensure_roles(db: Session) -> dict[str, int]:
+    rows = [{"name": name, "description": desc} for name, desc in ROLES]
+    _insert_missing(db, Role.__table__, rows, ["name"])
+    return dict(db.execute(select(Role.name, Role.id)).tuples().all())
 
 
-def _ensure_permissions(db: Session) -> dict[str, Permission]:
-    perms_map = {}
-    for name, desc in PERMISSIONS:
-        perm = db.query(Permission).filter(Permission.name == name).first()
-        if not perm:
-            perm = Permission(name=name, description=desc)
-            db.add(perm)
-        perms_map[name] = perm
-    return perms_map
+def _ensure_permissions(db: Session) -> dict[str, int]:
+    rows = [{"name": name, "description": desc} for name, desc in PERMISSIONS]
+    _insert_missing(db, Permission.__table__, rows, ["name"])
+    return dict(db.execute(select(Permission.name, Permission.id)).tuples().all())
 
 
 def _assign_default_permissions(
-    roles_map: dict[str, Role], perms_map: dict[str, Permission]
+    db: Session, role_ids: dict[str, int], perm_ids: dict[str, int]
 ):
-    all_perms = list(perms_map.values())
+    # Additive / initial only: roles that already have permissions are left alone
+    seeded = set(db.execute(select(role_permissions.c.role_id).distinct()).scalars())
+    rows = []
     for role_name, mapping in ROLE_PERMISSIONS.items():
-        role = roles_map.get(role_name)
-        if not role or role.permissions:
+        role_id = role_ids.get(role_name)
+        if role_id is None or role_id in seeded:
             continue
 
-        if mapping == "all":
-            target_perms = all_perms
-        else:
-            target_perms = [perms_map[p] for p in mapping if p in perms_map]
+        names = perm_ids if mapping == "all" else mapping
+        rows += [
+            {"role_id": role_id, "permission_id": perm_ids[p]}
+            for p in names
+            if p in perm_ids
+        ]
+    _insert_missing(db, role_permissions, rows, ["role_id", "permission_id"])
 
-        role.permissions = target_perms
 
+def seed_fingerprint() -> str:
+    """Hash of the seed content; changes whenever ROLES or PERMISSIONS do."""
+    content = json.dumps([ROLES, PERMISSIONS, ROLE_PERMISSIONS], sort_keys=True)
+    return hashlib.sha256(content.encode()).hexdigest()
 
-def seed_rbac(db: Session):
-    # 1. Ensure Roles & Permissions exist
-    roles_map = _ensure_roles(db)
-    perms_map = _ensure_permissions(db)
 
-    db.flush()  # Ensure IDs are generated
+def seed_rbac(db: Session):
+    # 1. Ensure Roles & Permissions exist (one upsert each)
+    role_ids = _ensure_roles(db)
+    perm_ids = _ensure_permissions(db)
 
     # Warm Role ID cache
-    for name, role in roles_map.items():
-        if role.id:
-            Role.stage_cache_update(db, name, role.id)
+    for name, role_id in role_ids.items():
+        Role.stage_cache_update(db, name, role_id)
 
     # 2. Assign Permissions to Roles (Additive / Initial only)
-    _assign_default_permissions(roles_map, perms_map)
+    _assign_default_permissions(db, role_ids, perm_ids)
 
     db.commit()
@@ -0,0 +1,281 @@
+import dataclasses
+import fcntl
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from typing import Any
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+# Second-level cache shared by the workers of one host: a file mapped into
+# every worker (e.g. under /dev/shm) holding a direct-mapped table of
+# serialized entries. Workers fill it from the database on a miss, so after
+# a deploy each row is loaded once per host rather than once per worker.
+#
+# Each namespace (cache) has a generation counter in the header. Any eviction
+# in any worker bumps it, which invalidates every entry of that namespace:
+# entries are stamped with the generation read before their row was loaded.
+# Writers take an exclusive file lock; readers take none and validate the
+# slot with its sequence number instead.
+
+_MAGIC = b"RSC1"
+_HEADER = struct.Struct("<4sII")  # magic, slot count, slot size
+_NAMESPACES = 64
+_NAMESPACE = struct.Struct("<QQ")  # name hash, generation
+_NAMESPACE_OFFSET = 64
+_SLOTS_OFFSET = 4096
+_SEQ = struct.Struct("<I")
+# seq, namespace generation, expiry (epoch seconds), key length, value length
+_SLOT = struct.Struct("<IQdHH")
+
+_UUID_EXT = 1
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, uuid.UUID):
+        return msgpack.ExtType(_UUID_EXT, obj.bytes)
+    raise TypeError(f"Cannot serialize {type(obj).__name__}")
+
+
+def _ext_hook(code: int, data: bytes) -> Any:
+    if code == _UUID_EXT:
+        return uuid.UUID(bytes=data)
+    return msgpack.ExtType(code, data)
+
+
+def pack(obj: Any) -> bytes:
+    return msgpack.packb(obj, default=_default)
+
+
+def unpack(data: bytes) -> Any:
+    return msgpack.unpackb(data, ext_hook=_ext_hook, use_list=False)
+
+
+def codec(value_type: type) -> tuple[Callable[[Any], Any], Callable[[Any], Any]]:
+    """
+    Encode/decode functions mapping values of `value_type` to what `pack`
+    accepts: dataclasses become tuples of their fields, anything else is
+    passed through.
+    """
+    if not dataclasses.is_dataclass(value_type):
+        return (lambda value: value), (lambda data: data)
+    names = tuple(field.name for field in dataclasses.fields(value_type))
+
+    def encode(value):
+        return tuple(getattr(value, name) for name in names)
+
+    def decode(data):
+        return value_type(*data)
+
+    return encode, decode
+
+
+def _hash(data: bytes) -> int:
+    # Never 0, which marks a free namespace entry
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little") or 1
+
+
+class SharedSegment:
+    """A shared-memory table of (namespace, key) -> value entries."""
+
+    def __init__(
+        self, path: str, slots: int = 16384, slot_size: int = 512, source: str = ""
+    ):
+        self.path = path
+        self.slots = slots
+        self.slot_size = slot_size
+        self._size = _SLOTS_OFFSET + slots * slot_size
+        # flock excludes other processes only; threads queue on this lock
+        self._lock = threading.Lock()
+        self._namespaces: dict[str, int] = {}
+
+        # The layout is part of the name: workers started with other settings
+        # (e.g. during a rolling deploy) get a file of their own. Resizing a
+        # file other workers have mapped would crash them with SIGBUS.
+        self.file = f"{path}.{slots}x{slot_size}"
+        if source:
+            # So is where the rows come from (database and schema): workers
+            # pointed at another database never serve each other's rows
+            self.file += f".{_hash(source.encode()):016x}"
+        self._fd = os.open(self.file, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            with self._exclusive():
+                size = os.fstat(self._fd).st_size
+                if size == 0:
+                    os.ftruncate(self._fd, self._size)
+                elif size != self._size:
+                    raise ValueError(f"{self.file} is {size} bytes, not {self._size}")
+                self._map = mmap.mmap(self._fd, self._size)
+                header = _HEADER.unpack_from(self._map, 0)
+                if header != (_MAGIC, slots, slot_size):
+                    # New file, or one laid out by another build: start empty
+                    self._map[: self._size] = bytes(self._size)
+                    _HEADER.pack_into(self._map, 0, _MAGIC, slots, slot_size)
+        except BaseException:
+            os.close(self._fd)
+            raise
+
+    def close(self) -> None:
+        self._map.close()
+        os.close(self._fd)
+
+    def generation(self, namespace: str) -> int | None:
+        """The namespace's current generation; None if the table is full."""
+        offset = self._namespace_offset(namespace)
+        if offset is None:
+            return None
+        return _NAMESPACE.unpack_from(self._map, offset)[1]
+
+    def bump(self, namespace: str) -> None:
+        """Invalidate every entry of `namespace`, in all workers."""
+        offset = self._namespace_offset(namespace)
+        if offset is None:
+            return
+        with self._exclusive():
+            name_hash, generation = _NAMESPACE.unpack_from(self._map, offset)
+            _NAMESPACE.pack_into(self._map, offset, name_hash, generation + 1)
+
+    def bump_all(self) -> None:
+        """Invalidate every entry, e.g. once the database was recreated."""
+        with self._exclusive():
+            for i in range(_NAMESPACES):
+                offset = _NAMESPACE_OFFSET + i * _NAMESPACE.size
+                name_hash, generation = _NAMESPACE.unpack_from(self._map, offset)
+                if name_hash:
+                    _NAMESPACE.pack_into(self._map, offset, name_hash, generation + 1)
+
+    def get(self, namespace: str, key: bytes) -> bytes | None:
+        generation = self.generation(namespace)
+        if generation is None:
+            return None
+        offset = self._slot_offset(namespace, key)
+        seq = _SEQ.unpack_from(self._map, offset)[0]
+        if seq & 1:
+            # Being written
+            return None
+        slot = self._map[offset : offset + self.slot_size]
+        if _SEQ.unpack_from(self._map, offset)[0] != seq:
+            return None
+
+        _, stamp, expires, key_len, value_len = _SLOT.unpack_from(slot)
+        start = _SLOT.size
+        if (
+            stamp != generation
+            or expires <= time.time()
+            or slot[start : start + key_len] != key
+        ):
+            return None
+        start += key_len
+        return slot[start : start + value_len]
+
+    def put(
+        self,
+        namespace: str,
+        key: bytes,
+        value: bytes,
+        generation: int,
+        ttl_seconds: float | None,
+    ) -> None:
+        """
+        Store `value` stamped with `generation`, read before the value was
+        loaded; if the namespace was bumped since, it is never served.
+        """
+        if _SLOT.size + len(key) + len(value) > self.slot_size:
+            return
+        offset = self._slot_offset(namespace, key)
+        expires = time.time() + ttl_seconds if ttl_seconds else float("inf")
+        with self._exclusive():
+            seq = _SEQ.unpack_from(self._map, offset)[0]
+            _SEQ.pack_into(self._map, offset, seq + 1)
+            _SLOT.pack_into(
+                self._map, offset, seq + 1, generation, expires, len(key), len(value)
+            )
+            start = offset + _SLOT.size
+            self._map[start : start + len(key)] = key
+            start += len(key)
+            self._map[start : start + len(value)] = value
+            _SEQ.pack_into(self._map, offset, seq + 2)
+
+    def _slot_offset(self, namespace: str, key: bytes) -> int:
+        index = _hash(namespace.encode() + b"\0" + key) % self.slots
+        return _SLOTS_OFFSET + index * self.slot_size
+
+    def _namespace_offset(self, namespace: str) -> int | None:
+        offset = self._namespaces.get(namespace)
+        if offset is not None:
+            return offset
+
+        name_hash = _hash(namespace.encode())
+        with self._exclusive():
+            for i in range(_NAMESPACES):
+                offset = _NAMESPACE_OFFSET + i * _NAMESPACE.size
+                existing = _NAMESPACE.unpack_from(self._map, offset)[0]
+                if existing == 0:
+                    _NAMESPACE.pack_into(self._map, offset, name_hash, 0)
+                if existing in (0, name_hash):
+                    self._namespaces[namespace] = offset
+                    return offset
+        logger.warning("Shared cache has no room for namespace %s", namespace)
+        return None
+
+    def _exclusive(self):
+        return _FileLock(self._fd, self._lock)
+
+
+class _FileLock:
+    __slots__ = ("_fd", "_lock")
+
+    def __init__(self, fd: int, lock: threading.Lock):
+        self._fd = fd
+        self._lock = lock
+
+    def __enter__(self):
+        self._lock.acquire()
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+
+    def __exit__(self, *exc):
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._lock.release()
+
+
+# The host's segment once opened; None runs every cache on its own
+segment: SharedSegment | None = None
+
+
+def configure(
+    path: str, slots: int, slot_size: int, source: str = ""
+) -> SharedSegment | None:
+    """
+    Open (creating if needed) the shared segment at `path` for rows loaded
+    from `source`, e.g. the database URL and schema fingerprint.
+    """
+    global segment
+    if not path:
+        return None
+    if msgpack is None:
+        logger.warning("msgpack is not installed; shared cache disabled")
+        return None
+    try:
+        segment = SharedSegment(path, slots, slot_size, source)
+    except (OSError, ValueError) as e:
+        logger.warning("Shared cache disabled: %s", e)
+        return None
+    return segment
+
+
+def close() -> None:
+    global segment
+    if segment is not None:
+        segment.close()
+        segment = None
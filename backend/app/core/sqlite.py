@@ -0,0 +1,45 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .config import settings
+
+
+def sqlite_pragmas() -> dict[str, str | int]:
+    return {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "foreign_keys": "ON",
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        # Negative cache_size is in KiB rather than pages
+        "cache_size": -settings.SQLITE_CACHE_SIZE_KB,
+    }
+
+
+def apply_sqlite_profile(engine: Engine, writer: bool) -> None:
+    """
+    Configure every new connection of `engine` for production SQLite use.
+
+    The writer engine opens each transaction with BEGIN IMMEDIATE, taking the
+    write lock up front so that busy_timeout applies. A deferred transaction
+    that reads first and writes later cannot be retried once another
+    connection has committed and fails with "database is locked" instead.
+    Readers keep deferred transactions and run concurrently under WAL.
+    """
+    pragmas = sqlite_pragmas()
+
+    @event.listens_for(engine, "connect")
+    def _configure_connection(dbapi_connection, connection_record):
+        if writer:
+            # Take over transaction control from the sqlite3 driver
+            dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    if writer:
+
+        @event.listens_for(engine, "begin")
+        def _begin_immediate(conn):
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
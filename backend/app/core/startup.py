@@ -0,0 +1,74 @@
+import hashlib
+import logging
+
+from sqlalchemy import Engine, MetaData, delete, func, inspect, select
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from app.core.seed import seed_fingerprint, seed_rbac
+from app.models.schema_state import SchemaState
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_KEY = "startup_fingerprint"
+# Serializes concurrent worker startups on Postgres (pg_advisory_xact_lock key)
+_STARTUP_LOCK_ID = 72_616_001
+
+
+def schema_fingerprint(metadata: MetaData, dialect) -> str:
+    digest = hashlib.sha256()
+    for table in metadata.sorted_tables:
+        digest.update(str(CreateTable(table).compile(dialect=dialect)).encode())
+        for index in sorted(table.indexes, key=lambda i: i.name):
+            digest.update(str(CreateIndex(index).compile(dialect=dialect)).encode())
+    return digest.hexdigest()
+
+
+def startup_fingerprint(metadata: MetaData, dialect) -> str:
+    """Fingerprint of everything startup would create: tables plus RBAC seed."""
+    combined = schema_fingerprint(metadata, dialect) + seed_fingerprint()
+    return hashlib.sha256(combined.encode()).hexdigest()
+
+
+def _stored_fingerprint(conn) -> str | None:
+    if not inspect(conn).has_table(SchemaState.__tablename__):
+        return None
+    return conn.execute(
+        select(SchemaState.value).where(SchemaState.key == FINGERPRINT_KEY)
+    ).scalar()
+
+
+def prepare_database(
+    engine: Engine, metadata: MetaData, reset_on_change: bool = False
+) -> bool:
+    """
+    Create tables and seed RBAC only if the stored fingerprint differs from
+    the current one. With `reset_on_change` (local dev) all tables are
+    dropped first. Returns True if any work was done.
+    """
+    fingerprint = startup_fingerprint(metadata, engine.dialect)
+    with engine.connect() as conn:
+        if _stored_fingerprint(conn) == fingerprint:
+            return False
+
+    with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            conn.execute(select(func.pg_advisory_xact_lock(_STARTUP_LOCK_ID)))
+            # Another worker may have finished while we waited
+            if _stored_fingerprint(conn) == fingerprint:
+                return False
+
+        if reset_on_change:
+            metadata.drop_all(bind=conn)
+        metadata.create_all(bind=conn)
+        with Session(bind=conn) as db:
+            seed_rbac(db)
+
+        conn.execute(delete(SchemaState).where(SchemaState.key == FINGERPRINT_KEY))
+        conn.execute(
+            SchemaState.__table__.insert().values(
+                key=FINGERPRINT_KEY, value=fingerprint
+            )
+        )
+    logger.info("Schema or seed changed; applied fingerprint %s", fingerprint[:12])
+    return True
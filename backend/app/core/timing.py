@@ -0,0 +1,191 @@
+import asyncio
+import functools
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.interfaces import CacheStats
+
+from .config import settings
+from .metrics import registry
+
+logger = logging.getLogger(__name__)
+
+REQUEST_DB_STATEMENTS = registry.histogram(
+    "http_request_db_statements",
+    "SQL statements executed per request",
+    buckets=(1, 2, 3, 5, 8, 13, 21, 34, 55),
+)
+SLOW_QUERIES = registry.counter(
+    "db_slow_queries",
+    "Statements slower than SLOW_QUERY_THRESHOLD_MS",
+)
+COMPILED_CACHE = registry.counter(
+    "db_compiled_cache",
+    "Statement executions by SQL compilation cache outcome",
+    ("result",),
+)
+COMPILED_CACHE_HIT_RATIO = registry.gauge(
+    "db_compiled_cache_hit_ratio",
+    "Share of cacheable statements served from the compiled cache",
+    callback=lambda: compiled_cache_hit_ratio(),
+)
+
+_CACHE_RESULTS = {
+    CacheStats.CACHE_HIT: "hit",
+    CacheStats.CACHE_MISS: "miss",
+    CacheStats.CACHING_DISABLED: "disabled",
+    CacheStats.NO_CACHE_KEY: "no_key",
+    CacheStats.NO_DIALECT_SUPPORT: "unsupported",
+}
+
+
+def compiled_cache_hit_ratio() -> float:
+    hits = COMPILED_CACHE.labels("hit").value
+    total = hits + COMPILED_CACHE.labels("miss").value
+    return hits / total if total else 0.0
+
+
+class RequestTimings:
+    """
+    Per-request accumulator for DB statements and named phases.
+    """
+
+    __slots__ = (
+        "scope",
+        "started",
+        "db_statements",
+        "db_seconds",
+        "phases",
+        "endpoint_done",
+    )
+
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.started = time.perf_counter()
+        self.db_statements = 0
+        self.db_seconds = 0.0
+        self.phases: dict[str, float] = {}
+        self.endpoint_done: float | None = None
+
+    @property
+    def route(self) -> str:
+        route = self.scope.get("route")
+        if route is not None and hasattr(route, "path"):
+            return route.path
+        return self.scope.get("path", "-")
+
+    def add_phase(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def server_timing(self, now: float) -> str:
+        entries = [
+            f'db;dur={self.db_seconds * 1000:.2f};desc="{self.db_statements} queries"'
+        ]
+        for name, seconds in self.phases.items():
+            entries.append(f"{name};dur={seconds * 1000:.2f}")
+        if self.endpoint_done is not None:
+            entries.append(f"serialize;dur={(now - self.endpoint_done) * 1000:.2f}")
+        entries.append(f"total;dur={(now - self.started) * 1000:.2f}")
+        return ", ".join(entries)
+
+
+_current_timings: ContextVar[RequestTimings | None] = ContextVar(
+    "request_timings", default=None
+)
+
+
+def start_request(scope: dict):
+    return _current_timings.set(RequestTimings(scope))
+
+
+def end_request(token) -> None:
+    _current_timings.reset(token)
+
+
+def current_timings() -> RequestTimings | None:
+    return _current_timings.get()
+
+
+@contextmanager
+def phase(name: str):
+    """
+    Time a block of request work and report it under `name` in Server-Timing.
+    """
+    timings = _current_timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add_phase(name, time.perf_counter() - start)
+
+
+def timed(name: str):
+    """
+    Decorator form of `phase` that also works for coroutine functions.
+    """
+
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with phase(name):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with phase(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def mark_endpoint_done() -> None:
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.endpoint_done = time.perf_counter()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    cache_result = _CACHE_RESULTS.get(getattr(context, "cache_hit", None))
+    if cache_result is not None:
+        COMPILED_CACHE.labels(cache_result).inc()
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.db_statements += 1
+        timings.db_seconds += elapsed
+
+    if elapsed * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS:
+        SLOW_QUERIES.inc()
+        logger.warning(
+            "Slow query (%.1f ms) on %s: %s",
+            elapsed * 1000,
+            timings.route if timings is not None else "-",
+            statement,
+        )
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    # after_cursor_execute is skipped for failed statements
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start_time"):
+        conn.info["query_start_time"].pop()
@@ -0,0 +1,297 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Iterable
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+from sqlalchemy import Table, event
+from sqlalchemy.orm import Session
+
+from app.core import cache_epoch, shared_cache
+from app.core.metrics import registry
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+CACHE_LOOKUPS = registry.counter(
+    "cache_lookups",
+    "Transactional cache lookups by result (hit, shared_hit or miss)",
+    ("cache", "result"),
+    sharded=True,
+)
+CACHE_EVICTIONS = registry.counter(
+    "cache_evictions",
+    "Transactional cache entries dropped for size or age",
+    ("cache",),
+)
+CACHE_ENTRIES = registry.gauge(
+    "cache_entries", "Entries held per transactional cache", ("cache",)
+)
+
+# Session writes per cache, applied once the session commits
+_PENDING_KEY = "_pending_transactional_cache_writes"
+
+_caches: dict[str, "TransactionalCache"] = {}
+
+
+@dataclass(slots=True, frozen=True)
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    shared_hits: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.shared_hits + self.misses
+        return (self.hits + self.shared_hits) / lookups if lookups else 0.0
+
+
+class TransactionalCache(Generic[K, V]):
+    """
+    Process-local key/value cache whose writes from a session apply only
+    once that session commits, and are dropped if it rolls back.
+
+    Reads take no lock and see no copy: rather than the copy-on-write
+    snapshot first planned, whose every put would copy all entries, writers
+    update one mapping in place under the lock. A read is a single-key
+    lookup, atomic under the GIL, and never reorders entries (there is no
+    move_to_end on hits), so it sees a key's old or new entry. With
+    `maxsize`, the oldest entries go first; with `ttl_seconds`, entries
+    expire and are dropped as later writes come in. `tags` maps a value
+    to keys of related rows (e.g. its user ID) so entries can be evicted by
+    tag. With `tables`, commits to those tables on other workers reset the
+    cache through the cache epoch. With `shared` (the value type), misses
+    are looked up in, and loads written to, the host's shared cache.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        *,
+        maxsize: int | None = None,
+        ttl_seconds: float | None = None,
+        tags: Callable[[V], Iterable[Hashable]] | None = None,
+        tables: Iterable[Table] = (),
+        shared: type | None = None,
+    ):
+        if namespace in _caches:
+            raise ValueError(f"Cache namespace {namespace!r} is already in use")
+        self.namespace = namespace
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._tags = tags
+        # Insertion order is age order, and with one TTL also expiry order
+        self._entries: OrderedDict[K, tuple[V, float]] = OrderedDict()
+        self._by_tag: dict[Hashable, set[K]] = {}
+        self._lock = threading.Lock()
+        # Bumped on every eviction, so a load that raced a commit is not stored
+        self._generation = 0
+        self._codec = shared_cache.codec(shared) if shared is not None else None
+
+        self._hits = CACHE_LOOKUPS.labels(namespace, "hit")
+        self._shared_hits = CACHE_LOOKUPS.labels(namespace, "shared_hit")
+        self._misses = CACHE_LOOKUPS.labels(namespace, "miss")
+        self._evictions = CACHE_EVICTIONS.labels(namespace)
+        CACHE_ENTRIES.labels(namespace).set_function(self.__len__)
+
+        _caches[namespace] = self
+        tables = list(tables)
+        if tables:
+            cache_epoch.register(namespace, tables, lambda conn: self.clear())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: K) -> bool:
+        return self._live(self._entries.get(key)) is not None
+
+    @property
+    def generation(self) -> int | tuple[int, int | None]:
+        """Token to read before loading a value and pass to `put`."""
+        segment = self._segment()
+        if segment is None:
+            return self._generation
+        return self._generation, segment.generation(self.namespace)
+
+    def get(self, key: K) -> V | None:
+        value = self._live(self._entries.get(key))
+        if value is not None:
+            self._hits.inc()
+            return value
+        if self._segment() is not None:
+            value = self._get_shared(key)
+        (self._misses if value is None else self._shared_hits).inc()
+        return value
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            self._hits.value,
+            self._misses.value,
+            self._evictions.value,
+            len(self),
+            self._shared_hits.value,
+        )
+
+    # Direct writes, for values just read from the database
+
+    def put(self, key: K, value: V, generation: int | tuple | None = None) -> None:
+        """
+        Store `value` unless the cache was evicted since `generation` was
+        read, i.e. a commit may have changed the row after it was loaded.
+        """
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            shared = generation[1] if isinstance(generation, tuple) else None
+            self._write([("put", (key, value, shared))])
+
+    def evict(self, keys: Iterable[K]) -> None:
+        with self._lock:
+            self._write([("evict", keys)])
+
+    def evict_tags(self, tags: Iterable[Hashable]) -> None:
+        with self._lock:
+            self._write([("tags", tags)])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._write([("clear", None)])
+
+    # Staged writes, applied after `session` commits
+
+    def stage_put(self, session: Session, key: K, value: V) -> None:
+        self._stage(session, "put", (key, value, None))
+
+    def stage_evict(self, session: Session, keys: Iterable[K]) -> None:
+        self._stage(session, "evict", list(keys))
+
+    def stage_evict_tags(self, session: Session, tags: Iterable[Hashable]) -> None:
+        self._stage(session, "tags", list(tags))
+
+    def stage_clear(self, session: Session) -> None:
+        self._stage(session, "clear", None)
+
+    def _stage(self, session: Session, op: str, arg) -> None:
+        pending = session.info.setdefault(_PENDING_KEY, {})
+        pending.setdefault(self, []).append((op, arg))
+
+    def _segment(self) -> shared_cache.SharedSegment | None:
+        return shared_cache.segment if self._codec is not None else None
+
+    def _get_shared(self, key: K) -> V | None:
+        generation = self.generation
+        data = self._segment().get(self.namespace, shared_cache.pack(key))
+        if data is None:
+            return None
+        try:
+            value = self._codec[1](shared_cache.unpack(data))
+        except (TypeError, ValueError):
+            # Written by a build with another layout for this value type
+            return None
+        with self._lock:
+            if generation == self.generation:
+                self._write([("fill", (key, value))])
+        return value
+
+    def _share(self, key: K, value: V, generation: int | None) -> None:
+        segment = self._segment()
+        if segment is None:
+            return
+        if generation is None:
+            generation = segment.generation(self.namespace)
+            if generation is None:
+                return
+        segment.put(
+            self.namespace,
+            shared_cache.pack(key),
+            shared_cache.pack(self._codec[0](value)),
+            generation,
+            self.ttl_seconds,
+        )
+
+    def _live(self, entry: tuple[V, float] | None) -> V | None:
+        if entry is None or entry[1] <= time.monotonic():
+            return None
+        return entry[0]
+
+    def _write(self, ops: list[tuple[str, object]]) -> None:
+        """Apply `ops` in order. Callers hold the lock."""
+        now = time.monotonic()
+        entries = self._entries
+        dropped = 0
+        # Expired entries are the oldest ones: sweep them off the front
+        while entries:
+            key, (_, expires) = next(iter(entries.items()))
+            if expires > now:
+                break
+            self._pop(key)
+            dropped += 1
+
+        for op, arg in ops:
+            self._apply(op, arg, now)
+
+        if self.maxsize is not None:
+            while len(entries) > self.maxsize:
+                self._pop(next(iter(entries)))
+                dropped += 1
+        if dropped:
+            self._evictions.inc(dropped)
+
+    def _apply(self, op: str, arg, now: float) -> None:
+        if op in ("put", "fill"):
+            key, value = arg[:2]
+            self._pop(key)
+            expires = now + self.ttl_seconds if self.ttl_seconds else math.inf
+            self._entries[key] = (value, expires)
+            for tag in self._value_tags(value):
+                self._by_tag.setdefault(tag, set()).add(key)
+            if op == "put":
+                self._share(key, value, arg[2])
+            return
+
+        self._generation += 1
+        if self._segment() is not None:
+            self._segment().bump(self.namespace)
+        if op == "clear":
+            self._entries.clear()
+            self._by_tag.clear()
+        elif op == "evict":
+            for key in arg:
+                self._pop(key)
+        else:
+            for tag in arg:
+                for key in list(self._by_tag.get(tag, ())):
+                    self._pop(key)
+
+    def _value_tags(self, value: V) -> Iterable[Hashable]:
+        return self._tags(value) if self._tags is not None else ()
+
+    def _pop(self, key: K) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in self._value_tags(entry[0]):
+            keys = self._by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[tag]
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    for cache, ops in pending.items():
+        with cache._lock:
+            cache._write(ops)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,71 @@
+import uuid
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core import auth_cache, read_models, school_directory
+from app.core.config import settings
+from app.core.read_models import MeRead, UserRead
+from app.core.transactional_cache import TransactionalCache
+from app.models.user import User
+
+# Display records (name and email) per user ID, for the current-user paths.
+# Entries are evicted once a commit that changed or deleted the user succeeded;
+# other workers see the change when their entry expires, USER_CACHE_TTL_SECONDS
+# at most. Not reset through cache epochs: users are written too often.
+_by_id: TransactionalCache[uuid.UUID, UserRead] = TransactionalCache(
+    "user_display",
+    maxsize=settings.USER_CACHE_SIZE,
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+    shared=UserRead,
+)
+
+
+async def get_me(
+    db: AsyncSession, user_id: uuid.UUID, school_id: uuid.UUID | None
+) -> MeRead | None:
+    """
+    read_models.get_me served from the user, membership and school caches.
+    On any miss, runs its single query and fills all three from the rows.
+    """
+    user = _by_id.get(user_id)
+    found, snapshot = auth_cache.lookup(user_id, school_id)
+    school = school_directory.cached(snapshot.school_id) if snapshot else None
+    if user is not None and found and (snapshot is None or school is not None):
+        roles = list(snapshot.roles) if snapshot else []
+        return MeRead(*_fields(user), school.id if school else None, school, roles)
+
+    generations = (
+        _by_id.generation,
+        auth_cache.cache.generation,
+        school_directory.generation(),
+    )
+    rows = await read_models.fetch_me(db, user_id, school_id)
+    me = read_models.me_from_rows(rows)
+    if me is None:
+        return None
+    _by_id.put(user_id, UserRead(*_fields(me)), generations[0])
+    # Membership ID, school ID, epoch, role ID and name, as snapshots load them
+    memberships = [(r[4], r[6], r[5], r[9], r[10]) for r in rows if r[4] is not None]
+    auth_cache.store((user_id, school_id), memberships, generations[1])
+    if me.school is not None:
+        school_directory.put(me.school, generations[2])
+    return me
+
+
+def _fields(user: UserRead | MeRead) -> tuple:
+    return user.id, user.first_name, user.last_name, user.email
+
+
+def clear() -> None:
+    _by_id.clear()
+
+
+@event.listens_for(Session, "after_flush")
+def _stage_user_evictions(session: Session, flush_context) -> None:
+    user_ids = [
+        obj.id for obj in (*session.dirty, *session.deleted) if isinstance(obj, User)
+    ]
+    if user_ids:
+        _by_id.stage_evict(session, user_ids)
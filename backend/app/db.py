@@ -1,20 +1,107 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 
 from app.models.base import Base  # noqa: F401
 
 from .core.config import settings
+from .core.pool_metrics import (
+    InstrumentedAsyncAdaptedQueuePool,
+    InstrumentedQueuePool,
+    instrument_engine_pool,
+)
+from .core.sqlite import apply_sqlite_profile
+
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def get_async_url(url: str) -> str:
+    """
+    Map a sync DATABASE_URL onto its asyncio driver (aiosqlite / asyncpg).
+    """
+    parsed = make_url(url)
+    return parsed.set(
+        drivername=ASYNC_DRIVERS[parsed.get_backend_name()]
+    ).render_as_string(hide_password=False)
+
+
+is_sqlite = settings.DATABASE_URL.startswith("sqlite")
+sqlite_production = is_sqlite and settings.SQLITE_PROFILE == "production"
 
 engine_kwargs = {"pool_pre_ping": True}
-if settings.DATABASE_URL.startswith("sqlite"):
+async_engine_kwargs = {"pool_pre_ping": True}
+if is_sqlite:
     engine_kwargs["connect_args"] = {"check_same_thread": False}
+    if sqlite_production:
+        # The sync engine is the single serialized writer: one pooled
+        # connection, so in-process writers queue on the pool instead of
+        # contending for the database lock.
+        engine_kwargs["poolclass"] = InstrumentedQueuePool
+        engine_kwargs["pool_size"] = 1
+        engine_kwargs["max_overflow"] = 0
+        engine_kwargs["pool_timeout"] = settings.SQLITE_BUSY_TIMEOUT_MS / 1000
 else:
+    engine_kwargs["poolclass"] = InstrumentedQueuePool
     engine_kwargs["pool_size"] = settings.DB_POOL_SIZE
     engine_kwargs["max_overflow"] = settings.DB_MAX_OVERFLOW
+    async_engine_kwargs["poolclass"] = InstrumentedAsyncAdaptedQueuePool
+    async_engine_kwargs["pool_size"] = settings.DB_POOL_SIZE
+    async_engine_kwargs["max_overflow"] = settings.DB_MAX_OVERFLOW
 
 engine = create_engine(settings.DATABASE_URL, **engine_kwargs)
+instrument_engine_pool(engine, "sync")
+if sqlite_production:
+    apply_sqlite_profile(engine, writer=True)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Request handlers on the hot path run on the event loop with an AsyncSession.
+# It wraps a regular Session, so the soft-delete and Role cache session events
+# apply unchanged.
+async_engine = create_async_engine(
+    get_async_url(settings.DATABASE_URL), **async_engine_kwargs
+)
+instrument_engine_pool(async_engine.sync_engine, "async")
+if sqlite_production:
+    apply_sqlite_profile(async_engine.sync_engine, writer=False)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
+
+# Health probes hold one connection of their own, so they neither queue
+# behind request traffic nor take a slot from it.
+probe_engine = create_engine(
+    settings.DATABASE_URL,
+    poolclass=QueuePool,
+    pool_size=1,
+    max_overflow=0,
+    pool_timeout=settings.HEALTH_PROBE_INTERVAL_SECONDS,
+    pool_pre_ping=True,
+    connect_args=engine_kwargs.get("connect_args", {}),
+)
+
+
+# Cache epoch polls read over their own connection as well, outside the
+# request pools and, under the production SQLite profile, without taking the
+# writer's lock.
+epoch_engine = create_engine(
+    settings.DATABASE_URL,
+    poolclass=QueuePool,
+    pool_size=1,
+    max_overflow=0,
+    pool_pre_ping=True,
+    connect_args=engine_kwargs.get("connect_args", {}),
+)
+if sqlite_production:
+    apply_sqlite_profile(epoch_engine, writer=False)
+
+# Overflow each app pool was configured with; None leaves the driver default
+pool_max_overflow = {
+    "sync": engine_kwargs.get("max_overflow"),
+    "async": async_engine_kwargs.get("max_overflow"),
+}
+
 
 def get_db():
     db = SessionLocal()
@@ -22,3 +109,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,296 @@
+import argparse
+import fcntl
+import gzip
+import json
+import os
+import uuid
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import date, datetime
+from pathlib import Path
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload
+
+from app.core.config import settings
+from app.models.membership import Membership, MembershipRole
+from app.models.rider_profile import RiderProfile
+from app.models.role import Role
+from app.models.user import User
+
+# Layout: <root>/<school_id>/segment-NNNNNN.jsonl.gz plus <root>/<school_id>/index.jsonl
+# Each write appends one gzip member to the current segment, so a record can
+# be read back by decompressing just the member the index points at.
+SEGMENT_PATTERN = "segment-{:06d}.jsonl.gz"
+INDEX_NAME = "index.jsonl"
+LOCK_NAME = ".lock"
+
+
+class ArchiveLocked(Exception):
+    """Another process holds the archive's writer lock."""
+
+
+def _encode(value):
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, datetime | date):
+        return value.isoformat()
+    return value
+
+
+def _decode_row(model, data: dict) -> dict:
+    row = {}
+    for column in model.__table__.columns:
+        value = data.get(column.key)
+        if value is not None:
+            python_type = column.type.python_type
+            if python_type is uuid.UUID:
+                value = uuid.UUID(value)
+            elif python_type is datetime:
+                value = datetime.fromisoformat(value)
+            elif python_type is date:
+                value = date.fromisoformat(value)
+        row[column.key] = value
+    return row
+
+
+def _row(obj) -> dict:
+    return {c.key: _encode(getattr(obj, c.key)) for c in obj.__table__.columns}
+
+
+def _fsync_append(path: Path, data: bytes) -> int:
+    with open(path, "ab") as f:
+        offset = f.tell()
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    return offset
+
+
+def _key(record: dict) -> tuple:
+    # A row deleted again after a restore is archived again; the same
+    # deletion archived twice (a purge chunk that rolled back) is not
+    row = record["row"]
+    return record["table"], row["id"], row.get("deleted_at")
+
+
+class Archive:
+    """
+    Append-only, per-school cold store for soft-deleted tenant rows.
+    Writers must hold `exclusive()`; every worker may run the purge job.
+    """
+
+    def __init__(self, root: str | Path, segment_bytes: int | None = None):
+        self.root = Path(root)
+        self.segment_bytes = segment_bytes or settings.ARCHIVE_SEGMENT_BYTES
+        self._indexed: dict[str, set[tuple]] = {}
+
+    @contextmanager
+    def exclusive(self) -> Iterator[None]:
+        """
+        Hold the archive's writer lock for the block. Raises ArchiveLocked
+        instead of waiting if another process holds it.
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.root / LOCK_NAME, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise ArchiveLocked(str(self.root)) from None
+            # Other processes may have written since we last read an index
+            self._indexed.clear()
+            yield
+        finally:
+            os.close(fd)
+
+    def _school_dir(self, school_id) -> Path:
+        return self.root / str(school_id)
+
+    def _current_segment(self, school_dir: Path) -> str:
+        segments = sorted(school_dir.glob("segment-*.jsonl.gz"))
+        if segments and segments[-1].stat().st_size < self.segment_bytes:
+            return segments[-1].name
+        return SEGMENT_PATTERN.format(len(segments) + 1)
+
+    def _indexed_keys(self, school_id) -> set[tuple]:
+        keys = self._indexed.get(str(school_id))
+        if keys is None:
+            keys = {
+                (e["table"], e["id"], e.get("deleted_at"))
+                for e in self._entries(school_id)
+            }
+            self._indexed[str(school_id)] = keys
+        return keys
+
+    def write(self, school_id, records: list[dict]) -> None:
+        indexed = self._indexed_keys(school_id)
+        records = [r for r in records if _key(r) not in indexed]
+        if not records:
+            return
+        school_dir = self._school_dir(school_id)
+        school_dir.mkdir(parents=True, exist_ok=True)
+        segment = self._current_segment(school_dir)
+
+        payload = "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records)
+        member = gzip.compress(payload.encode())
+        offset = _fsync_append(school_dir / segment, member)
+
+        # Index after data: a crash in between leaves unindexed bytes only
+        entries = [
+            {
+                "table": r["table"],
+                "id": r["row"]["id"],
+                "user_id": r["row"]["user_id"],
+                "deleted_at": r["row"].get("deleted_at"),
+                "segment": segment,
+                "offset": offset,
+                "length": len(member),
+            }
+            for r in records
+        ]
+        index = "".join(json.dumps(e, separators=(",", ":")) + "\n" for e in entries)
+        _fsync_append(school_dir / INDEX_NAME, index.encode())
+        indexed.update(_key(r) for r in records)
+
+    def archive_rows(self, db: Session, model, ids) -> int:
+        """
+        Copy the given soft-deleted rows (with their user, and roles for
+        memberships) into the archive. Call before hard-deleting them: if the
+        delete then rolls back, the copy stays behind and archiving the same
+        rows again adds nothing.
+        """
+        options = [joinedload(model.user)]
+        if model is Membership:
+            options.append(joinedload(Membership.roles).joinedload(MembershipRole.role))
+        stmt = (
+            select(model)
+            .options(*options)
+            .where(model.id.in_(ids))
+            .execution_options(include_deleted=True)
+        )
+        by_school = defaultdict(list)
+        for obj in db.execute(stmt).unique().scalars():
+            record = {
+                "table": model.__tablename__,
+                "row": _row(obj),
+                "user": _row(obj.user),
+            }
+            if model is Membership:
+                record["roles"] = sorted(mr.role.name for mr in obj.roles)
+            by_school[obj.school_id].append(record)
+
+        for school_id, records in by_school.items():
+            self.write(school_id, records)
+        return sum(len(records) for records in by_school.values())
+
+    def _entries(self, school_id):
+        path = self._school_dir(school_id) / INDEX_NAME
+        if not path.exists():
+            return
+        with open(path) as f:
+            for line in f:
+                yield json.loads(line)
+
+    def _read(self, school_id, entry: dict) -> dict:
+        path = self._school_dir(school_id) / entry["segment"]
+        with open(path, "rb") as f:
+            f.seek(entry["offset"])
+            member = f.read(entry["length"])
+        for line in gzip.decompress(member).decode().splitlines():
+            record = json.loads(line)
+            if record["table"] == entry["table"] and record["row"]["id"] == entry["id"]:
+                return record
+        raise LookupError(f"Archive index points at a missing record: {entry}")
+
+    def find(self, school_id, table: str, **match) -> dict | None:
+        """Return the most recently archived record matching the index fields."""
+        latest = None
+        for entry in self._entries(school_id):
+            if entry["table"] == table and all(
+                entry[k] == str(v) for k, v in match.items()
+            ):
+                latest = entry
+        return self._read(school_id, latest) if latest else None
+
+    def restore_rider(
+        self, db: Session, school_id, rider_profile_id
+    ) -> RiderProfile | None:
+        """
+        Bring one archived rider back as active: user, membership and profile.
+        Rows still present in the hot tables are undeleted instead.
+        """
+        record = self.find(school_id, "rider_profiles", id=rider_profile_id)
+        if record is None:
+            return None
+        profile_row = _decode_row(RiderProfile, record["row"])
+        user_id = profile_row["user_id"]
+
+        if db.get(User, user_id) is None:
+            db.add(User(**_decode_row(User, record["user"])))
+            db.flush()
+
+        membership = db.execute(
+            select(Membership)
+            .where(Membership.user_id == user_id, Membership.school_id == school_id)
+            .execution_options(include_deleted=True)
+        ).scalar_one_or_none()
+        if membership is not None:
+            membership.deleted_at = None
+        else:
+            archived = self.find(school_id, "memberships", user_id=user_id)
+            if archived is not None:
+                membership = Membership(**_decode_row(Membership, archived["row"]))
+                role_names = archived["roles"]
+            else:
+                membership = Membership(user_id=user_id, school_id=school_id)
+                role_names = [Role.RIDER]
+            membership.deleted_at = None
+            for name in role_names:
+                role_id = Role.get_id(db, name)
+                if role_id is not None:
+                    membership.roles.append(MembershipRole(role_id=role_id))
+            db.add(membership)
+
+        profile = db.get(
+            RiderProfile,
+            profile_row["id"],
+            execution_options={"include_deleted": True},
+        )
+        if profile is None:
+            profile = RiderProfile(**profile_row)
+            db.add(profile)
+        profile.deleted_at = None
+        db.commit()
+        return profile
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Restore archived tenant data.")
+    parser.add_argument("--archive-dir", default=settings.ARCHIVE_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+    restore = sub.add_parser("restore", help="Restore a single rider")
+    restore.add_argument("school_id", type=uuid.UUID)
+    restore.add_argument("rider_id", type=uuid.UUID)
+    args = parser.parse_args(argv)
+
+    if not args.archive_dir:
+        parser.error("--archive-dir or ARCHIVE_DIR is required")
+
+    from app.db import SessionLocal
+
+    db = SessionLocal()
+    try:
+        profile = Archive(args.archive_dir).restore_rider(
+            db, args.school_id, args.rider_id
+        )
+    finally:
+        db.close()
+    if profile is None:
+        raise SystemExit(f"Rider {args.rider_id} not found in archive")
+    print(f"Restored rider {args.rider_id}")
+
+
+if __name__ == "__main__":
+    main()
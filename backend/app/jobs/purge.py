@@ -0,0 +1,265 @@
+import argparse
+import asyncio
+import fcntl
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from collections.abc import Iterator
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import Engine, delete, func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.jobs.archive import Archive, ArchiveLocked
+from app.models.membership import Membership, MembershipRole
+from app.models.rider_profile import RiderProfile
+
+logger = logging.getLogger(__name__)
+
+# Serializes purges across workers and hosts on Postgres (pg_try_advisory_lock)
+_PURGE_LOCK_ID = 72_616_002
+
+
+class PurgeLocked(Exception):
+    """Another process is purging the same database."""
+
+
+PURGED_ROWS = registry.counter(
+    "db_purged_rows",
+    "Soft-deleted rows permanently removed by the purge job",
+    ("table",),
+)
+
+
+@dataclass
+class PurgeResult:
+    deleted: dict[str, int] = field(default_factory=dict)
+    seconds: float = 0.0
+
+    @property
+    def rows(self) -> int:
+        return sum(self.deleted.values())
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def add(self, table: str, count: int) -> None:
+        self.deleted[table] = self.deleted.get(table, 0) + count
+        PURGED_ROWS.labels(table).inc(count)
+
+
+def _expired_ids(db: Session, model, cutoff: datetime, after, batch_size: int):
+    stmt = (
+        select(model.id)
+        .where(model.deleted_at.is_not(None), model.deleted_at < cutoff)
+        .order_by(model.id)
+        .limit(batch_size)
+        .execution_options(include_deleted=True)
+    )
+    if after is not None:
+        stmt = stmt.where(model.id > after)
+    return list(db.execute(stmt).scalars())
+
+
+def _still_expired(model, ids, cutoff: datetime):
+    # Rechecked by every delete: a row restored since it was selected stays
+    return model.id.in_(ids), model.deleted_at < cutoff
+
+
+def _purge_in_chunks(db, model, cutoff, batch_size, delete_chunk) -> None:
+    """
+    Walk expired rows in primary-key order, deleting and committing one
+    chunk at a time so locks and transactions stay short.
+    """
+    last_id = None
+    while True:
+        ids = _expired_ids(db, model, cutoff, last_id, batch_size)
+        if not ids:
+            return
+        delete_chunk(ids)
+        db.commit()
+        last_id = ids[-1]
+
+
+@contextmanager
+def _single_runner(engine: Engine) -> Iterator[None]:
+    """
+    Hold the database's purge lock for the block: a session-level advisory
+    lock on Postgres, a file lock per database file on SQLite. Raises
+    PurgeLocked instead of waiting if another process holds it.
+    """
+    if engine.dialect.name == "postgresql":
+        with engine.connect() as conn:
+            locked = conn.execute(select(func.pg_try_advisory_lock(_PURGE_LOCK_ID)))
+            if not locked.scalar():
+                raise PurgeLocked(str(engine.url))
+            # Session-level: outlives this transaction, not the connection
+            conn.commit()
+            try:
+                yield
+            finally:
+                conn.execute(select(func.pg_advisory_unlock(_PURGE_LOCK_ID)))
+                conn.commit()
+    elif engine.dialect.name == "sqlite" and engine.url.database not in (
+        None,
+        "",
+        ":memory:",
+    ):
+        database = os.path.abspath(engine.url.database)
+        name = hashlib.sha256(database.encode()).hexdigest()[:16]
+        path = os.path.join(tempfile.gettempdir(), f"purge-{name}.lock")
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise PurgeLocked(database) from None
+            yield
+        finally:
+            os.close(fd)
+    else:
+        # In-memory SQLite: only this process can see it
+        yield
+
+
+def purge_soft_deleted(
+    db: Session,
+    retention_days: int | None = None,
+    batch_size: int | None = None,
+    now: datetime | None = None,
+    archive: Archive | None = None,
+) -> PurgeResult:
+    """
+    Permanently delete rider profiles and memberships soft-deleted more than
+    `retention_days` ago. Membership roles are removed with their membership.
+    Each chunk is copied to `archive` (default: ARCHIVE_DIR, if set) first.
+    Raises PurgeLocked if another process is purging the database, or
+    ArchiveLocked if one is writing to the archive.
+    """
+    if retention_days is None:
+        retention_days = settings.SOFT_DELETE_RETENTION_DAYS
+    if batch_size is None:
+        batch_size = settings.PURGE_BATCH_SIZE
+    if archive is None and settings.ARCHIVE_DIR:
+        archive = Archive(settings.ARCHIVE_DIR)
+    cutoff = (now or datetime.now(UTC)) - timedelta(days=retention_days)
+    with ExitStack() as locks:
+        locks.enter_context(_single_runner(db.get_bind()))
+        if archive is not None:
+            locks.enter_context(archive.exclusive())
+        return _purge(db, cutoff, batch_size, archive)
+
+
+def _purge(
+    db: Session, cutoff: datetime, batch_size: int, archive: Archive | None
+) -> PurgeResult:
+    result = PurgeResult()
+    start = time.perf_counter()
+
+    def delete_profiles(ids):
+        if archive is not None:
+            archive.archive_rows(db, RiderProfile, ids)
+        res = db.execute(
+            delete(RiderProfile).where(*_still_expired(RiderProfile, ids, cutoff))
+        )
+        result.add(RiderProfile.__tablename__, res.rowcount)
+
+    def delete_memberships(ids):
+        if archive is not None:
+            archive.archive_rows(db, Membership, ids)
+        # Locked until commit, so none can be restored between the deletes
+        expired = (
+            select(Membership.id)
+            .where(*_still_expired(Membership, ids, cutoff))
+            .with_for_update()
+            .execution_options(include_deleted=True)
+        )
+        res = db.execute(
+            delete(MembershipRole).where(MembershipRole.membership_id.in_(expired))
+        )
+        result.add(MembershipRole.__tablename__, res.rowcount)
+        res = db.execute(
+            delete(Membership).where(*_still_expired(Membership, ids, cutoff))
+        )
+        result.add(Membership.__tablename__, res.rowcount)
+
+    _purge_in_chunks(db, RiderProfile, cutoff, batch_size, delete_profiles)
+    _purge_in_chunks(db, Membership, cutoff, batch_size, delete_memberships)
+
+    result.seconds = time.perf_counter() - start
+    logger.info(
+        "Purged %d soft-deleted rows %s older than %s in %.2fs (%.0f rows/s)",
+        result.rows,
+        result.deleted,
+        cutoff.isoformat(),
+        result.seconds,
+        result.rows_per_second,
+    )
+    return result
+
+
+def _run_purge() -> PurgeResult:
+    from app.db import SessionLocal
+
+    db = SessionLocal()
+    try:
+        return purge_soft_deleted(db)
+    except (PurgeLocked, ArchiveLocked):
+        # Every worker runs the task; the one holding the lock does the work
+        logger.info("Skipping soft-delete purge: another worker is running it")
+        return PurgeResult()
+    finally:
+        db.close()
+
+
+async def run_periodic_purge(interval_seconds: int) -> None:
+    """
+    Purge on a fixed interval in a worker thread until cancelled.
+    """
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await asyncio.to_thread(_run_purge)
+        except Exception:
+            logger.exception("Soft-delete purge failed")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Permanently delete expired soft-deleted rows."
+    )
+    parser.add_argument(
+        "--retention-days", type=int, default=settings.SOFT_DELETE_RETENTION_DAYS
+    )
+    parser.add_argument("--batch-size", type=int, default=settings.PURGE_BATCH_SIZE)
+    parser.add_argument("--archive-dir", default=settings.ARCHIVE_DIR)
+    args = parser.parse_args(argv)
+    archive = Archive(args.archive_dir) if args.archive_dir else None
+
+    from app.db import SessionLocal
+
+    logging.basicConfig(level=logging.INFO)
+    db = SessionLocal()
+    try:
+        result = purge_soft_deleted(
+            db, args.retention_days, args.batch_size, archive=archive
+        )
+    except (PurgeLocked, ArchiveLocked):
+        raise SystemExit("Another purge is running") from None
+    finally:
+        db.close()
+    for table, count in result.deleted.items():
+        print(f"{table}: {count}")
+    print(f"{result.rows} rows in {result.seconds:.2f}s")
+    print(f"{result.rows_per_second:.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,39 +1,130 @@
-from contextlib import asynccontextmanager
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import Depends, FastAPI, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
 from .api import auth, riders, schools
+from .core import cache_epoch, permission_matrix, security, shared_cache
+from .core.compression import CompressionMiddleware
 from .core.config import settings
-from .core.middleware import SecurityHeadersMiddleware
-from .core.seed import seed_rbac
-from .db import Base, SessionLocal, engine, get_db
+from .core.health import HealthProber
+from .core.logs import configure_logging
+from .core.metrics import registry
+from .core.middleware import (
+    RequestIdMiddleware,
+    RequestMetricsMiddleware,
+    SecurityHeadersMiddleware,
+    ServerTimingMiddleware,
+)
+from .core.responses import FastJSONResponse
+from .core.startup import prepare_database, startup_fingerprint
+from .db import (
+    Base,
+    async_engine,
+    engine,
+    epoch_engine,
+    get_db,
+    pool_max_overflow,
+    probe_engine,
+)
+from .jobs.purge import run_periodic_purge
 
 # Import all models to ensure they are registered with Base.metadata
 
+logger = logging.getLogger(__name__)
+
+prober = HealthProber(
+    probe_engine,
+    pools={
+        "sync": (engine, pool_max_overflow["sync"]),
+        "async": (async_engine.sync_engine, pool_max_overflow["async"]),
+    },
+    interval_seconds=settings.HEALTH_PROBE_INTERVAL_SECONDS,
+    min_headroom=settings.HEALTH_MIN_POOL_HEADROOM,
+)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: Create tables and seed RBAC
-    # DEV ONLY: Drop all tables to support schema changes
-    if settings.ENVIRONMENT == "local":
-        Base.metadata.drop_all(bind=engine)
+    log_listener = configure_logging(
+        level=settings.LOG_LEVEL,
+        json=settings.LOG_JSON,
+        sample_rate=settings.LOG_INFO_SAMPLE_RATE,
+        queue_size=settings.LOG_QUEUE_SIZE,
+        batch_size=settings.LOG_BATCH_SIZE,
+    )
 
-    Base.metadata.create_all(bind=engine)
-    db = SessionLocal()
-    try:
-        seed_rbac(db)
-    finally:
-        db.close()
+    fingerprint = startup_fingerprint(Base.metadata, engine.dialect)
+    shared_cache.configure(
+        settings.SHARED_CACHE_PATH,
+        settings.SHARED_CACHE_SLOTS,
+        settings.SHARED_CACHE_SLOT_BYTES,
+        source=f"{settings.DATABASE_URL} {fingerprint}",
+    )
+
+    # Startup: Create tables and seed RBAC, skipped when the fingerprint matches
+    # DEV ONLY: local drops all tables when the schema changes
+    started = time.perf_counter()
+    changed = prepare_database(
+        engine, Base.metadata, reset_on_change=settings.ENVIRONMENT == "local"
+    )
+    if changed and shared_cache.segment is not None:
+        # Recreated or re-seeded: ids cached from the old rows no longer hold
+        shared_cache.segment.bump_all()
+    permission_matrix.load(engine)
+
+    probe_task = asyncio.create_task(prober.run())
+    epoch_task = None
+    if settings.CACHE_EPOCH_POLL_SECONDS > 0:
+        epoch_task = asyncio.create_task(
+            cache_epoch.run(epoch_engine, settings.CACHE_EPOCH_POLL_SECONDS)
+        )
+    purge_task = None
+    if settings.PURGE_INTERVAL_SECONDS > 0:
+        purge_task = asyncio.create_task(
+            run_periodic_purge(settings.PURGE_INTERVAL_SECONDS)
+        )
+    logger.info(
+        "Ready in %.0f ms (schema %s)",
+        (time.perf_counter() - started) * 1000,
+        "updated" if changed else "unchanged",
+    )
+    # Warm lazily imported crypto modules without delaying readiness
+    preload_task = asyncio.create_task(asyncio.to_thread(security.preload))
     yield
-    # Shutdown: Clean up resources if needed
+    # Shutdown: Stop background jobs and release pooled connections
+    for task in (probe_task, epoch_task, purge_task):
+        if task is not None:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+    await preload_task
+    await async_engine.dispose()
+    engine.dispose()
+    probe_engine.dispose()
+    epoch_engine.dispose()
+    shared_cache.close()
+    log_listener.stop()
 
 
-app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
+app = FastAPI(
+    title=settings.PROJECT_NAME,
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
+)
 
+app.add_middleware(
+    CompressionMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_SIZE
+)
 app.add_middleware(SecurityHeadersMiddleware)
+app.add_middleware(ServerTimingMiddleware)
+app.add_middleware(RequestMetricsMiddleware)
+app.add_middleware(RequestIdMiddleware)
 
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 app.include_router(schools.router, prefix="/api/schools", tags=["schools"])
@@ -56,3 +147,30 @@ def health_check(db: Session = Depends(get_db)):
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             content={"status": "unhealthy", "database": str(e)},
         )
+
+
+@app.get("/health/live")
+async def liveness():
+    # Touches no dependencies: only fails if the process cannot serve at all
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def readiness():
+    health = prober.status()
+    return JSONResponse(
+        status_code=status.HTTP_200_OK
+        if health.ready
+        else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "status": "ready" if health.ready else "unavailable",
+            "database": health.database,
+            "pool_headroom": health.pool_headroom,
+        },
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    # Internal scrape target; not proxied to the public frontend
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -36,12 +36,16 @@ def _add_filtering_criteria(execute_state):
     If the query involves a model with SoftDeleteMixin,
     filter out records where deleted_at is not None.
     To include deleted records, add execution_options(include_deleted=True).
+    Prebuilt statements that already filter deleted_at set
+    soft_delete_applied=True so they can be executed without being cloned.
     """
+    options = execute_state.execution_options
     if (
         execute_state.is_select
         and not execute_state.is_column_load
         and not execute_state.is_relationship_load
-        and not execute_state.execution_options.get("include_deleted", False)
+        and not options.get("include_deleted", False)
+        and not options.get("soft_delete_applied", False)
     ):
         execute_state.statement = execute_state.statement.options(
             with_loader_criteria(
@@ -0,0 +1,15 @@
+from sqlalchemy import BigInteger, Column, String
+
+from .base import Base, TimestampMixin
+
+
+class CacheVersion(Base, TimestampMixin):
+    """Epoch of one process-local cache, bumped by commits that invalidate it."""
+
+    __tablename__ = "cache_versions"
+
+    name = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<CacheVersion(name='{self.name}', version={self.version})>"
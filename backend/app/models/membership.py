@@ -1,8 +1,24 @@
+from itertools import chain
+
 import uuid6
-from sqlalchemy import Column, ForeignKey, Integer, UniqueConstraint
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    Column,
+    ForeignKey,
+    Index,
+    Integer,
+    UniqueConstraint,
+    event,
+    inspect,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.orm import Session, relationship
+from sqlalchemy.orm.attributes import PASSIVE_NO_INITIALIZE, get_history
 from sqlalchemy.types import Uuid
 
+from app.core import permission_matrix
+
 from .base import Base, SoftDeleteMixin, TenantMixin, TimestampMixin
 
 
@@ -12,6 +28,9 @@ class Membership(Base, TimestampMixin, TenantMixin, SoftDeleteMixin):
     id = Column(Uuid, primary_key=True, default=uuid6.uuid7)
     user_id = Column(Uuid, ForeignKey("users.id"), nullable=False, index=True)
     school_id = Column(Uuid, ForeignKey("schools.id"), nullable=False, index=True)
+    # Bumped whenever the membership's roles change; access tokens carry the
+    # value they were issued at, so a mismatch means their perms are stale.
+    perm_epoch = Column(Integer, nullable=False, default=0, server_default="0")
 
     user = relationship("User", back_populates="memberships")
     school = relationship("School", back_populates="memberships")
@@ -19,19 +38,25 @@ class Membership(Base, TimestampMixin, TenantMixin, SoftDeleteMixin):
         "MembershipRole", back_populates="membership", cascade="all, delete-orphan"
     )
 
-    __table_args__ = (UniqueConstraint("user_id", "school_id", name="uq_user_school"),)
+    __table_args__ = (
+        UniqueConstraint("user_id", "school_id", name="uq_user_school"),
+        # Partial index: only soft-deleted rows, for the purge job
+        Index(
+            "ix_memberships_deleted_at",
+            "deleted_at",
+            postgresql_where=text("deleted_at IS NOT NULL"),
+            sqlite_where=text("deleted_at IS NOT NULL"),
+        ),
+    )
 
     @property
     def permissions(self):
         """
-        Returns a flat list of permission names from all associated roles.
+        Returns a flat list of permission names from all associated roles,
+        resolved from their role IDs through the permission matrix.
         """
-        perms = set()
-        for mr in self.roles:
-            if mr.role and mr.role.permissions:
-                for p in mr.role.permissions:
-                    perms.add(p.name)
-        return list(perms)
+        matrix = permission_matrix.current()
+        return sorted(matrix.for_roles(mr.role_id for mr in self.roles))
 
 
 class MembershipRole(Base):
@@ -42,3 +67,89 @@ class MembershipRole(Base):
 
     membership = relationship("Membership", back_populates="roles")
     role = relationship("Role", back_populates="membership_roles")
+
+
+def _role_memberships(session: Session, role: "MembershipRole"):
+    """
+    The memberships a pending role row changes: the one it belongs to and,
+    when it was moved or removed from a collection, the one it left.
+    """
+    # Rows appended to membership.roles only know their parent object until
+    # the flush fills in membership_id; read it without loading the parent
+    parent = get_history(role, "membership", passive=PASSIVE_NO_INITIALIZE)
+    yield from chain(parent.added, parent.unchanged, parent.deleted)
+    column = get_history(role, "membership_id")
+    for membership_id in chain(column.added, column.unchanged, column.deleted):
+        if membership_id is not None:
+            yield session.get(Membership, membership_id)
+
+
+@event.listens_for(Session, "before_flush")
+def _bump_perm_epochs(session: Session, flush_context, instances) -> None:
+    roles = [
+        obj
+        for obj in chain(session.new, session.dirty, session.deleted)
+        if isinstance(obj, MembershipRole)
+    ]
+    if not roles:
+        return
+    with session.no_autoflush:
+        memberships = {
+            membership
+            for role in roles
+            for membership in _role_memberships(session, role)
+        }
+        for membership in memberships:
+            # New memberships start at the default; deleted ones are gone
+            if membership is None or not inspect(membership).persistent:
+                continue
+            if membership in session.deleted:
+                continue
+            # Incremented in SQL, so concurrent role changes both count
+            membership.perm_epoch = Membership.perm_epoch + 1
+
+
+def _inserted_membership_ids(execute_state) -> set:
+    params = execute_state.parameters or execute_state.statement.compile().params
+    rows = params if isinstance(params, list) else [params]
+    # Multi-row VALUES compile to membership_id_m0, membership_id_m1, ...
+    return {
+        value
+        for row in rows
+        for key, value in row.items()
+        if key.startswith("membership_id")
+    }
+
+
+def _selected_membership_ids(statement):
+    """The membership_id column of an INSERT ... FROM SELECT's source rows."""
+    source = statement.select.subquery()
+    position = statement._select_names.index("membership_id")
+    return select(list(source.c)[position])
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _bump_perm_epochs_for_dml(execute_state) -> None:
+    # Bulk and Core DML on roles skips the flush above: bump the memberships
+    # it is about to change, in the same transaction
+    statement = execute_state.statement
+    is_dml = (
+        execute_state.is_insert or execute_state.is_update or execute_state.is_delete
+    )
+    # Annotated copies of the table compare equal, not identical
+    if not is_dml or getattr(statement, "table", None) != MembershipRole.__table__:
+        return
+    if execute_state.is_insert and statement.select is not None:
+        affected = Membership.id.in_(_selected_membership_ids(statement))
+    elif execute_state.is_insert:
+        affected = Membership.id.in_(_inserted_membership_ids(execute_state))
+    else:
+        changed = select(MembershipRole.membership_id)
+        if statement.whereclause is not None:
+            changed = changed.where(statement.whereclause)
+        affected = Membership.id.in_(changed)
+    execute_state.session.execute(
+        update(Membership)
+        .where(affected, Membership.deleted_at.is_(None))
+        .values(perm_epoch=Membership.perm_epoch + 1)
+    )
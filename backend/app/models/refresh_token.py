@@ -15,3 +15,6 @@ class RefreshToken(Base, TimestampMixin):
     revoked_at = Column(DateTime(timezone=True), nullable=True)
     # ID of the new token replacing this one
     replaced_by = Column(String, nullable=True)
+    # School context the session is in, carried over when the token rotates.
+    # Not a foreign key: a stale value just falls back to the first membership.
+    school_id = Column(Uuid, nullable=True)
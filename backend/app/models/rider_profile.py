@@ -1,5 +1,5 @@
 import uuid6
-from sqlalchemy import Column, Date, Float, ForeignKey
+from sqlalchemy import Column, Date, Float, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.types import Uuid
 
@@ -20,5 +20,15 @@ class RiderProfile(Base, TimestampMixin, TenantMixin, SoftDeleteMixin):
     user = relationship("User", back_populates="rider_profiles")
     school = relationship("School", back_populates="rider_profiles")
 
+    # Partial index: only soft-deleted rows, for the purge job
+    __table_args__ = (
+        Index(
+            "ix_rider_profiles_deleted_at",
+            "deleted_at",
+            postgresql_where=text("deleted_at IS NOT NULL"),
+            sqlite_where=text("deleted_at IS NOT NULL"),
+        ),
+    )
+
     def __repr__(self):
         return f"<RiderProfile(id='{self.id}')>"
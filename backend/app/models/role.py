@@ -1,8 +1,8 @@
-from typing import ClassVar
-
-from sqlalchemy import Column, ForeignKey, Integer, String, Table, event
+from sqlalchemy import Column, ForeignKey, Integer, String, Table, event, inspect
 from sqlalchemy.orm import Session, relationship
 
+from app.core.transactional_cache import TransactionalCache
+
 from .base import Base
 
 role_permissions = Table(
@@ -26,17 +26,14 @@ class Role(Base):
     PARENT = "PARENT"
     RIDER = "RIDER"
 
-    # Cache for role IDs to avoid redundant lookups
-    _id_cache: ClassVar[dict[str, int]] = {}
-    _pending_cache_key: ClassVar[str] = "_pending_role_id_cache"
-
     @classmethod
     def get_id(cls, db: Session, name: str) -> int | None:
         """
         Get role ID by name, using in-memory cache if available.
         """
-        if name in cls._id_cache:
-            return cls._id_cache[name]
+        role_id = _id_cache.get(name)
+        if role_id is not None:
+            return role_id
 
         role = db.query(cls).filter(cls.name == name).first()
         if role:
@@ -46,17 +43,16 @@ class Role(Base):
 
     @classmethod
     def get_cached_id(cls, name: str) -> int | None:
-        return cls._id_cache.get(name)
+        return _id_cache.get(name)
 
     @classmethod
     def stage_cache_update(cls, db: Session, name: str, role_id: int) -> None:
-        pending = db.info.setdefault(cls._pending_cache_key, {})
-        pending[name] = role_id
+        _id_cache.stage_put(db, name, role_id)
 
     @classmethod
     def clear_cache(cls):
         """Clear the role ID cache."""
-        cls._id_cache.clear()
+        _id_cache.clear()
 
     membership_roles = relationship("MembershipRole", back_populates="role")
     permissions = relationship(
@@ -67,12 +63,23 @@ class Role(Base):
         return f"<Role(name='{self.name}')>"
 
 
-@event.listens_for(Session, "after_commit")
-def _flush_pending_role_cache(session: Session) -> None:
-    pending = session.info.pop(Role._pending_cache_key, {})
-    Role._id_cache.update(pending)
+# Role IDs by name, to avoid redundant lookups
+_id_cache: TransactionalCache[str, int] = TransactionalCache(
+    "role_ids", tables=[Role.__table__], shared=int
+)
 
 
-@event.listens_for(Session, "after_rollback")
-def _clear_pending_role_cache(session: Session) -> None:
-    session.info.pop(Role._pending_cache_key, None)
+@event.listens_for(Session, "after_flush")
+def _stage_role_cache_evictions(session: Session, flush_context) -> None:
+    # A renamed or deleted role leaves its old name behind
+    for obj in session.dirty:
+        if isinstance(obj, Role):
+            history = inspect(obj).attrs.name.history
+            if history.deleted:
+                _id_cache.stage_evict(session, history.deleted)
+            elif history.added:
+                # Previous name was never loaded
+                _id_cache.stage_clear(session)
+    names = [obj.name for obj in session.deleted if isinstance(obj, Role)]
+    if names:
+        _id_cache.stage_evict(session, names)
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String
+
+from .base import Base, TimestampMixin
+
+
+class SchemaState(Base, TimestampMixin):
+    """Key/value facts about the deployed schema, e.g. the startup fingerprint."""
+
+    __tablename__ = "schema_state"
+
+    key = Column(String, primary_key=True)
+    value = Column(String, nullable=False)
+
+    def __repr__(self):
+        return f"<SchemaState(key='{self.key}')>"
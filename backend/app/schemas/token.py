@@ -11,3 +11,5 @@ class TokenPayload(BaseModel):
     sid: str | None = None
     perms: list[str] = []
     roles: list[str] = []
+    # Membership perm_epoch the perms were read at
+    pe: int | None = None
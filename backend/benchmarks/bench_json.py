@@ -0,0 +1,75 @@
+"""
+Compare response encoding: FastAPI's default path (JSON-mode dump plus stdlib
+json via JSONResponse) against Python-mode dump plus FastJSONResponse.
+
+Usage (from backend/):
+    python -m benchmarks.bench_json --riders 500 --iterations 200
+"""
+
+import argparse
+import json
+import timeit
+import uuid
+from datetime import date
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.core.read_models import MeRead, RiderRead, SchoolRead
+from app.core.responses import FastJSONResponse
+from app.schemas.rider import RiderResponse
+from app.schemas.user import UserWithSchool
+
+
+def payloads(riders: int):
+    school = SchoolRead(uuid.uuid4(), "Bench School", "bench-school")
+    rows = [
+        RiderRead(
+            uuid.uuid4(),
+            uuid.uuid4(),
+            f"Rider{i}",
+            "Bench",
+            f"rider{i}@example.com",
+            150.0,
+            42.5,
+            date(2012, 4, 1),
+            school.id,
+        )
+        for i in range(riders)
+    ]
+    me = MeRead(
+        uuid.uuid4(), "Ada", "Admin", "ada@example.com", school.id, school, ["ADMIN"]
+    )
+    return {
+        f"rider list ({riders})": (TypeAdapter(list[RiderResponse]), rows),
+        "rider detail": (TypeAdapter(RiderResponse), rows[0]),
+        "/me": (TypeAdapter(UserWithSchool), me),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--riders", type=int, default=500)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    for name, (adapter, data) in payloads(args.riders).items():
+        value = adapter.validate_python(data)
+
+        def stdlib(adapter=adapter, value=value):
+            return JSONResponse(adapter.dump_python(value, mode="json")).body
+
+        def fast(adapter=adapter, value=value):
+            return FastJSONResponse(adapter.dump_python(value)).body
+
+        assert json.loads(stdlib()) == json.loads(fast())
+        slow_us = timeit.timeit(stdlib, number=args.iterations) / args.iterations
+        fast_us = timeit.timeit(fast, number=args.iterations) / args.iterations
+        print(
+            f"{name:>18}: stdlib {slow_us * 1e6:9.1f} us  "
+            f"orjson {fast_us * 1e6:9.1f} us  ({slow_us / fast_us:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
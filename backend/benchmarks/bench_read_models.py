@@ -0,0 +1,125 @@
+"""
+Compare peak memory of serving a large rider list from ORM instances against
+the slotted read models in app.core.read_models.
+
+Each mode runs in a fresh interpreter so peak RSS is not shared between them.
+
+Usage (from backend/):
+    python -m benchmarks.bench_read_models --riders 50000
+"""
+
+import argparse
+import asyncio
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import joinedload
+
+import app.main  # noqa: F401  (registers every mapper)
+from app.core import read_models
+from app.db import Base, get_async_url
+from app.models.rider_profile import RiderProfile
+from app.models.school import School
+from app.models.user import User
+from app.schemas.rider import RiderResponse
+
+
+def seed(url: str, riders: int) -> uuid.UUID:
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    school_id = uuid.uuid4()
+    user_ids = [uuid.uuid4() for _ in range(riders)]
+    with engine.begin() as conn:
+        conn.execute(insert(School), [{"id": school_id, "name": "B", "slug": "b"}])
+        conn.execute(
+            insert(User),
+            [
+                {"id": uid, "first_name": f"Rider{i}", "last_name": "Bench"}
+                for i, uid in enumerate(user_ids)
+            ],
+        )
+        conn.execute(
+            insert(RiderProfile),
+            [
+                {"id": uuid.uuid4(), "user_id": uid, "school_id": school_id}
+                for uid in user_ids
+            ],
+        )
+    engine.dispose()
+    return school_id
+
+
+async def load(url: str, school_id: uuid.UUID, mode: str) -> int:
+    engine = create_async_engine(get_async_url(url))
+    async with AsyncSession(engine) as db:
+        if mode == "orm":
+            result = await db.execute(
+                select(RiderProfile)
+                .options(joinedload(RiderProfile.user))
+                .filter(RiderProfile.school_id == school_id)
+            )
+            riders = result.scalars().all()
+        else:
+            riders = await read_models.list_riders(db, school_id)
+        # What FastAPI does with response_model=list[RiderResponse]
+        body = [RiderResponse.model_validate(r).model_dump(mode="json") for r in riders]
+    await engine.dispose()
+    return len(body)
+
+
+def measure(url: str, school_id: uuid.UUID, mode: str) -> None:
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = asyncio.run(load(url, school_id, mode))
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(
+        f"{mode:>5}: {count} riders in {elapsed:6.2f}s  "
+        f"peak RSS +{(peak_kb - baseline_kb) / 1024:7.1f} MiB  "
+        f"peak traced {peak / 2**20:7.1f} MiB"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--riders", type=int, default=50_000)
+    parser.add_argument("--url", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--school-id", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--mode", choices=("orm", "read"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        measure(args.url, uuid.UUID(args.school_id), args.mode)
+        return
+
+    url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    school_id = seed(url, args.riders)
+    for mode in ("orm", "read"):
+        subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.bench_read_models",
+                "--url",
+                url,
+                "--school-id",
+                str(school_id),
+                "--mode",
+                mode,
+            ],
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Compare the default SQLite setup against the production profile under
+concurrent writers and readers.
+
+Each writer stands in for a separate worker process (own engine) running
+read-then-write transactions; readers run the rider list query.
+
+Usage (from backend/):
+    python -m benchmarks.bench_sqlite_profile --writers 4 --readers 8 --seconds 5
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, text
+
+from app.core.sqlite import apply_sqlite_profile
+
+SCHEMA = """
+CREATE TABLE riders (
+    id INTEGER PRIMARY KEY,
+    school_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    seq INTEGER NOT NULL
+)
+"""
+
+
+def make_engine(path: str, profile: str, writer: bool):
+    kwargs = {"connect_args": {"check_same_thread": False}}
+    if profile == "production" and writer:
+        kwargs.update(pool_size=1, max_overflow=0)
+    engine = create_engine(f"sqlite:///{path}", **kwargs)
+    if profile == "production":
+        apply_sqlite_profile(engine, writer=writer)
+    return engine
+
+
+def run(profile: str, writers: int, readers: int, seconds: float) -> dict:
+    path = os.path.join(tempfile.mkdtemp(), f"{profile}.db")
+    setup = make_engine(path, profile, writer=True)
+    with setup.begin() as conn:
+        conn.execute(text(SCHEMA))
+        conn.execute(text("CREATE INDEX ix_riders_school ON riders (school_id)"))
+    setup.dispose()
+
+    stop = threading.Event()
+    stats = {"writes": 0, "reads": 0, "errors": 0, "lost_updates": 0}
+    lock = threading.Lock()
+
+    def writer_loop():
+        engine = make_engine(path, profile, writer=True)
+        done = errors = 0
+        while not stop.is_set():
+            try:
+                with engine.begin() as conn:
+                    seq = conn.execute(text("SELECT count(*) FROM riders")).scalar()
+                    conn.execute(
+                        text(
+                            "INSERT INTO riders (school_id, name, seq) "
+                            "VALUES (1, 'bench', :seq)"
+                        ),
+                        {"seq": seq},
+                    )
+                done += 1
+            except Exception:
+                errors += 1
+        engine.dispose()
+        with lock:
+            stats["writes"] += done
+            stats["errors"] += errors
+
+    def reader_loop():
+        engine = make_engine(path, profile, writer=False)
+        done = errors = 0
+        while not stop.is_set():
+            try:
+                with engine.connect() as conn:
+                    conn.execute(
+                        text("SELECT * FROM riders WHERE school_id = 1 LIMIT 200")
+                    ).all()
+                done += 1
+            except Exception:
+                errors += 1
+        engine.dispose()
+        with lock:
+            stats["reads"] += done
+            stats["errors"] += errors
+
+    threads = [threading.Thread(target=writer_loop) for _ in range(writers)]
+    threads += [threading.Thread(target=reader_loop) for _ in range(readers)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    check = make_engine(path, profile, writer=False)
+    with check.connect() as conn:
+        total, distinct = conn.execute(
+            text("SELECT count(*), count(DISTINCT seq) FROM riders")
+        ).one()
+    check.dispose()
+    stats["lost_updates"] = total - distinct
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f"{args.writers} writers, {args.readers} readers, {args.seconds}s each")
+    for profile in ("default", "production"):
+        s = run(profile, args.writers, args.readers, args.seconds)
+        print(
+            f"{profile:>10}: {s['writes'] / args.seconds:8.1f} writes/s "
+            f"{s['reads'] / args.seconds:8.1f} reads/s "
+            f"errors={s['errors']} lost_updates={s['lost_updates']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
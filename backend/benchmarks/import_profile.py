@@ -0,0 +1,49 @@
+"""
+Profile cold import time of the app (python -X importtime) and list the
+slowest modules by cumulative and self time.
+
+Usage (from backend/):
+    python -m benchmarks.import_profile --module app.main --top 25
+"""
+
+import argparse
+import subprocess
+import sys
+
+
+def profile_imports(module: str) -> list[tuple[str, int, int]]:
+    """Return (module, self_us, cumulative_us) per import in a fresh interpreter."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--top", type=int, default=25)
+    args = parser.parse_args()
+
+    rows = profile_imports(args.module)
+    total = next(cum for name, _, cum in rows if name == args.module)
+    print(f"import {args.module}: {total / 1000:.1f} ms, {len(rows)} modules\n")
+
+    for title, key in (("cumulative", 2), ("self", 1)):
+        print(f"Top {args.top} by {title} time (ms)")
+        for row in sorted(rows, key=lambda r: r[key], reverse=True)[: args.top]:
+            print(f"{row[key] / 1000:9.1f}  {row[0]}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
 #!/bin/sh
 set -e
 
-python -c "import urllib.request,sys; sys.exit(0 if urllib.request.urlopen('http://localhost:8000/health').getcode()==200 else 1)"
+python -c "import urllib.request,sys; sys.exit(0 if urllib.request.urlopen('http://localhost:8000/health/ready').getcode()==200 else 1)"
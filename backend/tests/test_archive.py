@@ -0,0 +1,130 @@
+import gzip
+import json
+from datetime import UTC, date, datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.jobs.archive import Archive, ArchiveLocked
+from app.jobs.purge import purge_soft_deleted
+from app.models.membership import Membership, MembershipRole
+from app.models.rider_profile import RiderProfile
+from app.models.role import Role
+from app.models.school import School
+from app.models.user import User
+
+NOW = datetime(2026, 6, 1, tzinfo=UTC)
+
+
+def _deleted_rider(db_session, name):
+    school = School(name=f"Archive School {name}", slug=f"archive-school-{name}")
+    user = User(first_name=name, last_name="Archived")
+    db_session.add_all([school, user])
+    db_session.flush()
+    deleted_at = NOW - timedelta(days=400)
+    membership = Membership(user_id=user.id, school_id=school.id, deleted_at=deleted_at)
+    membership.roles.append(MembershipRole(role_id=Role.get_id(db_session, Role.RIDER)))
+    profile = RiderProfile(
+        user_id=user.id,
+        school_id=school.id,
+        height_cm=150.5,
+        date_of_birth=date(2012, 4, 1),
+        deleted_at=deleted_at,
+    )
+    db_session.add_all([membership, profile])
+    db_session.commit()
+    return school.id, user.id, profile.id
+
+
+def test_purge_archives_rows_per_school_before_deleting(db_session, tmp_path):
+    school_id, user_id, profile_id = _deleted_rider(db_session, "seg")
+    archive = Archive(tmp_path)
+
+    purge_soft_deleted(db_session, retention_days=365, now=NOW, archive=archive)
+
+    school_dir = tmp_path / str(school_id)
+    segments = list(school_dir.glob("segment-*.jsonl.gz"))
+    assert len(segments) == 1
+    lines = gzip.decompress(segments[0].read_bytes()).decode().splitlines()
+    tables = sorted(json.loads(line)["table"] for line in lines)
+    assert tables == ["memberships", "rider_profiles"]
+
+    membership = archive.find(school_id, "memberships", user_id=user_id)
+    assert membership["roles"] == [Role.RIDER]
+    assert membership["user"]["first_name"] == "seg"
+    assert archive.find(school_id, "rider_profiles", id=profile_id) is not None
+
+
+def test_restore_rider_from_archive(db_session, tmp_path):
+    school_id, user_id, profile_id = _deleted_rider(db_session, "restore")
+    archive = Archive(tmp_path)
+    purge_soft_deleted(db_session, retention_days=365, now=NOW, archive=archive)
+    assert db_session.get(RiderProfile, profile_id) is None
+
+    restored = archive.restore_rider(db_session, school_id, profile_id)
+
+    assert restored.id == profile_id
+    db_session.expire_all()
+    profile = db_session.get(RiderProfile, profile_id)
+    assert profile.deleted_at is None
+    assert profile.height_cm == 150.5
+    assert profile.date_of_birth == date(2012, 4, 1)
+    membership = db_session.execute(
+        select(Membership).where(
+            Membership.user_id == user_id, Membership.school_id == school_id
+        )
+    ).scalar_one()
+    assert [mr.role.name for mr in membership.roles] == [Role.RIDER]
+
+
+def test_restore_unknown_rider_returns_none(db_session, tmp_path):
+    school_id, _, _ = _deleted_rider(db_session, "unknown")
+    assert Archive(tmp_path).restore_rider(db_session, school_id, school_id) is None
+
+
+def _record(id_, deleted_at="2026-01-01T00:00:00"):
+    row = {"id": id_, "user_id": "b", "deleted_at": deleted_at}
+    return {"table": "rider_profiles", "row": row}
+
+
+def test_segments_rotate_at_size_limit(tmp_path):
+    archive = Archive(tmp_path, segment_bytes=1)
+    archive.write("school", [_record("a")])
+    archive.write("school", [_record("c")])
+    assert len(list((tmp_path / "school").glob("segment-*.jsonl.gz"))) == 2
+    assert archive.find("school", "rider_profiles", id="a")["row"]["id"] == "a"
+
+
+def test_archiving_the_same_deletion_again_adds_nothing(tmp_path):
+    Archive(tmp_path).write("school", [_record("a")])
+
+    # E.g. a purge chunk whose delete rolled back, retried by a new run
+    archive = Archive(tmp_path)
+    archive.write("school", [_record("a"), _record("c")])
+    archive.write("school", [_record("a", deleted_at="2026-02-01T00:00:00")])
+
+    index = (tmp_path / "school" / "index.jsonl").read_text().splitlines()
+    assert len(index) == 3
+    latest = archive.find("school", "rider_profiles", id="a")
+    assert latest["row"]["deleted_at"] == "2026-02-01T00:00:00"
+
+
+def test_one_purge_writes_the_archive_at_a_time(db_session, tmp_path):
+    school_id, _, profile_id = _deleted_rider(db_session, "locked")
+    other_worker = Archive(tmp_path)
+
+    with other_worker.exclusive():
+        with pytest.raises(ArchiveLocked):
+            purge_soft_deleted(
+                db_session, retention_days=365, now=NOW, archive=Archive(tmp_path)
+            )
+    include_deleted = {"include_deleted": True}
+    assert db_session.get(RiderProfile, profile_id, execution_options=include_deleted)
+
+    purge_soft_deleted(db_session, retention_days=365, now=NOW, archive=other_worker)
+    db_session.expire_all()
+    assert (
+        db_session.get(RiderProfile, profile_id, execution_options=include_deleted)
+        is None
+    )
+    assert other_worker.find(school_id, "rider_profiles", id=profile_id)
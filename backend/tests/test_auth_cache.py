@@ -0,0 +1,112 @@
+import uuid
+
+import pytest
+from sqlalchemy import event
+
+from app.core import auth_cache
+from app.models.membership import Membership, MembershipRole
+from app.models.role import Role
+from app.models.school import School
+from app.models.user import User
+from tests.conftest import engine
+
+
+@pytest.fixture
+def member(db_session):
+    user = User(
+        email=f"snap_{uuid.uuid4().hex[:8]}@example.com",
+        first_name="Snap",
+        last_name="Shot",
+    )
+    school = School(name="Snapshot School", slug=f"snap-{uuid.uuid4().hex[:8]}")
+    db_session.add_all([user, school])
+    db_session.flush()
+    membership = Membership(user_id=user.id, school_id=school.id)
+    db_session.add(membership)
+    db_session.flush()
+    db_session.add(
+        MembershipRole(
+            membership_id=membership.id,
+            role_id=Role.get_id(db_session, Role.INSTRUCTOR),
+        )
+    )
+    db_session.commit()
+    return user.id, school.id, membership.id
+
+
+@pytest.fixture
+def statements():
+    recorded = []
+
+    def record(conn, cursor, statement, *args):
+        recorded.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield recorded
+    event.remove(engine, "before_cursor_execute", record)
+
+
+def test_snapshot_is_cached(db_session, member, statements):
+    user_id, school_id, _ = member
+
+    first = auth_cache.get_snapshot_sync(db_session, user_id, school_id)
+    second = auth_cache.get_snapshot_sync(db_session, user_id, school_id)
+
+    assert first is second
+    assert first.school_id == school_id
+    assert first.roles == (Role.INSTRUCTOR,)
+    assert "riders:view" in first.permissions
+    assert len(statements) == 1
+    assert auth_cache.get_snapshot_sync(db_session, uuid.uuid4(), school_id) is None
+
+
+def test_role_changes_evict_after_commit(db_session, member):
+    user_id, school_id, membership_id = member
+    before = auth_cache.get_snapshot_sync(db_session, user_id, school_id)
+    admin = MembershipRole(
+        membership_id=membership_id, role_id=Role.get_id(db_session, Role.ADMIN)
+    )
+
+    db_session.add(admin)
+    db_session.flush()
+    db_session.rollback()
+    assert auth_cache.get_snapshot_sync(db_session, user_id, school_id) is before
+
+    db_session.add(admin)
+    db_session.commit()
+    after = auth_cache.get_snapshot_sync(db_session, user_id, school_id)
+    assert after is not before
+    assert after.roles == (Role.ADMIN, Role.INSTRUCTOR)
+    assert "riders:delete" in after.permissions
+
+
+def test_removed_membership_is_evicted(db_session, member):
+    user_id, school_id, membership_id = member
+    assert auth_cache.get_snapshot_sync(db_session, user_id, None) is not None
+
+    membership = db_session.get(Membership, membership_id)
+    db_session.delete(membership)
+    db_session.commit()
+
+    assert auth_cache.get_snapshot_sync(db_session, user_id, school_id) is None
+    assert auth_cache.get_snapshot_sync(db_session, user_id, None) is None
+
+
+def test_users_without_membership_are_cached_until_they_join(
+    db_session, member, statements
+):
+    _, school_id, _ = member
+    user = User(first_name="No", last_name="School")
+    db_session.add(user)
+    db_session.commit()
+    user_id = user.id
+    statements.clear()
+
+    assert auth_cache.get_snapshot_sync(db_session, user_id, None) is None
+    assert auth_cache.get_snapshot_sync(db_session, user_id, None) is None
+    assert len(statements) == 1
+
+    db_session.add(Membership(user_id=user_id, school_id=school_id))
+    db_session.commit()
+    snapshot = auth_cache.get_snapshot_sync(db_session, user_id, None)
+    assert snapshot.school_id == school_id
@@ -0,0 +1,143 @@
+import uuid
+
+import pytest
+from sqlalchemy import select, update
+
+from app.core import auth_cache, cache_epoch, permission_matrix
+from app.models.cache_version import CacheVersion
+from app.models.membership import Membership, MembershipRole
+from app.models.role import Role
+from app.models.school import School
+from app.models.user import User
+from tests.conftest import TestingSessionLocal, engine
+
+
+def _version(db, name: str) -> int | None:
+    return db.execute(
+        select(CacheVersion.version).where(CacheVersion.name == name)
+    ).scalar()
+
+
+def _bump_elsewhere(name: str) -> None:
+    """What a commit on another worker leaves behind."""
+    with engine.begin() as conn:
+        conn.execute(
+            update(CacheVersion)
+            .where(CacheVersion.name == name)
+            .values(version=CacheVersion.version + 1)
+        )
+
+
+@pytest.fixture
+def role(db_session):
+    role = Role(name=f"EPOCH_{uuid.uuid4().hex[:8]}")
+    db_session.add(role)
+    db_session.commit()
+    cache_epoch.poll(engine)
+    return role
+
+
+def test_commits_bump_epochs_of_their_tables(db_session, role):
+    before = _version(db_session, "role_ids")
+    slugs = _version(db_session, "school_slugs")
+
+    role.description = "Rolled back"
+    db_session.flush()
+    db_session.rollback()
+    assert _version(db_session, "role_ids") == before
+
+    role.description = "Committed"
+    db_session.commit()
+    assert _version(db_session, "role_ids") == before + 1
+    assert _version(db_session, "school_slugs") == slugs
+
+
+def test_own_commits_do_not_reset_local_caches(db_session, role):
+    Role.get_id(db_session, role.name)
+    role.description = "Changed here"
+    db_session.commit()
+
+    assert cache_epoch.poll(engine) == []
+    assert Role.get_cached_id(role.name) == role.id
+
+
+def test_poll_resets_caches_changed_elsewhere(db_session, role):
+    Role.get_id(db_session, role.name)
+    db_session.commit()
+    matrix = permission_matrix.current()
+
+    _bump_elsewhere("role_ids")
+    _bump_elsewhere("permission_matrix")
+
+    assert sorted(cache_epoch.poll(engine)) == ["permission_matrix", "role_ids"]
+    assert Role.get_cached_id(role.name) is None
+    # Reloaded rather than emptied
+    assert permission_matrix.current() is not matrix
+    assert permission_matrix.current().for_role(Role.get_id(db_session, Role.ADMIN))
+    assert cache_epoch.poll(engine) == []
+
+
+def test_unseen_bump_survives_own_commit(db_session, role):
+    Role.get_id(db_session, role.name)
+    _bump_elsewhere("role_ids")
+
+    role.description = "Changed on both"
+    db_session.commit()
+
+    assert "role_ids" in cache_epoch.poll(engine)
+    assert Role.get_cached_id(role.name) is None
+
+
+def test_membership_changes_bump_their_users_partition(db_session):
+    user = User(first_name="Epoch", last_name="Partition")
+    school = School(name="Partition School", slug=f"part-{uuid.uuid4().hex[:8]}")
+    db_session.add_all([user, school])
+    db_session.flush()
+    membership = Membership(user_id=user.id, school_id=school.id)
+    db_session.add(membership)
+    db_session.commit()
+    user_id, school_id = user.id, school.id
+    epoch = auth_cache._epochs[auth_cache._partition(user_id)]
+    other = auth_cache._epochs[auth_cache._partition(user_id) - 1]
+    before = _version(db_session, epoch) or 0
+    cache_epoch.poll(engine)
+
+    db_session.add(
+        MembershipRole(
+            membership_id=membership.id, role_id=Role.get_id(db_session, Role.RIDER)
+        )
+    )
+    db_session.commit()
+
+    assert _version(db_session, epoch) == before + 1
+    assert cache_epoch.poll(engine) == []
+
+    # Only that share of the users is reset elsewhere
+    cache_epoch.stage_bump(db_session, other)
+    db_session.commit()
+    snapshot = auth_cache.get_snapshot_sync(db_session, user_id, school_id)
+    _bump_elsewhere(other)
+    assert cache_epoch.poll(engine) == [other]
+    assert auth_cache.cache.get((user_id, school_id)) is snapshot
+    _bump_elsewhere(epoch)
+    assert cache_epoch.poll(engine) == [epoch]
+    assert auth_cache.cache.get((user_id, school_id)) is None
+
+
+def test_concurrent_first_bumps_both_count(db_session):
+    name = f"test_{uuid.uuid4().hex}"
+    other = TestingSessionLocal()
+    try:
+        # Both sessions saw no row for the cache before either committed;
+        # SQLite serializes the commits themselves, Postgres races them
+        assert _version(db_session, name) is None
+        assert _version(other, name) is None
+        cache_epoch.stage_bump(db_session, name)
+        cache_epoch.stage_bump(other, name)
+
+        db_session.commit()
+        other.commit()
+    finally:
+        other.close()
+
+    assert _version(db_session, name) == 2
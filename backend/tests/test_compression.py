@@ -0,0 +1,136 @@
+import asyncio
+import gzip
+import zlib
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.compression import CompressionMiddleware, negotiate_encoding
+
+ROWS = [
+    {"id": i, "first_name": "Rider", "last_name": "Compressible"} for i in range(200)
+]
+
+
+def _app(**kwargs):
+    inner = FastAPI()
+
+    @inner.get("/riders")
+    def riders():
+        return ROWS
+
+    @inner.get("/tiny")
+    def tiny():
+        return {"ok": True}
+
+    @inner.get("/image")
+    def image():
+        return Response(b"\x89PNG" + b"\0" * 4096, media_type="image/png")
+
+    @inner.get("/text")
+    def text():
+        return PlainTextResponse("x" * 4096)
+
+    return CompressionMiddleware(inner, **kwargs)
+
+
+def test_large_json_is_gzipped_with_length():
+    client = TestClient(_app())
+    res = client.get("/riders", headers={"Accept-Encoding": "gzip"})
+
+    assert res.headers["content-encoding"] == "gzip"
+    assert res.headers["vary"] == "Accept-Encoding"
+    assert int(res.headers["content-length"]) < len(res.text) / 5
+    assert res.json() == ROWS
+
+
+def test_small_and_binary_responses_are_not_compressed():
+    client = TestClient(_app())
+    tiny = client.get("/tiny", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in tiny.headers
+    assert tiny.headers["vary"] == "Accept-Encoding"
+
+    image = client.get("/image", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in image.headers
+
+
+def test_client_without_accept_encoding_gets_identity():
+    client = TestClient(_app())
+    res = client.get("/riders", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in res.headers
+    assert res.json() == ROWS
+
+
+def test_levels_are_per_content_type():
+    client = TestClient(_app(levels={"application/json": {"gzip": 9}}))
+    assert (
+        client.get("/riders", headers={"Accept-Encoding": "gzip"}).headers[
+            "content-encoding"
+        ]
+        == "gzip"
+    )
+    text = client.get("/text", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in text.headers
+
+
+def test_negotiate_encoding():
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("gzip;q=0") is None
+    assert negotiate_encoding("*") is not None
+    assert negotiate_encoding("*, gzip;q=0") != "gzip"
+    assert negotiate_encoding("") is None
+
+
+@pytest.mark.asyncio
+async def test_streaming_bodies_are_compressed_chunk_by_chunk():
+    first_chunk_sent = asyncio.Event()
+    inner = FastAPI()
+
+    @inner.get("/export")
+    async def export():
+        async def body():
+            yield "first,"
+            # Only reachable if the first chunk was flushed on its own
+            await asyncio.wait_for(first_chunk_sent.wait(), timeout=2)
+            yield "second"
+
+        return StreamingResponse(body(), media_type="text/csv")
+
+    decoder = zlib.decompressobj(31)
+    decoded = []
+    messages = []
+    disconnected = asyncio.Event()
+
+    async def receive():
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        messages.append(message)
+        if message["type"] == "http.response.body":
+            decoded.append(decoder.decompress(message["body"]))
+            if decoded[-1]:
+                first_chunk_sent.set()
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/export",
+        "raw_path": b"/export",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"accept-encoding", b"gzip")],
+        "server": ("test", 80),
+        "client": ("test", 1234),
+    }
+    await CompressionMiddleware(inner)(scope, receive, send)
+
+    assert (b"content-encoding", b"gzip") in messages[0]["headers"]
+    assert decoded[0] == b"first,"
+    assert b"".join(decoded) == b"first,second"
+    assert gzip.decompress(b"".join(m.get("body", b"") for m in messages[1:]))
@@ -0,0 +1,69 @@
+import time
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+
+from app import main
+from app.core.health import HealthProber, pool_headroom
+from app.main import app
+
+
+@pytest.fixture
+def pool_engine(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path}/health.db",
+        poolclass=QueuePool,
+        pool_size=2,
+        max_overflow=1,
+        connect_args={"check_same_thread": False},
+    )
+    yield engine
+    engine.dispose()
+
+
+def test_probe_reports_database_and_pool_headroom(pool_engine):
+    prober = HealthProber(pool_engine, pools={"app": (pool_engine, 1)}, min_headroom=2)
+
+    assert prober.check().ready
+    assert prober.status().pool_headroom == {"app": 3}
+
+    with pool_engine.connect(), pool_engine.connect():
+        assert pool_headroom(pool_engine, 1) == 1
+        assert pool_headroom(pool_engine, None) is None
+        health = prober.check()
+    assert not health.ready
+    assert health.database == "connected"
+
+
+def test_probe_reports_unreachable_database(tmp_path):
+    broken = create_engine(f"sqlite:///{tmp_path}/missing/dir/db.sqlite")
+    health = HealthProber(broken, pools={}).check()
+    assert not health.ready
+    assert health.database != "connected"
+
+
+def test_stale_probe_is_not_ready(pool_engine):
+    prober = HealthProber(pool_engine, pools={}, interval_seconds=0.01)
+    prober.check()
+    time.sleep(0.05)
+    assert prober.status().database == "probe stale"
+    assert not prober.status().ready
+
+
+@pytest.mark.asyncio
+async def test_health_endpoints(monkeypatch, pool_engine):
+    monkeypatch.setattr(main, "prober", HealthProber(pool_engine, pools={}))
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        live = await ac.get("/health/live")
+        starting = await ac.get("/health/ready")
+        main.prober.check()
+        ready = await ac.get("/health/ready")
+
+    assert live.status_code == 200
+    assert live.json() == {"status": "alive"}
+    assert starting.status_code == 503
+    assert ready.status_code == 200
+    assert ready.json()["status"] == "ready"
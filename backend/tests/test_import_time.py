@@ -0,0 +1,43 @@
+import os
+import subprocess
+import sys
+
+# Generous default: CI machines vary. Tighten locally with IMPORT_TIME_BUDGET_MS.
+IMPORT_TIME_BUDGET_MS = int(os.environ.get("IMPORT_TIME_BUDGET_MS", "3000"))
+
+LAZY_MODULES = ("jose", "passlib", "cryptography", "bcrypt")
+
+SCRIPT = f"""
+import sys, time
+start = time.perf_counter()
+import app.main
+print((time.perf_counter() - start) * 1000)
+print(",".join(m for m in {LAZY_MODULES!r} if m in sys.modules))
+"""
+
+
+def _cold_import():
+    proc = subprocess.run(
+        [sys.executable, "-c", SCRIPT],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=os.path.dirname(os.path.dirname(__file__)),
+    )
+    elapsed, loaded = proc.stdout.splitlines()
+    return float(elapsed), loaded
+
+
+def test_cold_import_stays_within_budget_and_defers_crypto():
+    elapsed_ms, loaded = _cold_import()
+    assert loaded == "", f"imported eagerly: {loaded}"
+    assert elapsed_ms < IMPORT_TIME_BUDGET_MS
+
+
+def test_lazy_crypto_modules_still_work():
+    from app.core import security
+
+    token = security.create_access_token("subject")
+    assert security.decode_access_token(token)["sub"] == "subject"
+    hashed = security.get_password_hash("password123")
+    assert security.verify_password("password123", hashed)
@@ -0,0 +1,132 @@
+import io
+import json
+import logging
+import queue
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import logs
+from app.main import app
+
+
+@pytest.fixture
+def captured():
+    """Configure queued logging into a buffer and restore the root logger."""
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    stream = io.StringIO()
+    listeners = []
+
+    def configure(**kwargs):
+        listener = logs.configure_logging(stream=stream, **kwargs)
+        listeners.append(listener)
+        return listener
+
+    yield configure, stream
+    for listener in listeners:
+        if listener._thread is not None:
+            listener.stop()
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+
+def _records(stream: io.StringIO) -> list[dict]:
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_records_are_json_with_request_id_and_extras(captured):
+    configure, stream = captured
+    listener = configure()
+
+    token = logs.request_id.set("req-1")
+    try:
+        logging.getLogger("app.test").info("Hello %s", "rider", extra={"rows": 3})
+    finally:
+        logs.request_id.reset(token)
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logging.getLogger("app.test").exception("Failed")
+    listener.stop()
+
+    hello, failed = _records(stream)
+    assert hello["msg"] == "Hello rider"
+    assert hello["level"] == "INFO"
+    assert hello["logger"] == "app.test"
+    assert hello["request_id"] == "req-1"
+    assert hello["rows"] == 3
+    assert hello["ts"].endswith("Z")
+    assert "request_id" not in failed
+    assert "ValueError: boom" in failed["exc"]
+
+
+def test_arguments_are_rendered_when_logged():
+    handler = logs.NonBlockingQueueHandler(queue.Queue())
+    rider = {"name": "Ann"}
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = logging.getLogger("app.test").makeRecord(
+            "app.test", logging.ERROR, __file__, 0, "Saved %s", (rider,), sys.exc_info()
+        )
+    handler.handle(record)
+    rider["name"] = "Changed"
+
+    queued = handler.queue.get_nowait()
+    assert queued.msg == "Saved {'name': 'Ann'}"
+    assert queued.args is None
+    assert queued.exc_info is None
+    formatted = json.loads(logs.JsonFormatter().format(queued))
+    assert formatted["msg"] == "Saved {'name': 'Ann'}"
+    assert "ValueError: boom" in formatted["exc"]
+
+
+def test_batched_writes():
+    stream = io.StringIO()
+    handler = logs.BatchingStreamHandler(stream, batch_size=3)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+
+    for i in range(4):
+        handler.handle(logging.makeLogRecord({"msg": f"line {i}"}))
+    assert stream.getvalue() == "line 0\nline 1\nline 2\n"
+
+    handler.flush()
+    assert stream.getvalue().endswith("line 3\n")
+
+
+def test_info_logs_are_sampled(captured):
+    configure, stream = captured
+    listener = configure(sample_rate=0)
+
+    logger = logging.getLogger("app.test")
+    for _ in range(10):
+        logger.info("noisy")
+    logger.warning("kept")
+    listener.stop()
+
+    assert [r["msg"] for r in _records(stream)] == ["kept"]
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = logs.NonBlockingQueueHandler(queue.Queue(1))
+    dropped = logs.LOG_RECORDS_DROPPED.value
+
+    for _ in range(3):
+        handler.handle(logging.makeLogRecord({"msg": "x"}))
+
+    assert handler.queue.qsize() == 1
+    assert logs.LOG_RECORDS_DROPPED.value == dropped + 2
+
+
+def test_request_id_header():
+    client = TestClient(app)
+
+    given = client.get("/", headers={"X-Request-ID": "abc-123"})
+    forged = client.get("/", headers={"X-Request-ID": 'x" level="ERROR'})
+    generated = client.get("/")
+
+    assert given.headers["x-request-id"] == "abc-123"
+    assert forged.headers["x-request-id"] != 'x" level="ERROR'
+    assert len(generated.headers["x-request-id"]) == 32
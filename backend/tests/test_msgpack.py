@@ -0,0 +1,136 @@
+import uuid
+from datetime import date
+
+import msgpack
+import pytest
+from fastapi import APIRouter, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from httpx import ASGITransport, AsyncClient
+from pydantic import BaseModel
+
+from app.api.routing import NegotiatedRoute, prefers_msgpack
+from app.core.responses import FastJSONResponse
+from app.main import app
+
+ID = uuid.UUID("0190a4f2-6f3e-7c4b-9a7e-2b1f3c4d5e6f")
+MSGPACK = "application/msgpack"
+
+
+class Item(BaseModel):
+    id: uuid.UUID
+    born: date
+    name: str
+
+
+def _client() -> TestClient:
+    inner = FastAPI(default_response_class=FastJSONResponse)
+    router = APIRouter(route_class=NegotiatedRoute)
+
+    @router.get("/items", response_model=list[Item])
+    def items():
+        return [{"id": ID, "born": date(2012, 4, 1), "name": "Pony"}]
+
+    @router.get("/items/{item_id}", response_model=Item)
+    def item(item_id: uuid.UUID):
+        raise HTTPException(404, "Item not found", headers={"Vary": "Origin"})
+
+    @router.post("/items", response_model=list[Item])
+    def create_items(items: list[Item]):
+        return items
+
+    inner.include_router(router)
+    return TestClient(inner)
+
+
+@pytest.mark.parametrize(
+    ("accept", "expected"),
+    [
+        ("application/msgpack", True),
+        ("application/x-msgpack", True),
+        ("application/msgpack, application/json;q=0.5", True),
+        ("application/json, application/msgpack;q=0.5", False),
+        ("application/msgpack;q=0", False),
+        ("*/*", False),
+        ("", False),
+    ],
+)
+def test_prefers_msgpack(accept, expected):
+    assert prefers_msgpack(accept) is expected
+
+
+def test_response_is_negotiated():
+    client = _client()
+
+    as_json = client.get("/items")
+    as_msgpack = client.get("/items", headers={"Accept": MSGPACK})
+
+    assert as_json.headers["content-type"] == "application/json"
+    assert as_msgpack.headers["content-type"] == MSGPACK
+    assert "Accept" in as_msgpack.headers["vary"]
+    assert msgpack.unpackb(as_msgpack.content) == as_json.json()
+    assert as_json.json() == [{"id": str(ID), "born": "2012-04-01", "name": "Pony"}]
+
+
+def test_error_responses_vary_on_accept():
+    missing = _client().get(f"/items/{ID}", headers={"Accept": MSGPACK})
+
+    assert missing.status_code == 404
+    assert missing.headers["vary"] == "Origin, Accept"
+
+
+def test_msgpack_request_body_is_validated():
+    client = _client()
+    items = [{"id": str(ID), "born": "2012-04-01", "name": "Pony"}] * 3
+
+    res = client.post(
+        "/items", content=msgpack.packb(items), headers={"Content-Type": MSGPACK}
+    )
+    assert res.status_code == 200, res.text
+    assert res.json() == items
+
+    invalid = client.post(
+        "/items",
+        content=msgpack.packb([{"id": "nope"}]),
+        headers={"Content-Type": MSGPACK},
+    )
+    assert invalid.status_code == 422
+
+    garbage = client.post("/items", content=b"\xc1", headers={"Content-Type": MSGPACK})
+    assert garbage.status_code == 400
+    assert "Accept" in garbage.headers["vary"]
+
+
+@pytest.mark.asyncio
+async def test_auth_endpoints_speak_msgpack():
+    email = f"pack_{uuid.uuid4().hex[:8]}@example.com"
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        res = await ac.post(
+            "/api/auth/register",
+            content=msgpack.packb(
+                {
+                    "email": email,
+                    "password": "password123",
+                    "first_name": "Mes",
+                    "last_name": "Sage",
+                }
+            ),
+            headers={"Content-Type": MSGPACK, "Accept": MSGPACK},
+        )
+        assert res.status_code == 200, res.text
+        assert res.headers["content-type"] == MSGPACK
+        assert msgpack.unpackb(res.content)["email"] == email
+
+        res = await ac.post(
+            "/api/auth/login", data={"username": email, "password": "password123"}
+        )
+        token = res.json()["access_token"]
+        res = await ac.get(
+            "/api/auth/me",
+            headers={"Authorization": f"Bearer {token}", "Accept": MSGPACK},
+        )
+
+    assert res.status_code == 200
+    me = msgpack.unpackb(res.content)
+    assert me["first_name"] == "Mes"
+    assert uuid.UUID(me["id"])
@@ -0,0 +1,164 @@
+import re
+from uuid import uuid4
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import delete, insert, literal, select, update
+
+from app.core import security
+from app.main import app
+from app.models.membership import Membership, MembershipRole
+from app.models.role import Role
+from app.models.school import School
+from app.models.user import User
+
+PASSWORD = "password123"
+
+
+@pytest.fixture
+def instructor(db_session):
+    user = User(
+        email=f"epoch_{uuid4().hex[:8]}@example.com",
+        hashed_password=security.get_password_hash(PASSWORD),
+        first_name="Epoch",
+        last_name="Teacher",
+    )
+    school = School(name="Epoch School", slug=f"epoch-{uuid4().hex[:8]}")
+    db_session.add_all([user, school])
+    db_session.flush()
+    membership = Membership(user_id=user.id, school_id=school.id)
+    membership.roles.append(
+        MembershipRole(role_id=Role.get_id(db_session, Role.INSTRUCTOR))
+    )
+    db_session.add(membership)
+    db_session.commit()
+    return user, membership
+
+
+def test_role_changes_bump_the_epoch(db_session, instructor):
+    _, membership = instructor
+    assert membership.perm_epoch == 0
+    admin = MembershipRole(
+        membership_id=membership.id, role_id=Role.get_id(db_session, Role.ADMIN)
+    )
+
+    db_session.add(admin)
+    db_session.flush()
+    db_session.rollback()
+    assert membership.perm_epoch == 0
+
+    db_session.add(admin)
+    db_session.commit()
+    assert membership.perm_epoch == 1
+
+    db_session.delete(admin)
+    db_session.commit()
+    assert membership.perm_epoch == 2
+
+
+def test_bulk_role_changes_bump_the_epoch(db_session, instructor):
+    _, membership = instructor
+    admin_id = Role.get_id(db_session, Role.ADMIN)
+
+    db_session.execute(
+        insert(MembershipRole),
+        [{"membership_id": membership.id, "role_id": admin_id}],
+    )
+    db_session.commit()
+    assert membership.perm_epoch == 1
+
+    db_session.execute(
+        update(MembershipRole)
+        .where(MembershipRole.membership_id == membership.id)
+        .where(MembershipRole.role_id == admin_id)
+        .values(role_id=Role.get_id(db_session, Role.RIDER))
+    )
+    db_session.commit()
+    assert membership.perm_epoch == 2
+
+    db_session.execute(
+        delete(MembershipRole).where(MembershipRole.membership_id == membership.id)
+    )
+    db_session.commit()
+    assert membership.perm_epoch == 3
+
+
+def test_role_collection_changes_bump_the_epoch(db_session, instructor):
+    _, membership = instructor
+
+    # Appended rows have no membership_id until the flush sets it
+    membership.roles.append(MembershipRole(role_id=Role.get_id(db_session, Role.ADMIN)))
+    db_session.commit()
+    assert membership.perm_epoch == 1
+
+    membership.roles.remove(membership.roles[0])
+    db_session.commit()
+    assert membership.perm_epoch == 2
+    assert len(membership.roles) == 1
+
+
+def test_role_inserts_from_select_bump_the_epoch(db_session, instructor):
+    _, membership = instructor
+    admin_id = Role.get_id(db_session, Role.ADMIN)
+
+    db_session.execute(
+        insert(MembershipRole).from_select(
+            ["role_id", "membership_id"],
+            select(literal(admin_id), Membership.id).where(
+                Membership.id == membership.id
+            ),
+        )
+    )
+    db_session.commit()
+    assert membership.perm_epoch == 1
+
+
+def _queries(res) -> int:
+    return int(re.search(r'desc="(\d+) queries"', res.headers["server-timing"])[1])
+
+
+@pytest.mark.asyncio
+async def test_stale_perms_force_a_refresh(db_session, instructor):
+    user, membership = instructor
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        login = await ac.post(
+            "/api/auth/login", data={"username": user.email, "password": PASSWORD}
+        )
+        assert security.decode_access_token(login.json()["access_token"])["pe"] == 0
+
+        allowed = await ac.get("/api/riders/")
+        assert allowed.status_code == 200
+        # Epoch compared against the cached membership: only the riders query
+        assert _queries(allowed) == 1
+
+        # Revoke the instructor role
+        db_session.delete(membership.roles[0])
+        db_session.commit()
+
+        stale = await ac.get("/api/riders/")
+        assert stale.status_code == 401
+
+        refreshed = await ac.post("/api/auth/refresh")
+        assert refreshed.status_code == 200
+        claims = security.decode_access_token(refreshed.json()["access_token"])
+        assert claims["pe"] == 1
+        assert "riders:view" not in claims.get("perms", [])
+
+        denied = await ac.get("/api/riders/")
+        assert denied.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_tokens_without_epoch_are_not_checked(db_session, instructor):
+    user, membership = instructor
+    token = security.create_access_token(
+        user.id, school_id=membership.school_id, perms=["riders:view"]
+    )
+    db_session.delete(membership.roles[0])
+    db_session.commit()
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        res = await ac.get("/api/riders/", headers={"Authorization": f"Bearer {token}"})
+    assert res.status_code == 200
@@ -0,0 +1,81 @@
+import pytest
+from sqlalchemy import event
+
+from app.core import permission_matrix
+from app.core.auth_helpers import get_user_permissions
+from app.models.membership import Membership, MembershipRole
+from app.models.permission import Permission
+from app.models.role import Role
+from app.models.school import School
+from app.models.user import User
+from tests.conftest import engine
+
+
+def test_matrix_is_loaded_from_seed(db_session):
+    matrix = permission_matrix.current()
+    admin = Role.get_id(db_session, Role.ADMIN)
+    instructor = Role.get_id(db_session, Role.INSTRUCTOR)
+
+    assert "riders:update" in matrix.for_role(admin)
+    assert "riders:delete" not in matrix.for_role(instructor)
+    assert matrix.for_role(-1) == frozenset()
+    assert matrix.for_roles([admin, instructor]) == matrix.for_role(admin)
+    with pytest.raises(TypeError):
+        matrix._by_role[admin] = frozenset()
+
+
+def test_role_permission_changes_rebuild_after_commit(db_session):
+    rider = db_session.query(Role).filter(Role.name == Role.RIDER).one()
+    view = db_session.query(Permission).filter(Permission.name == "riders:view").one()
+    before = permission_matrix.current()
+
+    rider.permissions.append(view)
+    db_session.flush()
+    db_session.rollback()
+    assert permission_matrix.current() is before
+
+    rider.permissions.append(view)
+    db_session.commit()
+    try:
+        after = permission_matrix.current()
+        assert after is not before
+        assert after.for_role(rider.id) == {"riders:view"}
+        assert before.for_role(rider.id) == frozenset()
+    finally:
+        rider.permissions.clear()
+        db_session.commit()
+    assert permission_matrix.current().for_role(rider.id) == frozenset()
+
+
+def test_permission_resolution_skips_permission_tables(db_session):
+    user = User(email="matrix@example.com", first_name="Ma", last_name="Trix")
+    school = School(name="Matrix School", slug="matrix-school")
+    db_session.add_all([user, school])
+    db_session.flush()
+    membership = Membership(user_id=user.id, school_id=school.id)
+    db_session.add(membership)
+    db_session.flush()
+    db_session.add(
+        MembershipRole(
+            membership_id=membership.id,
+            role_id=Role.get_id(db_session, Role.INSTRUCTOR),
+        )
+    )
+    db_session.commit()
+    user_id = user.id
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        _, perms, roles, _ = get_user_permissions(db_session, user_id)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert roles == [Role.INSTRUCTOR]
+    assert perms == ["grades:signoff", "grades:view_history", "riders:view"]
+    assert len(statements) == 1
+    assert "permissions" not in statements[0]
@@ -0,0 +1,62 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, exc, text
+
+from app.core.pool_metrics import (
+    POOL_CHECKOUT_TIMEOUTS,
+    POOL_CHECKOUT_WAIT,
+    POOL_IN_USE,
+    POOL_OVERFLOW,
+    InstrumentedQueuePool,
+    instrument_engine_pool,
+)
+from app.main import app
+
+
+@pytest.fixture
+def small_pool_engine(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path}/pool.db",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+        connect_args={"check_same_thread": False},
+    )
+    instrument_engine_pool(engine, "test")
+    yield engine
+    engine.dispose()
+
+
+def test_pool_records_checkout_wait_and_usage(small_pool_engine):
+    observed = POOL_CHECKOUT_WAIT.labels("test").count
+
+    with small_pool_engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        assert POOL_IN_USE.labels("test").value == 1
+        assert POOL_OVERFLOW.labels("test").value == 0
+
+    assert POOL_IN_USE.labels("test").value == 0
+    assert POOL_CHECKOUT_WAIT.labels("test").count == observed + 1
+
+
+def test_pool_counts_checkout_timeouts(small_pool_engine):
+    timeouts = POOL_CHECKOUT_TIMEOUTS.labels("test").value
+
+    with small_pool_engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            small_pool_engine.connect()
+
+    assert POOL_CHECKOUT_TIMEOUTS.labels("test").value == timeouts + 1
+
+
+def test_metrics_endpoint_exposes_pool_metrics():
+    client = TestClient(app)
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert "# TYPE db_pool_checkout_wait_seconds histogram" in body
+    assert 'db_pool_connections_in_use{pool="sync"}' in body
+    assert 'db_pool_connections_in_use{pool="async"}' in body
+    assert "# TYPE db_pool_checkout_timeouts counter" in body
@@ -0,0 +1,107 @@
+import uuid
+from contextlib import nullcontext
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import select, update
+
+from app.jobs import purge
+from app.jobs.purge import PURGED_ROWS, PurgeLocked, purge_soft_deleted
+from app.models.membership import Membership, MembershipRole
+from app.models.rider_profile import RiderProfile
+from app.models.role import Role
+from app.models.school import School
+from app.models.user import User
+
+NOW = datetime(2026, 6, 1, tzinfo=UTC)
+
+
+def _rider(db_session, deleted_at=None):
+    uid = uuid.uuid4().hex[:8]
+    school = School(name=f"Purge School {uid}", slug=f"purge-school-{uid}")
+    user = User(first_name="Purge", last_name="Rider")
+    db_session.add_all([school, user])
+    db_session.flush()
+    membership = Membership(user_id=user.id, school_id=school.id, deleted_at=deleted_at)
+    membership.roles.append(MembershipRole(role_id=Role.get_id(db_session, Role.RIDER)))
+    profile = RiderProfile(user_id=user.id, school_id=school.id, deleted_at=deleted_at)
+    db_session.add_all([membership, profile])
+    db_session.commit()
+    return membership.id, profile.id
+
+
+def _exists(db_session, model, id_):
+    stmt = (
+        select(model.id).where(model.id == id_).execution_options(include_deleted=True)
+    )
+    return db_session.execute(stmt).first() is not None
+
+
+def _has_roles(db_session, membership_id):
+    stmt = select(MembershipRole).where(MembershipRole.membership_id == membership_id)
+    return db_session.execute(stmt).first() is not None
+
+
+def test_purge_removes_expired_rows_in_chunks(db_session):
+    expired = [_rider(db_session, NOW - timedelta(days=400)) for _ in range(3)]
+    recent = _rider(db_session, NOW - timedelta(days=10))
+    live = _rider(db_session)
+    purged_before = PURGED_ROWS.labels("memberships").value
+
+    result = purge_soft_deleted(db_session, retention_days=365, batch_size=2, now=NOW)
+
+    for membership_id, profile_id in expired:
+        assert not _exists(db_session, Membership, membership_id)
+        assert not _exists(db_session, RiderProfile, profile_id)
+        assert not _has_roles(db_session, membership_id)
+    for membership_id, profile_id in (recent, live):
+        assert _exists(db_session, Membership, membership_id)
+        assert _exists(db_session, RiderProfile, profile_id)
+        assert _has_roles(db_session, membership_id)
+
+    assert result.deleted["memberships"] >= 3
+    assert result.deleted["membership_roles"] >= 3
+    assert result.deleted["rider_profiles"] >= 3
+    assert PURGED_ROWS.labels("memberships").value >= purged_before + 3
+
+
+def test_purge_respects_retention_window(db_session):
+    membership_id, profile_id = _rider(db_session, NOW - timedelta(days=10))
+
+    purge_soft_deleted(db_session, retention_days=30, now=NOW)
+    assert _exists(db_session, Membership, membership_id)
+
+    purge_soft_deleted(db_session, retention_days=5, now=NOW)
+    assert not _exists(db_session, Membership, membership_id)
+    assert not _exists(db_session, RiderProfile, profile_id)
+
+
+class _RestoringArchive:
+    """Restores each chunk as it is archived, as a concurrent restore would."""
+
+    def exclusive(self):
+        return nullcontext()
+
+    def archive_rows(self, db, model, ids):
+        db.execute(update(model).where(model.id.in_(ids)).values(deleted_at=None))
+
+
+def test_rows_restored_meanwhile_are_kept(db_session):
+    membership_id, profile_id = _rider(db_session, NOW - timedelta(days=400))
+
+    purge_soft_deleted(
+        db_session, retention_days=365, now=NOW, archive=_RestoringArchive()
+    )
+
+    assert _exists(db_session, Membership, membership_id)
+    assert _exists(db_session, RiderProfile, profile_id)
+    assert _has_roles(db_session, membership_id)
+
+
+def test_one_purge_runs_at_a_time(db_session):
+    membership_id, _ = _rider(db_session, NOW - timedelta(days=400))
+
+    with purge._single_runner(db_session.get_bind()):
+        with pytest.raises(PurgeLocked):
+            purge_soft_deleted(db_session, retention_days=365, now=NOW)
+    assert _exists(db_session, Membership, membership_id)
@@ -0,0 +1,64 @@
+import uuid
+from datetime import UTC, datetime
+
+from app.core import queries
+from app.core.timing import COMPILED_CACHE, compiled_cache_hit_ratio
+from app.models.membership import Membership
+from app.models.rider_profile import RiderProfile
+from app.models.school import School
+from app.models.user import User
+
+
+def _rider(db_session) -> tuple[uuid.UUID, uuid.UUID, uuid.UUID]:
+    uid = uuid.uuid4().hex[:8]
+    school = School(name=f"Query School {uid}", slug=f"query-school-{uid}")
+    user = User(first_name="Query", last_name="Rider")
+    db_session.add_all([school, user])
+    db_session.flush()
+    db_session.add(Membership(user_id=user.id, school_id=school.id))
+    profile = RiderProfile(user_id=user.id, school_id=school.id)
+    db_session.add(profile)
+    db_session.commit()
+    return school.id, user.id, profile.id
+
+
+def _run_hot_lookups(db_session, school_id, user_id, rider_id):
+    db_session.execute(queries.USER_BY_ID, {"user_id": user_id}).scalars().first()
+    db_session.execute(
+        queries.MEMBERSHIP_WITH_ROLES, {"user_id": user_id, "school_id": school_id}
+    ).unique().scalars().first()
+    db_session.execute(
+        queries.FIRST_MEMBERSHIP_WITH_ROLES, {"user_id": user_id}
+    ).unique().scalars().first()
+    db_session.execute(
+        queries.RIDER_PROFILE_WITH_USER,
+        {"rider_id": rider_id, "school_id": school_id},
+    ).scalars().first()
+
+
+def test_hot_lookups_are_served_from_compiled_cache(db_session):
+    first = _rider(db_session)
+    second = _rider(db_session)
+
+    _run_hot_lookups(db_session, *first)
+    hits = COMPILED_CACHE.labels("hit").value
+    misses = COMPILED_CACHE.labels("miss").value
+
+    # Different parameters, same compiled statements
+    _run_hot_lookups(db_session, *second)
+
+    assert COMPILED_CACHE.labels("miss").value == misses
+    assert COMPILED_CACHE.labels("hit").value == hits + 4
+    assert compiled_cache_hit_ratio() > 0
+
+
+def test_prebuilt_statements_skip_soft_deleted_rows(db_session):
+    school_id, _, rider_id = _rider(db_session)
+    params = {"rider_id": rider_id, "school_id": school_id}
+    assert db_session.execute(queries.RIDER_PROFILE_WITH_USER, params).first()
+
+    profile = db_session.get(RiderProfile, rider_id)
+    profile.deleted_at = datetime.now(UTC)
+    db_session.commit()
+
+    assert db_session.execute(queries.RIDER_PROFILE_WITH_USER, params).first() is None
@@ -0,0 +1,77 @@
+import uuid
+from datetime import UTC, datetime
+
+import pytest
+
+from app.core import read_models
+from app.models.membership import Membership, MembershipRole
+from app.models.rider_profile import RiderProfile
+from app.models.role import Role
+from app.models.school import School
+from app.models.user import User
+from tests.conftest import TestingAsyncSessionLocal
+
+
+def _school(db_session, label):
+    uid = uuid.uuid4().hex[:8]
+    school = School(name=f"{label} {uid}", slug=f"read-{uid}")
+    db_session.add(school)
+    db_session.flush()
+    return school
+
+
+def _member(db_session, school, roles=()):
+    user = User(first_name="Read", last_name="Model", email=None)
+    db_session.add(user)
+    db_session.flush()
+    membership = Membership(user_id=user.id, school_id=school.id)
+    for name in roles:
+        membership.roles.append(MembershipRole(role_id=Role.get_id(db_session, name)))
+    db_session.add(membership)
+    db_session.flush()
+    return user
+
+
+@pytest.mark.asyncio
+async def test_list_and_get_riders_skip_deleted_profiles(db_session):
+    school = _school(db_session, "Read School")
+    live = RiderProfile(user_id=_member(db_session, school).id, school_id=school.id)
+    gone = RiderProfile(
+        user_id=_member(db_session, school).id,
+        school_id=school.id,
+        deleted_at=datetime.now(UTC),
+    )
+    db_session.add_all([live, gone])
+    db_session.commit()
+
+    async with TestingAsyncSessionLocal() as db:
+        riders = await read_models.list_riders(db, school.id)
+        assert [r.id for r in riders] == [live.id]
+        assert riders[0].first_name == "Read"
+        assert not hasattr(riders[0], "__dict__")
+
+        assert (await read_models.get_rider(db, live.id, school.id)).id == live.id
+        assert await read_models.get_rider(db, gone.id, school.id) is None
+        assert await read_models.get_rider(db, live.id, uuid.uuid4()) is None
+
+
+@pytest.mark.asyncio
+async def test_get_me_collects_roles_and_school(db_session):
+    school = _school(db_session, "Me School")
+    user = _member(db_session, school, roles=[Role.ADMIN, Role.INSTRUCTOR])
+    db_session.commit()
+
+    async with TestingAsyncSessionLocal() as db:
+        me = await read_models.get_me(db, user.id, school.id)
+        assert me.school.slug == school.slug
+        assert sorted(me.roles) == [Role.ADMIN, Role.INSTRUCTOR]
+
+        # No school in the token: first membership
+        first = await read_models.get_me(db, user.id, None)
+        assert first.school_id == school.id
+
+        # Not a member of the requested school
+        other = await read_models.get_me(db, user.id, uuid.uuid4())
+        assert other.school is None and other.roles == []
+
+        assert await read_models.get_me(db, uuid.uuid4(), None) is None
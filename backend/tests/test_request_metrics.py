@@ -0,0 +1,67 @@
+import threading
+import uuid
+
+from fastapi.testclient import TestClient
+
+from app.core.metrics import MetricsRegistry
+from app.core.middleware import HTTP_REQUEST_DURATION, HTTP_REQUESTS
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_sharded_metrics_sum_across_threads():
+    registry = MetricsRegistry()
+    counter = registry.counter("jobs", "Jobs", ("kind",), sharded=True)
+    histogram = registry.histogram(
+        "job_seconds", "Job time", buckets=(1.0, 2.0), sharded=True
+    )
+
+    def work():
+        for _ in range(1000):
+            counter.labels("a").inc()
+            histogram.observe(1.5)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counter.labels("a").value == 4000
+    assert histogram.count == 4000
+    assert histogram.sum == 6000.0
+    rendered = registry.render()
+    assert 'jobs_total{kind="a"} 4000' in rendered
+    assert 'job_seconds_bucket{le="1.0"} 0' in rendered
+    assert 'job_seconds_bucket{le="2.0"} 4000' in rendered
+    assert 'job_seconds_bucket{le="+Inf"} 4000' in rendered
+
+
+def test_requests_are_labelled_by_route_template():
+    route = "/api/riders/{rider_id}"
+    requests = HTTP_REQUESTS.labels("GET", route, 401).value
+    observed = HTTP_REQUEST_DURATION.labels("GET", route).count
+
+    for _ in range(2):
+        client.get(f"/api/riders/{uuid.uuid4()}")
+
+    assert HTTP_REQUESTS.labels("GET", route, 401).value == requests + 2
+    assert HTTP_REQUEST_DURATION.labels("GET", route).count == observed + 2
+
+    body = client.get("/metrics").text
+    assert "# TYPE http_request_duration_seconds histogram" in body
+    assert (
+        'http_requests_total{method="GET",route="/api/riders/{rider_id}",'
+        'status="401"}' in body
+    )
+
+
+def test_unmatched_paths_share_one_label():
+    unmatched = HTTP_REQUESTS.labels("GET", "<unmatched>", 404).value
+
+    client.get("/wp-login.php")
+    client.get("/.env")
+
+    assert HTTP_REQUESTS.labels("GET", "<unmatched>", 404).value == unmatched + 2
+    assert "/wp-login.php" not in client.get("/metrics").text
@@ -0,0 +1,58 @@
+import json
+import uuid
+from dataclasses import dataclass
+from datetime import UTC, date, datetime
+from decimal import Decimal
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from app.api.routing import TimedRoute
+from app.core.responses import FastJSONResponse
+
+ID = uuid.UUID("0190a4f2-6f3e-7c4b-9a7e-2b1f3c4d5e6f")
+
+
+class Item(BaseModel):
+    id: uuid.UUID
+    born: date
+    price: Decimal
+
+
+@dataclass(slots=True)
+class Row:
+    id: uuid.UUID
+    seen: datetime
+
+
+def test_render_encodes_native_types_and_models():
+    body = FastJSONResponse(
+        {
+            "id": ID,
+            "row": Row(ID, datetime(2026, 1, 2, 3, 4, 5, tzinfo=UTC)),
+            "item": Item(id=ID, born=date(2012, 4, 1), price=Decimal("9.50")),
+            1: "non-string key",
+        }
+    ).body
+
+    assert json.loads(body) == {
+        "id": str(ID),
+        "row": {"id": str(ID), "seen": "2026-01-02T03:04:05Z"},
+        "item": {"id": str(ID), "born": "2012-04-01", "price": "9.50"},
+        "1": "non-string key",
+    }
+
+
+def test_response_models_match_stdlib_output():
+    app = FastAPI(default_response_class=FastJSONResponse)
+    app.router.route_class = TimedRoute
+
+    @app.get("/item", response_model=Item)
+    def item():
+        return {"id": ID, "born": date(2012, 4, 1), "price": Decimal("9.50")}
+
+    res = TestClient(app).get("/item")
+
+    assert res.headers["content-type"] == "application/json"
+    assert res.json() == {"id": str(ID), "born": "2012-04-01", "price": "9.50"}
@@ -1,6 +1,10 @@
 import uuid
 
+import pytest
+from sqlalchemy import select
+
 from app.models.role import Role
+from tests.conftest import TestingAsyncSessionLocal
 
 
 def test_role_get_id_populates_cache_only_after_commit(db_session):
@@ -40,3 +44,16 @@ def test_role_cache_discards_staged_entries_on_rollback(db_session):
 
     assert Role.get_cached_id(role_name) is None
     assert db_session.query(Role).filter(Role.name == role_name).first() is None
+
+
+@pytest.mark.asyncio
+async def test_role_cache_flushes_staged_entries_on_async_commit():
+    async with TestingAsyncSessionLocal() as db:
+        result = await db.execute(select(Role).filter(Role.name == Role.ADMIN))
+        role = result.scalar_one()
+        Role.stage_cache_update(db.sync_session, Role.ADMIN, role.id)
+        assert Role.get_cached_id(Role.ADMIN) is None
+
+        await db.commit()
+
+    assert Role.get_cached_id(Role.ADMIN) == role.id
@@ -0,0 +1,86 @@
+import re
+import uuid
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.core import school_directory
+from app.main import app
+from app.models.school import School
+
+
+def _queries(res) -> int:
+    return int(re.search(r'desc="(\d+) queries"', res.headers["server-timing"])[1])
+
+
+@pytest.fixture
+def school(db_session):
+    slug = f"pony-club-{uuid.uuid4().hex[:8]}"
+    school = School(name="Pony Club", slug=slug)
+    db_session.add(school)
+    db_session.commit()
+    return school
+
+
+@pytest.mark.asyncio
+async def test_lookup_by_slug_is_cached(school):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        first = await ac.get(f"/api/schools/by-slug/{school.slug}")
+        second = await ac.get(f"/api/schools/by-slug/{school.slug}")
+        missing = await ac.get("/api/schools/by-slug/no-such-school")
+
+    assert first.status_code == 200
+    assert first.json() == {
+        "id": str(school.id),
+        "name": "Pony Club",
+        "slug": school.slug,
+    }
+    assert _queries(first) == 1
+    assert second.json() == first.json()
+    assert _queries(second) == 0
+    assert missing.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_commits_evict_changed_slugs(db_session, school):
+    old_slug = school.slug
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        await ac.get(f"/api/schools/by-slug/{old_slug}")
+
+        school.name = "Renamed"
+        db_session.flush()
+        db_session.rollback()
+        # Rolled back: the cached entry stays
+        res = await ac.get(f"/api/schools/by-slug/{old_slug}")
+        assert _queries(res) == 0
+
+        school.slug = f"{old_slug}-new"
+        db_session.commit()
+        gone = await ac.get(f"/api/schools/by-slug/{old_slug}")
+        moved = await ac.get(f"/api/schools/by-slug/{school.slug}")
+
+    assert gone.status_code == 404
+    assert moved.json()["slug"] == school.slug
+
+
+@pytest.mark.asyncio
+async def test_lookup_racing_a_commit_is_not_cached(school):
+    row = (school.id, school.name, school.slug)
+
+    class RacingSession:
+        async def execute(self, statement, params):
+            # A commit evicts while this lookup is reading the old row
+            school_directory.clear()
+
+            class Result:
+                def first(self):
+                    return row
+
+            return Result()
+
+    found = await school_directory.get_by_slug(RacingSession(), school.slug)
+
+    assert found.slug == school.slug
+    assert school.slug not in school_directory._by_slug
@@ -1,5 +1,11 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.testclient import TestClient
 
+from app.core.middleware import SecurityHeadersMiddleware
 from app.main import app
 
 client = TestClient(app)
@@ -12,3 +18,63 @@ def test_security_headers():
     assert response.headers.get("X-Frame-Options") == "DENY"
     assert response.headers.get("X-XSS-Protection") == "0"
     assert response.headers.get("Referrer-Policy") == "strict-origin-when-cross-origin"
+
+
+def test_security_headers_replace_app_values():
+    inner = FastAPI()
+
+    @inner.get("/")
+    def frameable():
+        return PlainTextResponse("ok", headers={"X-Frame-Options": "SAMEORIGIN"})
+
+    response = TestClient(SecurityHeadersMiddleware(inner)).get("/")
+    assert response.headers.get_list("X-Frame-Options") == ["DENY"]
+
+
+@pytest.mark.asyncio
+async def test_streaming_responses_are_not_buffered():
+    first_chunk_sent = asyncio.Event()
+    inner = FastAPI()
+
+    @inner.get("/stream")
+    async def stream():
+        async def body():
+            yield b"first"
+            # Only reachable if the first chunk left before the body finished
+            await asyncio.wait_for(first_chunk_sent.wait(), timeout=2)
+            yield b"second"
+
+        return StreamingResponse(body())
+
+    messages = []
+    disconnected = asyncio.Event()
+
+    async def receive():
+        # StreamingResponse polls for disconnects while it streams
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        messages.append(message)
+        if message["type"] == "http.response.body" and message.get("body"):
+            first_chunk_sent.set()
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/stream",
+        "raw_path": b"/stream",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [],
+        "server": ("test", 80),
+        "client": ("test", 1234),
+    }
+    await SecurityHeadersMiddleware(inner)(scope, receive, send)
+
+    bodies = [m["body"] for m in messages if m["type"] == "http.response.body"]
+    assert bodies[:2] == [b"first", b"second"]
+    assert (b"x-frame-options", b"DENY") in messages[0]["headers"]
@@ -1,10 +1,5 @@
 import sys
-from unittest.mock import MagicMock
-
-# Mock dependencies that are not installed in this environment
-sys.modules["jose"] = MagicMock()
-sys.modules["passlib"] = MagicMock()
-sys.modules["passlib.context"] = MagicMock()
+from unittest.mock import MagicMock, patch
 
 # Mock settings since it might try to read env vars or config files that need other deps
 mock_settings = MagicMock()
@@ -13,12 +8,23 @@ mock_settings.REFRESH_TOKEN_EXPIRE_DAYS = 7
 mock_settings.SECRET_KEY = "secret"
 mock_settings.ALGORITHM = "HS256"
 
-sys.modules["app.core.config"] = MagicMock()
-from app.core import config  # noqa: E402
-
-config.settings = mock_settings
-
-from app.core.security import get_token_hash, verify_token_hash  # noqa: E402
+# Mock dependencies that are not installed in this environment. Scoped to the
+# import: security loads jose/passlib lazily, so a leaked mock would be picked
+# up by later tests.
+with patch.dict(
+    sys.modules,
+    {
+        "jose": MagicMock(),
+        "passlib": MagicMock(),
+        "passlib.context": MagicMock(),
+        "app.core.config": MagicMock(),
+    },
+):
+    from app.core import config
+
+    config.settings = mock_settings
+
+    from app.core.security import get_token_hash, verify_token_hash
 
 
 def test_verify_token_hash_success():
@@ -0,0 +1,78 @@
+import logging
+import re
+import uuid
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.core import timing
+from app.main import app
+
+
+async def _login(ac: AsyncClient) -> dict[str, str]:
+    email = f"timing_{uuid.uuid4().hex[:8]}@example.com"
+    password = "password123"
+    res = await ac.post(
+        "/api/auth/register",
+        json={
+            "email": email,
+            "password": password,
+            "first_name": "Tim",
+            "last_name": "Ing",
+        },
+    )
+    assert res.status_code == 200, res.text
+    res = await ac.post(
+        "/api/auth/login", data={"username": email, "password": password}
+    )
+    assert res.status_code == 200, res.text
+    return {"Authorization": f"Bearer {res.json()['access_token']}"}
+
+
+def _parse_server_timing(header: str) -> dict[str, str]:
+    return {entry.split(";")[0].strip(): entry for entry in header.split(",")}
+
+
+@pytest.mark.asyncio
+async def test_server_timing_reports_db_auth_and_serialize_phases():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        headers = await _login(ac)
+        res = await ac.get("/api/auth/me", headers=headers)
+        again = await ac.get("/api/auth/me", headers=headers)
+
+    assert res.status_code == 200
+    phases = _parse_server_timing(res.headers["server-timing"])
+    assert {"db", "auth", "serialize", "total"} <= phases.keys()
+
+    queries = int(re.search(r'desc="(\d+) queries"', phases["db"]).group(1))
+    # User, membership, school and roles in one read-model query
+    assert queries == 1
+    # Which filled the caches, including the user having no membership
+    assert 'desc="0 queries"' in again.headers["server-timing"]
+
+
+@pytest.mark.asyncio
+async def test_server_timing_without_db_access():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        res = await ac.get("/")
+
+    phases = _parse_server_timing(res.headers["server-timing"])
+    assert 'desc="0 queries"' in phases["db"]
+    assert "auth" not in phases
+
+
+@pytest.mark.asyncio
+async def test_slow_queries_are_logged_with_route(monkeypatch, caplog):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        headers = await _login(ac)
+        monkeypatch.setattr(timing.settings, "SLOW_QUERY_THRESHOLD_MS", 0)
+        with caplog.at_level(logging.WARNING, logger="app.core.timing"):
+            res = await ac.get("/api/auth/me", headers=headers)
+
+    assert res.status_code == 200
+    slow = [r.getMessage() for r in caplog.records if "Slow query" in r.getMessage()]
+    assert slow
+    assert all(" on /api/auth/me: " in message for message in slow)
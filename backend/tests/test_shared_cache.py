@@ -0,0 +1,159 @@
+import os
+import uuid
+
+import pytest
+
+from app.core import shared_cache
+from app.core.read_models import SchoolRead
+from app.core.transactional_cache import TransactionalCache
+
+pytest.importorskip("msgpack")
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "cache")
+
+
+@pytest.fixture
+def segment(path, monkeypatch):
+    """This worker's segment, installed as the host's shared cache."""
+    segment = shared_cache.SharedSegment(path, slots=64, slot_size=256)
+    monkeypatch.setattr(shared_cache, "segment", segment)
+    yield segment
+    segment.close()
+
+
+@pytest.fixture
+def other_worker(path, segment):
+    other = shared_cache.SharedSegment(path, slots=64, slot_size=256)
+    yield other
+    other.close()
+
+
+def test_entries_are_visible_to_other_workers(segment, other_worker):
+    generation = segment.generation("ns")
+    segment.put("ns", b"key", b"value", generation, ttl_seconds=None)
+
+    assert other_worker.get("ns", b"key") == b"value"
+    assert other_worker.get("ns", b"other") is None
+    assert other_worker.get("other-ns", b"key") is None
+
+    other_worker.bump("ns")
+    assert segment.get("ns", b"key") is None
+
+
+def test_stale_expired_and_oversized_entries_are_not_served(segment):
+    generation = segment.generation("ns")
+    segment.bump("ns")
+    segment.put("ns", b"stale", b"value", generation, ttl_seconds=None)
+    assert segment.get("ns", b"stale") is None
+
+    generation = segment.generation("ns")
+    segment.put("ns", b"expired", b"value", generation, ttl_seconds=-1)
+    assert segment.get("ns", b"expired") is None
+
+    segment.put("ns", b"big", b"x" * 256, generation, ttl_seconds=None)
+    assert segment.get("ns", b"big") is None
+
+
+def test_slot_being_written_is_a_miss(segment):
+    generation = segment.generation("ns")
+    segment.put("ns", b"key", b"value", generation, ttl_seconds=None)
+    offset = segment._slot_offset("ns", b"key")
+    seq = shared_cache._SEQ.unpack_from(segment._map, offset)[0]
+
+    shared_cache._SEQ.pack_into(segment._map, offset, seq + 1)
+    assert segment.get("ns", b"key") is None
+    shared_cache._SEQ.pack_into(segment._map, offset, seq)
+    assert segment.get("ns", b"key") == b"value"
+
+
+def test_reopening_keeps_entries_unless_the_layout_changed(path, segment):
+    segment.put("ns", b"key", b"value", segment.generation("ns"), None)
+
+    same = shared_cache.SharedSegment(path, slots=64, slot_size=256)
+    assert same.get("ns", b"key") == b"value"
+    same.close()
+
+    # A worker started with other settings gets its own file...
+    resized = shared_cache.SharedSegment(path, slots=8, slot_size=256)
+    assert resized.file != segment.file
+    assert resized.get("ns", b"key") is None
+    resized.close()
+
+    # ...so this mapping stays usable
+    segment.put("ns", b"other", b"value", segment.generation("ns"), None)
+    assert segment.get("ns", b"key") == b"value"
+
+
+def test_workers_on_other_databases_do_not_share_entries(path):
+    first = shared_cache.SharedSegment(path, slots=64, slot_size=256, source="db1")
+    first.put("ns", b"key", b"value", first.generation("ns"), None)
+
+    other = shared_cache.SharedSegment(path, slots=64, slot_size=256, source="db2")
+    assert other.file != first.file
+    assert other.get("ns", b"key") is None
+    other.close()
+    first.close()
+
+
+def test_bump_all_invalidates_every_namespace(segment, other_worker):
+    for namespace in ("a", "b"):
+        segment.put(namespace, b"key", b"value", segment.generation(namespace), None)
+
+    # E.g. the database was recreated and re-seeded at startup
+    other_worker.bump_all()
+    assert segment.get("a", b"key") is None
+    assert segment.get("b", b"key") is None
+
+
+def test_file_of_unexpected_size_disables_the_cache(path, monkeypatch):
+    monkeypatch.setattr(shared_cache, "segment", None)
+    with open(f"{path}.64x256", "wb") as f:
+        f.write(b"x" * 100)
+
+    assert shared_cache.configure(path, 64, 256) is None
+    assert shared_cache.segment is None
+    assert os.path.getsize(f"{path}.64x256") == 100
+
+
+def test_cache_misses_are_filled_from_other_workers(segment, other_worker):
+    cache = TransactionalCache(f"test_{uuid.uuid4().hex}", shared=SchoolRead)
+    school = SchoolRead(uuid.uuid4(), "Shared School", "shared-school")
+    key = shared_cache.pack(school.id)
+
+    # Another worker loaded the school
+    encode, _ = shared_cache.codec(SchoolRead)
+    other_worker.put(
+        cache.namespace,
+        key,
+        shared_cache.pack(encode(school)),
+        other_worker.generation(cache.namespace),
+        None,
+    )
+
+    assert cache.get(school.id) == school
+    assert cache.get(school.id) == school
+    stats = cache.stats()
+    assert (stats.shared_hits, stats.hits, stats.misses) == (1, 1, 0)
+
+    # Evicting here invalidates the entry for every worker
+    cache.evict([school.id])
+    assert other_worker.get(cache.namespace, key) is None
+
+
+def test_cache_loads_are_shared(segment, other_worker):
+    cache = TransactionalCache(f"test_{uuid.uuid4().hex}", shared=SchoolRead)
+    school = SchoolRead(uuid.uuid4(), "Loaded School", "loaded-school")
+
+    generation = cache.generation
+    other_worker.bump(cache.namespace)
+    # Raced an eviction elsewhere: stored nowhere
+    cache.put(school.id, school, generation)
+    assert other_worker.get(cache.namespace, shared_cache.pack(school.id)) is None
+
+    cache.put(school.id, school, cache.generation)
+    data = other_worker.get(cache.namespace, shared_cache.pack(school.id))
+    _, decode = shared_cache.codec(SchoolRead)
+    assert decode(shared_cache.unpack(data)) == school
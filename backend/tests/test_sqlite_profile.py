@@ -0,0 +1,79 @@
+import threading
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.sqlite import apply_sqlite_profile
+from app.db import get_async_url
+
+
+def _writer_engine(path):
+    engine = create_engine(
+        f"sqlite:///{path}",
+        connect_args={"check_same_thread": False},
+        pool_size=1,
+        max_overflow=0,
+    )
+    apply_sqlite_profile(engine, writer=True)
+    return engine
+
+
+def test_sqlite_profile_sets_pragmas(tmp_path):
+    engine = _writer_engine(tmp_path / "profile.db")
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        # NORMAL == 1
+        assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1
+        assert conn.exec_driver_sql("PRAGMA foreign_keys").scalar() == 1
+        assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == 5000
+        assert conn.exec_driver_sql("PRAGMA cache_size").scalar() == -64 * 1024
+    engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_profile_applies_to_async_readers(tmp_path):
+    url = f"sqlite:///{tmp_path / 'reader.db'}"
+    async_engine = create_async_engine(get_async_url(url))
+    apply_sqlite_profile(async_engine.sync_engine, writer=False)
+    async with async_engine.connect() as conn:
+        result = await conn.exec_driver_sql("PRAGMA journal_mode")
+        assert result.scalar() == "wal"
+        result = await conn.exec_driver_sql("PRAGMA foreign_keys")
+        assert result.scalar() == 1
+    await async_engine.dispose()
+
+
+def test_concurrent_read_then_write_transactions_are_serialized(tmp_path):
+    path = tmp_path / "writers.db"
+    # Separate engines stand in for separate worker processes
+    engines = [_writer_engine(path) for _ in range(4)]
+    with engines[0].begin() as conn:
+        conn.execute(text("CREATE TABLE counters (id INTEGER PRIMARY KEY, n INTEGER)"))
+
+    errors = []
+
+    def work(engine):
+        try:
+            for _ in range(25):
+                with engine.begin() as conn:
+                    n = conn.execute(text("SELECT count(*) FROM counters")).scalar()
+                    conn.execute(text("INSERT INTO counters (n) VALUES (:n)"), {"n": n})
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    threads = [threading.Thread(target=work, args=(e,)) for e in engines]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    with engines[0].connect() as conn:
+        total, distinct = conn.execute(
+            text("SELECT count(*), count(DISTINCT n) FROM counters")
+        ).one()
+    # Each read-then-write ran serialized, so no two writers saw the same count
+    assert (total, distinct) == (100, 100)
+    for engine in engines:
+        engine.dispose()
@@ -0,0 +1,76 @@
+from sqlalchemy import create_engine, event, func, select
+
+from app.core import seed
+from app.core.startup import prepare_database, startup_fingerprint
+from app.db import Base
+from app.models.permission import Permission
+from app.models.role import Role, role_permissions
+
+
+def _engine(tmp_path):
+    return create_engine(f"sqlite:///{tmp_path / 'startup.db'}")
+
+
+def _count_statements(engine):
+    statements = []
+    event.listen(
+        engine, "before_cursor_execute", lambda *args: statements.append(args[2])
+    )
+    return statements
+
+
+def test_second_startup_skips_schema_and_seed(tmp_path):
+    engine = _engine(tmp_path)
+    assert prepare_database(engine, Base.metadata) is True
+
+    statements = _count_statements(engine)
+    assert prepare_database(engine, Base.metadata) is False
+    # Only the table check and the fingerprint lookup
+    assert not any(s.lstrip().upper().startswith("CREATE") for s in statements)
+    assert not any("INSERT" in s.upper() for s in statements)
+    engine.dispose()
+
+
+def test_seed_change_triggers_reseed(tmp_path, monkeypatch):
+    engine = _engine(tmp_path)
+    prepare_database(engine, Base.metadata)
+    before = startup_fingerprint(Base.metadata, engine.dialect)
+
+    monkeypatch.setattr(
+        seed, "PERMISSIONS", [*seed.PERMISSIONS, ("reports:view", "View reports")]
+    )
+    assert startup_fingerprint(Base.metadata, engine.dialect) != before
+    assert prepare_database(engine, Base.metadata) is True
+
+    with engine.connect() as conn:
+        names = set(conn.execute(select(Permission.name)).scalars())
+    assert "reports:view" in names
+    engine.dispose()
+
+
+def test_bulk_seed_is_idempotent_and_additive(db_session):
+    def counts():
+        return (
+            db_session.scalar(select(func.count()).select_from(Role)),
+            db_session.scalar(select(func.count()).select_from(Permission)),
+            db_session.scalar(select(func.count()).select_from(role_permissions)),
+        )
+
+    before = counts()
+    bind = db_session.get_bind()
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(bind, "before_cursor_execute", record)
+    try:
+        seed.seed_rbac(db_session)
+    finally:
+        event.remove(bind, "before_cursor_execute", record)
+
+    assert counts() == before
+    # One upsert + one select per table, plus the role_permissions check and
+    # the cache epoch bump
+    assert len(statements) <= 7
+    assert Role.get_cached_id(Role.ADMIN) is not None
@@ -0,0 +1,134 @@
+import re
+from datetime import UTC, datetime
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import select
+
+from app.core import security
+from app.main import app
+from app.models.membership import Membership, MembershipRole
+from app.models.refresh_token import RefreshToken
+from app.models.role import Role
+from app.models.school import School
+from app.models.user import User
+
+PASSWORD = "password123"
+
+
+@pytest.fixture
+def two_school_user(db_session):
+    user = User(
+        email=f"switch_{uuid4().hex[:8]}@example.com",
+        hashed_password=security.get_password_hash(PASSWORD),
+        first_name="Switch",
+        last_name="Er",
+    )
+    db_session.add(user)
+    db_session.flush()
+
+    schools = []
+    for role in (Role.ADMIN, Role.RIDER):
+        school = School(name=f"{role} School", slug=f"{role.lower()}-{uuid4().hex[:8]}")
+        db_session.add(school)
+        db_session.flush()
+        membership = Membership(user_id=user.id, school_id=school.id)
+        db_session.add(membership)
+        db_session.flush()
+        db_session.add(
+            MembershipRole(
+                membership_id=membership.id, role_id=Role.get_id(db_session, role)
+            )
+        )
+        schools.append(school)
+    db_session.commit()
+    return user, schools
+
+
+def _claims(response) -> dict:
+    return security.decode_access_token(response.json()["access_token"])
+
+
+@pytest.mark.asyncio
+async def test_switch_school_reissues_token_without_password_check(two_school_user):
+    user, schools = two_school_user
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        login = await ac.post(
+            "/api/auth/login", data={"username": user.email, "password": PASSWORD}
+        )
+        assert login.status_code == 200
+        current = _claims(login)["sid"]
+        target = next(s for s in schools if str(s.id) != current)
+
+        with patch.object(
+            security, "verify_password", side_effect=AssertionError("bcrypt")
+        ):
+            res = await ac.post(f"/api/auth/switch-school/{target.id}")
+
+        assert res.status_code == 200, res.text
+        claims = _claims(res)
+        assert claims["sid"] == str(target.id)
+        expected_role = target.name.split()[0]
+        assert claims["roles"] == [expected_role]
+        assert res.cookies["access_token"] == res.json()["access_token"]
+        # Membership grants in one query, plus the refresh token update
+        timing = res.headers["server-timing"]
+        assert re.search(r'desc="2 queries"', timing)
+
+        # The switched school survives a refresh
+        refreshed = await ac.post("/api/auth/refresh")
+        assert refreshed.status_code == 200
+        assert _claims(refreshed)["sid"] == str(target.id)
+
+        me = await ac.get("/api/auth/me")
+        assert me.json()["school"]["id"] == str(target.id)
+
+
+@pytest.mark.asyncio
+async def test_switch_school_requires_membership(db_session, two_school_user):
+    user, _ = two_school_user
+    other = School(name="Elsewhere", slug=f"elsewhere-{uuid4().hex[:8]}")
+    db_session.add(other)
+    db_session.commit()
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        anonymous = await ac.post(f"/api/auth/switch-school/{other.id}")
+        await ac.post(
+            "/api/auth/login", data={"username": user.email, "password": PASSWORD}
+        )
+        foreign = await ac.post(f"/api/auth/switch-school/{other.id}")
+        invalid = await ac.post("/api/auth/switch-school/not-a-uuid")
+
+    assert anonymous.status_code == 401
+    assert foreign.status_code == 403
+    assert invalid.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_dead_refresh_token_keeps_its_school(db_session, two_school_user):
+    user, schools = two_school_user
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        login = await ac.post(
+            "/api/auth/login", data={"username": user.email, "password": PASSWORD}
+        )
+        current = _claims(login)["sid"]
+        target = next(s for s in schools if str(s.id) != current)
+        stored = db_session.execute(
+            select(RefreshToken).where(
+                RefreshToken.token_hash
+                == security.get_token_hash(ac.cookies["refresh_token"])
+            )
+        ).scalar_one()
+        stored.revoked_at = datetime.now(UTC)
+        db_session.commit()
+
+        res = await ac.post(f"/api/auth/switch-school/{target.id}")
+
+    assert res.status_code == 200
+    db_session.refresh(stored)
+    assert str(stored.school_id) == current
@@ -0,0 +1,186 @@
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.core import security
+from app.core.transactional_cache import TransactionalCache
+from app.main import app
+from app.models.membership import Membership, MembershipRole
+from app.models.role import Role
+from app.models.school import School
+from app.models.user import User
+
+
+def _cache(**kwargs) -> TransactionalCache:
+    return TransactionalCache(f"test_{uuid.uuid4().hex}", **kwargs)
+
+
+def test_staged_writes_apply_on_commit_only(db_session):
+    cache = _cache()
+    cache.put("kept", 1)
+
+    cache.stage_put(db_session, "a", 1)
+    cache.stage_evict(db_session, ["kept"])
+    assert cache.get("a") is None
+    db_session.rollback()
+    assert cache.get("a") is None
+    assert cache.get("kept") == 1
+
+    cache.stage_put(db_session, "a", 1)
+    cache.stage_evict(db_session, ["a"])
+    cache.stage_put(db_session, "b", 2)
+    db_session.commit()
+    # Applied in the order they were staged
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+
+
+def test_size_bound_and_ttl(monkeypatch):
+    cache = _cache(maxsize=2, ttl_seconds=60)
+    for key in "abc":
+        cache.put(key, key)
+
+    # Oldest entries go first
+    assert len(cache) == 2
+    assert "a" not in cache
+    assert cache.get("c") == "c"
+
+    now = time.monotonic()
+    monkeypatch.setattr("app.core.transactional_cache.time.monotonic", lambda: now + 61)
+    assert cache.get("c") is None
+    cache.put("d", "d")
+    assert len(cache) == 1
+    assert cache.stats().evictions == 3
+
+
+def test_evict_by_tag():
+    cache = _cache(tags=lambda value: (value["user"],))
+    cache.put(("u1", "s1"), {"user": "u1"})
+    cache.put(("u1", "s2"), {"user": "u1"})
+    cache.put(("u2", "s1"), {"user": "u2"})
+
+    cache.evict_tags(["u1"])
+
+    assert len(cache) == 1
+    assert ("u2", "s1") in cache
+
+
+def test_load_racing_a_commit_is_not_stored():
+    cache = _cache()
+    generation = cache.generation
+    cache.evict(["other"])
+    cache.put("a", 1, generation)
+
+    assert "a" not in cache
+
+
+def test_puts_update_entries_in_place():
+    cache = _cache(maxsize=3)
+    entries = cache._entries
+
+    for key in "abcd":
+        cache.put(key, key)
+    cache.put("b", "b2")
+
+    assert cache._entries is entries
+    assert list(entries) == ["c", "d", "b"]
+
+
+def _write_concurrently(cache, offset: int) -> None:
+    for i in range(20_000):
+        key = (i + offset) % 100
+        cache.put(key, key)
+        if i % 10 == 0:
+            cache.evict([key + 1])
+        if i % 1000 == 0:
+            cache.evict_tags([key % 7])
+
+
+def _read_until(cache, done: threading.Event) -> None:
+    while not done.is_set():
+        for key in range(100):
+            # A value is only ever stored under its own key
+            assert cache.get(key) in (None, key)
+
+
+def test_reads_race_writes_safely():
+    cache = _cache(maxsize=50, tags=lambda value: [value % 7])
+    done = threading.Event()
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        readers = [pool.submit(_read_until, cache, done) for _ in range(4)]
+        writers = [pool.submit(_write_concurrently, cache, n) for n in range(2)]
+        try:
+            for future in writers:
+                future.result()
+        finally:
+            done.set()
+        for future in readers:
+            future.result()
+
+    assert len(cache) <= 50
+
+
+def test_stats_and_namespaces():
+    cache = _cache()
+    cache.put("a", 1)
+    cache.get("a")
+    cache.get("b")
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.size) == (1, 1, 1)
+    assert stats.hit_ratio == 0.5
+    with pytest.raises(ValueError):
+        TransactionalCache(cache.namespace)
+
+
+def _queries(res) -> int:
+    return int(re.search(r'desc="(\d+) queries"', res.headers["server-timing"])[1])
+
+
+@pytest.mark.asyncio
+async def test_current_user_is_served_from_caches(db_session):
+    user = User(first_name="Cached", last_name="Rider", email=None)
+    school = School(name="Cache School", slug=f"cache-{uuid.uuid4().hex[:8]}")
+    db_session.add_all([user, school])
+    db_session.flush()
+    membership = Membership(user_id=user.id, school_id=school.id)
+    membership.roles.append(
+        MembershipRole(role_id=Role.get_id(db_session, Role.INSTRUCTOR))
+    )
+    db_session.add(membership)
+    db_session.commit()
+
+    def headers(user_id, school_id=None):
+        token = security.create_access_token(user_id, school_id=school_id)
+        return {"Authorization": f"Bearer {token}"}
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        cold = await ac.get("/api/auth/me", headers=headers(user.id, school.id))
+        warm = await ac.get("/api/auth/me", headers=headers(user.id, school.id))
+
+        user.first_name = "Renamed"
+        db_session.commit()
+        renamed = await ac.get("/api/auth/me", headers=headers(user.id, school.id))
+
+        first = await ac.get("/api/auth/me", headers=headers(user.id))
+        other = await ac.get("/api/auth/me", headers=headers(user.id, uuid.uuid4()))
+        unknown = await ac.get("/api/auth/me", headers=headers(uuid.uuid4()))
+
+    assert cold.status_code == 200
+    assert cold.json()["school"]["slug"] == school.slug
+    assert cold.json()["roles"] == [Role.INSTRUCTOR]
+    assert _queries(cold) == 1
+    assert warm.json() == cold.json()
+    assert _queries(warm) == 0
+    assert renamed.json()["first_name"] == "Renamed"
+    assert _queries(renamed) == 1
+    assert first.json()["school"]["id"] == str(school.id)
+    assert other.status_code == 403
+    assert unknown.status_code == 404